@@ -0,0 +1,111 @@
+# scripts/benchmark_agent_tools.py
+"""
+한 단계에서 document_search 와 tavily_search 를 함께 호출하는 에이전트 턴의 지연을 동기/비동기 실행으로 비교합니다.
+
+    python -m scripts.benchmark_agent_tools --search-latency 1.5 --retrieval-latency 0.8 --turns 5
+    python -m scripts.benchmark_agent_tools --search-latency 5 --timeout 2   # 느린 도구가 시간 제한에 걸리는 경우
+
+LLM 과 도구는 지연만 흉내 내는 가짜 구현을 사용하므로 API 호출이 없습니다. 모델은 첫 호출에서 두 도구를 한 번에
+요청하고, 두 번째 호출에서 최종 JSON 을 반환합니다. 동기 실행(invoke)은 도구를 차례로, 비동기 실행(ainvoke)은 동시에 실행합니다.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import StructuredTool
+
+from src.agent import TimeoutTool
+
+
+class _ScriptedChatModel(BaseChatModel):
+    """도구 결과가 없으면 두 도구를 동시에 호출하고, 있으면 최종 응답을 반환하는 가짜 모델."""
+
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+    @staticmethod
+    def _result(messages) -> ChatResult:
+        if any(isinstance(message, ToolMessage) for message in messages):
+            message = AIMessage(content=json.dumps({"type": "chat", "content": "done"}))
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "document_search", "args": {"query": "q"}, "id": "call_1"},
+                    {"name": "tavily_search", "args": {"query": "q"}, "id": "call_2"},
+                ],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _tool(name: str, latency: float) -> StructuredTool:
+    def run(query: str) -> str:
+        time.sleep(latency)
+        return f"{name}: {query}"
+
+    async def arun(query: str) -> str:
+        await asyncio.sleep(latency)
+        return f"{name}: {query}"
+
+    return StructuredTool.from_function(func=run, coroutine=arun, name=name, description=name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retrieval-latency", type=float, default=0.8)
+    parser.add_argument("--search-latency", type=float, default=1.5)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=30.0, help="도구별 시간 제한(초)")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    tools = [
+        TimeoutTool.wrap(_tool("document_search", args.retrieval_latency), args.timeout),
+        TimeoutTool.wrap(_tool("tavily_search", args.search_latency), args.timeout),
+    ]
+    prompt = ChatPromptTemplate.from_messages(
+        [("system", "edit"), ("human", "{input}"), MessagesPlaceholder(variable_name="agent_scratchpad")]
+    )
+    agent = create_tool_calling_agent(_ScriptedChatModel(latency=args.llm_latency), tools, prompt)
+    executor = AgentExecutor(agent=agent, tools=tools)
+
+    def run_sync() -> None:
+        executor.invoke({"input": "수정해줘"})
+
+    def run_async() -> None:
+        asyncio.run(executor.ainvoke({"input": "수정해줘"}))
+
+    print(f"llm={args.llm_latency}s x2, document_search={args.retrieval_latency}s, tavily_search={args.search_latency}s, timeout={args.timeout}s\n")
+    print(f"{'mode':<8} {'p50 s':>7} {'mean s':>7}")
+    for mode, run in (("sync", run_sync), ("async", run_async)):
+        samples = []
+        for _ in range(args.turns):
+            started = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - started)
+        print(f"{mode:<8} {statistics.median(samples):>7.2f} {statistics.mean(samples):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
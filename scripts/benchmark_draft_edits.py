@@ -0,0 +1,68 @@
+# scripts/benchmark_draft_edits.py
+"""
+같은 초안과 수정 요청에 대해 전체 초안 재생성 방식과 편집 연산(patch) 방식의 수정 지연/출력 토큰을 비교합니다.
+
+    python -m scripts.benchmark_draft_edits draft.md
+    python -m scripts.benchmark_draft_edits draft.md --requests "도입부 첫 문장을 더 짧게 바꿔줘" "결론에 한 줄 요약을 추가해줘"
+
+설정된 LLM 을 실제로 호출합니다. (API 비용 발생) 문서 검색 도구는 빈 결과를 돌려주는 retriever 를 사용합니다.
+요청마다 두 방식 모두 같은 초안에서 시작하는 새 세션으로 실행합니다.
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.agent import BlogContentAgent
+
+
+DEFAULT_REQUESTS = [
+    "도입부 첫 문장을 더 짧고 흥미롭게 바꿔줘.",
+    "마지막 섹션 끝에 핵심 내용을 한 줄로 요약한 문장을 추가해줘.",
+    "두 번째 섹션 제목을 질문형으로 바꿔줘.",
+]
+
+
+class _EmptyRetriever(BaseRetriever):
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("draft", type=Path, help="수정할 Markdown 초안")
+    parser.add_argument("--requests", nargs="+", default=DEFAULT_REQUESTS)
+    args = parser.parse_args()
+
+    draft = args.draft.read_text(encoding="utf-8")
+    print(f"draft: {len(draft)} chars, {len(args.requests)} requests\n")
+    print(f"{'mode':<7} {'p50 s':>7} {'mean s':>7} {'output tokens':>14} {'applied':>8}")
+    for mode, patch_edits in (("full", False), ("patch", True)):
+        agent = BlogContentAgent(_EmptyRetriever(), [], patch_edits=patch_edits)
+        samples, output_tokens, applied = [], [], 0
+        for request in args.requests:
+            session_id = str(uuid.uuid4())
+            history = agent.get_session_history(session_id)
+            history.add_user_message("제공된 문서를 바탕으로 블로그 초안을 생성해줘.")
+            history.add_ai_message(json.dumps({"type": "draft", "content": draft}, ensure_ascii=False))
+
+            started = time.perf_counter()
+            result = agent.update_blog_post(request, session_id)
+            samples.append(time.perf_counter() - started)
+            # 기록에는 적용 결과가 남으므로 모델이 실제로 생성한 출력 길이는 에이전트 로그의 값을 사용합니다.
+            output_tokens.append(agent.last_output_tokens)
+            applied += result.get("type") == "draft"
+        print(
+            f"{mode:<7} {statistics.median(samples):>7.2f} {statistics.mean(samples):>7.2f} "
+            f"{statistics.mean(output_tokens):>14.0f} {applied:>5}/{len(args.requests)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
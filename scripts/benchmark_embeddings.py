@@ -0,0 +1,88 @@
+# scripts/benchmark_embeddings.py
+"""
+로컬 임베딩 백엔드별 처리량(chunks/sec)을 비교합니다.
+
+    python -m scripts.benchmark_embeddings [PDF 경로] --model sentence-transformers/all-MiniLM-L6-v2 \\
+        --variants torch,torch-int8,onnx,onnx-int8 --device cpu --threads 4
+
+PDF 를 주지 않으면 한국어 합성 청크를 사용합니다.
+각 변형의 결과가 첫 번째 변형(기준)과 얼마나 같은지 평균 코사인 유사도로 함께 보여줍니다.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.config import (
+    DATA_DIR,
+    EMBEDDING_MODEL,
+    LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_CPU_THREADS,
+    LOCAL_EMBEDDING_DEVICE,
+)
+from src.local_embeddings import LocalEmbeddings
+
+
+SYNTHETIC_CHUNK = (
+    "언어모델은 주어진 문맥에서 다음에 올 토큰의 확률 분포를 학습합니다. "
+    "대규모 말뭉치로 사전학습한 뒤 지시문 데이터로 미세조정하면 다양한 작업을 수행할 수 있습니다. "
+)
+
+
+def load_chunks(path: Path | None, num_chunks: int) -> list[str]:
+    if path is None:
+        return [f"{i}번째 청크. " + SYNTHETIC_CHUNK * (1 + i % 4) for i in range(num_chunks)]
+
+    from src.document_preprocessor import DocumentPreprocessor
+
+    with DocumentPreprocessor(path) as preprocessor:
+        return [doc.page_content for doc in preprocessor.process()][:num_chunks]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", type=Path, help="청크를 만들 PDF (생략하면 합성 청크)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--variants", default="torch,torch-int8", help="쉼표로 구분: torch, torch-int8, onnx, onnx-int8")
+    parser.add_argument("--device", default=LOCAL_EMBEDDING_DEVICE)
+    parser.add_argument("--batch-size", type=int, default=LOCAL_EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=LOCAL_EMBEDDING_CPU_THREADS)
+    parser.add_argument("--num-chunks", type=int, default=512)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.pdf, args.num_chunks)
+    print(f"model={args.model}, chunks={len(chunks)}, batch_size={args.batch_size}, threads={args.threads or 'auto'}\n")
+
+    reference = None
+    for variant in args.variants.split(","):
+        backend, _, quantized = variant.strip().partition("-")
+        started = time.perf_counter()
+        embeddings = LocalEmbeddings(
+            args.model,
+            device=args.device,
+            batch_size=args.batch_size,
+            cpu_threads=args.threads,
+            backend=backend,
+            quantize=quantized == "int8",
+            onnx_cache_dir=DATA_DIR / "cache" / "onnx",
+        )
+        load_seconds = time.perf_counter() - started
+
+        # 첫 배치의 지연(워밍업)은 처리량에서 제외합니다.
+        embeddings.embed_documents(chunks[: args.batch_size])
+        started = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents(chunks), dtype=np.float32)
+        seconds = time.perf_counter() - started
+
+        if reference is None:
+            reference = vectors
+        agreement = float(np.mean(np.sum(vectors * reference, axis=1))) if vectors.shape == reference.shape else float("nan")
+        print(
+            f"{variant:<12} device={embeddings.device:<5} load={load_seconds:6.1f}s  "
+            f"chunks/sec={len(chunks) / seconds:8.1f}  cosine_vs_first={agreement:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
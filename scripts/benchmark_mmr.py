@@ -0,0 +1,88 @@
+# scripts/benchmark_mmr.py
+"""
+Chroma 의 MMR 검색과 InMemoryMMRRetriever 의 쿼리당 지연을 비교합니다.
+
+    python -m scripts.benchmark_mmr --num-chunks 2000 --dim 1536 --queries 200 --k 5 --fetch-k 20
+
+임베딩 API 대신 미리 만든 무작위 쿼리 벡터를 돌려주는 임베딩을 쓰므로, 측정값은 검색 자체의 비용입니다.
+두 방식이 고른 문서가 얼마나 겹치는지도 함께 보여줍니다.
+"""
+import argparse
+import statistics
+import time
+
+import chromadb
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.retriever import InMemoryMMRRetriever
+
+
+class _QueryVectors(Embeddings):
+    """쿼리 문자열 "q<i>" 에 대해 i 번째 벡터를 돌려줍니다."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vectors[int(text[1:])].tolist()
+
+
+def measure(retriever, num_queries: int) -> tuple[list[float], list[list[str]]]:
+    samples, results = [], []
+    for i in range(num_queries):
+        started = time.perf_counter()
+        docs = retriever.invoke(f"q{i}")
+        samples.append(time.perf_counter() - started)
+        results.append([doc.page_content for doc in docs])
+    return samples, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-chunks", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--lambda-mult", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.num_chunks, args.dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    embeddings = _QueryVectors(rng.standard_normal((args.queries, args.dim), dtype=np.float32))
+    documents = [Document(id=f"{i:08d}", page_content=f"청크 {i}") for i in range(args.num_chunks)]
+    search_kwargs = {"k": args.k, "fetch_k": args.fetch_k, "lambda_mult": args.lambda_mult}
+
+    client = chromadb.EphemeralClient()
+    store = Chroma(collection_name="bench-mmr", embedding_function=embeddings, client=client)
+    collection = client.get_collection("bench-mmr")
+    for start in range(0, args.num_chunks, 1000):
+        batch = documents[start : start + 1000]
+        collection.upsert(
+            ids=[doc.id for doc in batch],
+            embeddings=vectors[start : start + len(batch)],
+            documents=[doc.page_content for doc in batch],
+        )
+    chroma = store.as_retriever(search_type="mmr", search_kwargs=search_kwargs)
+    in_memory = InMemoryMMRRetriever(embeddings=embeddings, documents=documents, matrix=vectors, **search_kwargs)
+
+    print(f"chunks={args.num_chunks}, dim={args.dim}, queries={args.queries}, {search_kwargs}\n")
+    chroma_samples, chroma_results = measure(chroma, args.queries)
+    memory_samples, memory_results = measure(in_memory, args.queries)
+    for name, samples in (("chroma-mmr", chroma_samples), ("in-memory-mmr", memory_samples)):
+        ms = sorted(s * 1000 for s in samples)
+        print(f"{name:<14} p50={statistics.median(ms):7.2f}ms  p95={ms[int(len(ms) * 0.95) - 1]:7.2f}ms")
+
+    overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(chroma_results, memory_results) if a])
+    print(f"\noverlap with chroma results: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# scripts/benchmark_quantization.py
+"""
+임베딩 차원 축소(Matryoshka)와 int8/binary 양자화에 따른 recall@k, 검색 메모리, 지연을 비교합니다.
+
+    python -m scripts.benchmark_quantization --dims 3072,1024,512,256 --quantizations none,int8,binary --k 5
+    python -m scripts.benchmark_quantization 강의자료.pdf --dims 3072,1024,256   # 실제 임베딩 사용 (API 호출 발생)
+
+정답은 전체 차원 float32 벡터의 정확한 top-k 이고, recall@k 는 각 설정이 찾은 top-k 가 정답과 겹치는 비율입니다.
+차원 축소는 앞쪽 차원만 남기고 다시 정규화합니다. (OpenAI `dimensions` 파라미터와 같은 결과)
+PDF 를 주지 않으면 앞쪽 차원에 분산이 몰린 군집형 합성 벡터를 사용합니다.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.numpy_store import NumpyVectorStore
+
+
+class _UnusedEmbeddings(Embeddings):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> list[float]:
+        raise NotImplementedError
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+def synthetic(num_chunks: int, num_queries: int, dim: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    # 앞쪽 차원일수록 분산이 큰 군집 데이터 (Matryoshka 학습 임베딩과 비슷한 분포)
+    decay = 1 / np.sqrt(1 + np.arange(dim) / 64)
+    centers = rng.standard_normal((max(8, num_chunks // 50), dim)) * decay
+    chunks = centers[rng.integers(len(centers), size=num_chunks)] + 0.6 * rng.standard_normal((num_chunks, dim)) * decay
+    queries = chunks[rng.integers(num_chunks, size=num_queries)] + 0.4 * rng.standard_normal((num_queries, dim)) * decay
+    return normalize(chunks).astype(np.float32), normalize(queries).astype(np.float32)
+
+
+def from_pdf(path: Path, num_queries: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    from src.document_preprocessor import DocumentPreprocessor
+    from src.vector_store import create_embeddings
+
+    with DocumentPreprocessor(path) as preprocessor:
+        texts = [doc.page_content for doc in preprocessor.process()]
+    embeddings = create_embeddings()
+    chunks = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    # 청크 앞부분을 질문 대신 사용합니다.
+    picked = rng.choice(len(texts), size=min(num_queries, len(texts)), replace=False)
+    queries = np.asarray([embeddings.embed_query(texts[i][:200]) for i in picked], dtype=np.float32)
+    return normalize(chunks), normalize(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", type=Path, help="실제 임베딩을 만들 PDF (생략하면 합성 벡터)")
+    parser.add_argument("--num-chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dims", default="3072,1024,512,256", help="첫 번째 값이 전체 차원(합성 벡터의 차원)")
+    parser.add_argument("--quantizations", default="none,int8,binary")
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dims = [int(d) for d in args.dims.split(",")]
+    if args.pdf is None:
+        chunks, queries = synthetic(args.num_chunks, args.queries, dims[0], rng)
+    else:
+        chunks, queries = from_pdf(args.pdf, args.queries, rng)
+    full_dim = chunks.shape[1]
+    truth = [set(np.argsort(-(chunks @ q))[: args.k]) for q in queries]
+    print(f"chunks={len(chunks)}, queries={len(queries)}, full_dim={full_dim}, k={args.k}, rerank_factor={args.rerank_factor}\n")
+    print(f"{'dims':>6} {'quantization':<13} {'recall@k':>9} {'index MB':>9} {'p50 ms':>8}")
+
+    for dim in dims:
+        dim = min(dim, full_dim)
+        truncated_chunks = normalize(chunks[:, :dim])
+        truncated_queries = normalize(queries[:, :dim])
+        for quantization in args.quantizations.split(","):
+            store = NumpyVectorStore(_UnusedEmbeddings(), quantization=quantization, rerank_factor=args.rerank_factor)
+            store.upsert([str(i) for i in range(len(chunks))], truncated_chunks, [""] * len(chunks))
+
+            recalls, samples = [], []
+            for query, expected in zip(truncated_queries, truth):
+                started = time.perf_counter()
+                found = store.similarity_search_by_vector_with_score(query, k=args.k)
+                samples.append(time.perf_counter() - started)
+                recalls.append(len({int(doc.id) for doc, _ in found} & expected) / args.k)
+            print(
+                f"{dim:>6} {quantization:<13} {np.mean(recalls):>9.3f} {store.index_nbytes / 2**20:>9.2f} "
+                f"{statistics.median(samples) * 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
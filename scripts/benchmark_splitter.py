@@ -0,0 +1,93 @@
+# scripts/benchmark_splitter.py
+"""
+RecursiveCharacterTextSplitter 와 PageAwareTokenSplitter 를 같은 페이지들로 비교합니다.
+
+    python -m scripts.benchmark_splitter [PDF 경로] [--encoding cl100k_base] [--chunk-tokens 512]
+
+PDF 를 주지 않으면 한국어 합성 문서를 사용합니다. 출력 항목:
+- chunks/sec: 분할 처리량
+- fill: 청크 평균 토큰 수 / 토큰 예산 (높을수록 예산을 알차게 씀)
+- oversize: 토큰 예산을 넘는 청크 비율 (임베딩 모델에서 잘려 나가는 청크)
+- undersize: 예산의 1/4 미만인 청크 비율 (임베딩 호출만 늘리는 자투리 청크)
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.config import CHUNK_OVERLAP, CHUNK_SIZE, TOKEN_CHUNK_OVERLAP, TOKEN_CHUNK_SIZE
+from src.text_splitter import PageAwareTokenSplitter
+from src.tokenizer import get_tokenizer
+
+
+SYNTHETIC_PARAGRAPH = (
+    "언어모델은 주어진 문맥에서 다음에 올 토큰의 확률 분포를 학습합니다. "
+    "대규모 말뭉치로 사전학습한 뒤 지시문 데이터로 미세조정하면 다양한 작업을 수행할 수 있습니다. "
+    "Transformer 의 self-attention 은 문장 안의 모든 토큰 쌍 사이의 관계를 한 번에 계산합니다."
+)
+
+
+def synthetic_pages(num_pages: int = 200) -> list[Document]:
+    pages = []
+    for page in range(num_pages):
+        sections = [
+            f"{section + 1}. 섹션 {page}-{section}\n" + "\n".join([SYNTHETIC_PARAGRAPH] * (2 + section % 3))
+            for section in range(3)
+        ]
+        pages.append(Document(page_content="\n".join(sections), metadata={"page": page}))
+    return pages
+
+
+def load_pages(path: Path) -> list[Document]:
+    from src.document_preprocessor import DocumentPreprocessor
+
+    with DocumentPreprocessor(path) as preprocessor:
+        return preprocessor.load()
+
+
+def measure(name: str, splitter, pages: list[Document], count, budget: int, repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = splitter.split_documents(pages)
+        timings.append(time.perf_counter() - started)
+
+    seconds = statistics.median(timings)
+    token_counts = [count(chunk.page_content) for chunk in chunks]
+    over = sum(tokens > budget for tokens in token_counts)
+    under = sum(tokens < budget // 4 for tokens in token_counts)
+    pages_kept = sum("page" in chunk.metadata for chunk in chunks)
+    print(
+        f"{name:<10} chunks={len(chunks):>6}  chunks/sec={len(chunks) / seconds:>10.0f}  "
+        f"fill={statistics.mean(token_counts) / budget:>6.1%}  "
+        f"oversize={over / len(chunks):>6.1%}  undersize={under / len(chunks):>6.1%}  "
+        f"page_meta={pages_kept / len(chunks):.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", type=Path, help="비교에 사용할 PDF (생략하면 합성 문서)")
+    parser.add_argument("--encoding", default="auto", help="토크나이저 (auto, hf:<모델명>, tiktoken 인코딩)")
+    parser.add_argument("--chunk-tokens", type=int, default=TOKEN_CHUNK_SIZE, help="토큰 예산")
+    parser.add_argument("--overlap-tokens", type=int, default=TOKEN_CHUNK_OVERLAP)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pdf) if args.pdf else synthetic_pages()
+    tokenizer = get_tokenizer(args.encoding)
+    print(f"{len(pages)} pages, tokenizer={tokenizer.name}, token budget={args.chunk_tokens}\n")
+
+    recursive = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    token = PageAwareTokenSplitter(
+        chunk_size=args.chunk_tokens, chunk_overlap=args.overlap_tokens, tokenizer=tokenizer
+    )
+    measure("recursive", recursive, pages, tokenizer.count, args.chunk_tokens, args.repeat)
+    measure("token", token, pages, tokenizer.count, args.chunk_tokens, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# scripts/benchmark_vector_store.py
+"""
+Chroma 와 NumPy 벡터 저장소의 시작 시간과 검색 지연을 비교합니다.
+
+    python -m scripts.benchmark_vector_store --num-vectors 20000 --dim 1536 --queries 200
+
+무작위 단위 벡터를 사용하므로 API 키나 임베딩 모델이 필요 없습니다.
+- build: 벡터를 저장하고 디스크에 쓰는 시간
+- startup: 새 프로세스가 저장된 인덱스를 여는 데 걸리는 시간 (numpy 는 memory-map)
+- similarity / mmr: 쿼리당 지연의 p50 / p95 (ms)
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import chromadb
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+from src.numpy_store import NumpyVectorStore
+
+
+class _UnusedEmbeddings(Embeddings):
+    """검색은 벡터로만 하므로 호출되지 않습니다."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> list[float]:
+        raise NotImplementedError
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    return f"p50={statistics.median(ms):7.2f}ms  p95={ms[int(len(ms) * 0.95) - 1]:7.2f}ms"
+
+
+def timed_queries(search, queries: np.ndarray) -> list[float]:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query.tolist())
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_chroma(root: Path, ids, vectors, texts, queries, k: int, fetch_k: int) -> None:
+    started = time.perf_counter()
+    client = chromadb.PersistentClient(path=str(root / "chroma"))
+    collection = client.get_or_create_collection("bench")
+    batch = client.get_max_batch_size()
+    for start in range(0, len(ids), batch):
+        end = start + batch
+        collection.upsert(ids=ids[start:end], embeddings=vectors[start:end], documents=texts[start:end])
+    build = time.perf_counter() - started
+    del client, collection
+
+    started = time.perf_counter()
+    store = Chroma(collection_name="bench", embedding_function=_UnusedEmbeddings(), client=chromadb.PersistentClient(path=str(root / "chroma")))
+    store.similarity_search_by_vector(queries[0].tolist(), k=k)
+    startup = time.perf_counter() - started
+
+    report("chroma", build, startup, store, queries, k, fetch_k)
+
+
+def bench_numpy(root: Path, ids, vectors, texts, queries, k: int, fetch_k: int, dtype: str) -> None:
+    started = time.perf_counter()
+    store = NumpyVectorStore(_UnusedEmbeddings(), dtype=dtype)
+    store.upsert(ids, vectors, texts)
+    store.save(root / f"numpy-{dtype}")
+    build = time.perf_counter() - started
+    del store
+
+    started = time.perf_counter()
+    store = NumpyVectorStore.load(root / f"numpy-{dtype}", _UnusedEmbeddings())
+    store.similarity_search_by_vector(queries[0].tolist(), k=k)
+    startup = time.perf_counter() - started
+
+    report(f"numpy-{dtype}", build, startup, store, queries, k, fetch_k)
+
+
+def report(name: str, build: float, startup: float, store, queries, k: int, fetch_k: int) -> None:
+    similarity = timed_queries(lambda q: store.similarity_search_by_vector(q, k=k), queries)
+    mmr = timed_queries(lambda q: store.max_marginal_relevance_search_by_vector(q, k=k, fetch_k=fetch_k), queries)
+    print(f"{name:<14} build={build:6.2f}s  startup={startup * 1000:8.1f}ms")
+    print(f"{'':<14} similarity {percentiles(similarity)}")
+    print(f"{'':<14} mmr        {percentiles(mmr)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--backends", default="chroma,numpy-float32,numpy-float16")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.num_vectors, args.dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    ids = [f"{i:08d}" for i in range(args.num_vectors)]
+    texts = [f"청크 {i}" for i in range(args.num_vectors)]
+    print(f"vectors={args.num_vectors}, dim={args.dim}, queries={args.queries}, k={args.k}, fetch_k={args.fetch_k}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for backend in args.backends.split(","):
+            backend = backend.strip()
+            if backend == "chroma":
+                bench_chroma(root, ids, vectors, texts, queries, args.k, args.fetch_k)
+            else:
+                bench_numpy(root, ids, vectors, texts, queries, args.k, args.fetch_k, backend.partition("-")[2] or "float32")
+
+
+if __name__ == "__main__":
+    main()
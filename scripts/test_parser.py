@@ -33,7 +33,7 @@ def test_pdf_parsing():
         print(f"Using parser: '{preprocessor.parser_type}'")
 
         # Load the document into pages before it gets chunked
-        pages = preprocessor.loader.load()
+        pages = preprocessor.load()
         print(f"Successfully loaded {len(pages)} pages.")
 
         # Check and print the content of the first and last pages
@@ -1,14 +1,17 @@
 # src/agent.py
+import asyncio
 import json
-from difflib import SequenceMatcher
-from typing import Any, Dict, List, Type
+import re
+import time
+from typing import Dict, Generator, Iterator, Type
 
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain.tools.retriever import create_retriever_tool
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.documents import Document
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
@@ -19,12 +22,41 @@ from langchain_tavily import TavilySearch
 from pydantic import BaseModel, Field, PrivateAttr
 
 from src.config import (
+    AGENT_PATCH_EDITS,
+    DRAFT_MAP_REDUCE_THRESHOLD_TOKENS,
+    DRAFT_MAX_CONCURRENCY,
+    DRAFT_MODE,
     DRAFT_PROMPT_TEMPLATE,
+    DRAFT_SECTION_TOKENS,
+    HISTORY_STRATEGY,
+    HISTORY_SUMMARY_PROMPT_TEMPLATE,
+    HISTORY_TOKEN_LIMIT,
     LLM_MODEL,
     LLM_PROVIDER,
+    MAX_HISTORY_MESSAGES,
+    PATCH_EDIT_PROMPT_TEMPLATE,
+    SECTION_SUMMARY_PROMPT_TEMPLATE,
     TAVILY_API_KEY,
+    TAVILY_MAX_RESULTS,
+    TOOL_TIMEOUTS,
     UPDATE_PROMPT_TEMPLATE,
 )
+from src.chat_history import SUMMARY_TAG, AgentChatMessageHistory, HistoryBudget, latest_draft
+from src.draft_map_reduce import MAP_STAGE_TAG, MapReduceDraftGenerator
+from src.draft_patch import PatchError, apply_patch
+from src.event_loop import iterate_sync
+from src.llm_cache import get_llm_response_cache
+from src.logger import get_logger
+from src.search_cache import SearchCache, get_search_cache
+
+
+logger = get_logger(__name__)
+
+# 최종 JSON 응답에서 "content" 문자열 값이 시작하는 위치
+_CONTENT_KEY_PATTERN = re.compile(r'"content"\s*:\s*"')
+# JSON 문자열의 UTF-16 서로게이트 이스케이프 (이모지 등 BMP 밖의 글자는 두 이스케이프로 나뉩니다)
+_HIGH_SURROGATE_PATTERN = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}")
+_LOW_SURROGATE_PATTERN = re.compile(r"\\u[dD][c-fC-F][0-9a-fA-F]{2}")
 
 
 class TavilySearchSchema(BaseModel):
@@ -36,43 +68,147 @@ class TavilySearchSchema(BaseModel):
 class CachedTavilySearchTool(BaseTool):
     """
     TavilySearch를 래핑하여 결과를 캐시하고 중복 API 호출을 방지하는 도구입니다.
+    캐시는 세션과 프로세스가 공유하는 SearchCache(MinHash/LSH 인덱스 + SQLite)를 사용합니다.
     """
 
     name: str = "tavily_search"
     description: str = "포괄적이고 정확하며 신뢰할 수 있는 결과를 위해 최적화된 검색 엔진입니다. 웹에서 정보를 찾을 때 유용합니다."
     args_schema: Type[BaseModel] = TavilySearchSchema
-    _tool: TavilySearch = PrivateAttr(default_factory=lambda: TavilySearch(max_results=3, tavily_api_key=TAVILY_API_KEY))
-    _cache: Dict[str, Any] = PrivateAttr(default_factory=dict)
-    similarity_threshold: float = 0.9
-
-    def _is_similar(self, query1: str, query2: str) -> bool:
-        """두 쿼리가 설정된 임계값 기준으로 유사한지 확인합니다."""
-        return SequenceMatcher(None, query1.lower(), query2.lower()).ratio() >= self.similarity_threshold
+    _tool: TavilySearch = PrivateAttr(
+        default_factory=lambda: TavilySearch(max_results=TAVILY_MAX_RESULTS, tavily_api_key=TAVILY_API_KEY)
+    )
+    _cache: SearchCache = PrivateAttr(default_factory=get_search_cache)
 
     def _run(self, query: str) -> str:
         """캐시를 사용하여 중복 호출을 피하면서 도구를 실행합니다."""
-        for cached_query, result in self._cache.items():
-            if self._is_similar(query, cached_query):
-                print(f"--- CACHE HIT: '{query}'에 대해 유사한 쿼리 '{cached_query}'를 찾았습니다 ---")
-                return result
+        if (cached := self._cache.get(query)) is not None:
+            cached_query, result = cached
+            print(f"--- CACHE HIT: '{query}'에 대해 유사한 쿼리 '{cached_query}'를 찾았습니다 ---")
+            return result
+
+        print(f"--- CACHE MISS: '{query}'에 대한 새로운 검색을 실행합니다 ---")
+        result = self._serialize(self._tool.run(query))
+        self._cache.put(query, result)
+        return result
+
+    async def _arun(self, query: str) -> str:
+        """`_run` 의 비동기 버전. 웹 검색은 Tavily 비동기 클라이언트로, SQLite 캐시 접근은 스레드에서 실행합니다."""
+        if (cached := await asyncio.to_thread(self._cache.get, query)) is not None:
+            cached_query, result = cached
+            print(f"--- CACHE HIT: '{query}'에 대해 유사한 쿼리 '{cached_query}'를 찾았습니다 ---")
+            return result
 
         print(f"--- CACHE MISS: '{query}'에 대한 새로운 검색을 실행합니다 ---")
-        result = self._tool.run(query)
-        self._cache[query] = result
+        result = self._serialize(await self._tool.arun(query))
+        await asyncio.to_thread(self._cache.put, query, result)
         return result
 
+    @staticmethod
+    def _serialize(result) -> str:
+        # TavilySearch 는 dict 를 반환하므로 저장할 수 있도록 문자열로 바꿉니다.
+        return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+
+
+class TimeoutTool(BaseTool):
+    """
+    다른 도구를 감싸 비동기 실행에 시간 제한을 두는 도구입니다.
+    시간을 넘기면 예외 대신 안내 문자열을 결과로 돌려주므로, 같은 단계의 다른 도구 결과로 에이전트가 계속 진행합니다.
+    동기 실행(`_run`)은 감싼 도구를 그대로 호출합니다.
+
+    주의: 비동기 구현이 없는 도구는 LangChain 이 executor 스레드에서 `_run` 으로 실행하므로, 시간 제한은 기다림만 끝낼 뿐
+    스레드를 멈추지 못합니다. 감싼 도구는 끝날 때까지 그 스레드에서 계속 실행되고(결과는 버려짐) 스레드 하나를 차지합니다.
+    네이티브 비동기 도구는 취소됩니다.
+    """
+
+    tool: BaseTool
+    timeout: float
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, timeout: float) -> "TimeoutTool":
+        return cls(tool=tool, timeout=timeout, name=tool.name, description=tool.description, args_schema=tool.args_schema)
+
+    def _run(self, run_manager: CallbackManagerForToolRun | None = None, **kwargs) -> str:
+        return self.tool.run(kwargs, callbacks=run_manager.get_child() if run_manager else None)
+
+    async def _arun(self, run_manager: AsyncCallbackManagerForToolRun | None = None, **kwargs) -> str:
+        try:
+            return await asyncio.wait_for(
+                self.tool.arun(kwargs, callbacks=run_manager.get_child() if run_manager else None), self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Tool '%s' timed out after %.1fs.", self.name, self.timeout)
+            return f"도구 '{self.name}' 이(가) {self.timeout:g}초 안에 응답하지 않아 결과를 가져오지 못했습니다."
+
+
+class JsonContentStream:
+    """
+    `{"type": ..., "content": "..."}` 형태로 스트리밍되는 응답에서 "content" 문자열 값만 점진적으로 디코딩합니다.
+
+    토큰 조각을 `feed` 에 넣으면 지금까지 완성된 content 글자를 반환합니다. 이스케이프 시퀀스(`\\n`, `\\uXXXX` 등)가
+    조각 경계에서 잘려도 다음 조각이 올 때까지 기다렸다가 디코딩하고, 서로게이트 쌍(`\\uD83D\\uDE00`)은 두 이스케이프를 함께 디코딩합니다.
+    코드 펜스(```json)로 감싸도 동작합니다.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> str:
+        if self._finished:
+            return ""
+        self._buffer += chunk
+        if not self._started:
+            match = _CONTENT_KEY_PATTERN.search(self._buffer)
+            if match is None:
+                return ""
+            self._started = True
+            self._buffer = self._buffer[match.end():]
+
+        decoded = []
+        i = 0
+        buffer = self._buffer
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._finished = True
+                break
+            if char != "\\":
+                decoded.append(char)
+                i += 1
+                continue
+            # 이스케이프 시퀀스가 아직 다 도착하지 않았으면 다음 조각을 기다립니다.
+            length = 6 if buffer[i + 1 : i + 2] == "u" else 2
+            if i + length > len(buffer):
+                break
+            if length == 6 and _HIGH_SURROGATE_PATTERN.fullmatch(buffer[i : i + 6]):
+                # 상위 서로게이트(\uD800-\uDBFF)는 뒤따르는 하위 서로게이트 이스케이프와 함께 12글자를 디코딩해야 한 글자가 됩니다.
+                following = buffer[i + 6 : i + 12]
+                if len(following) < 6 and "\\u".startswith(following[:2]):
+                    break
+                if _LOW_SURROGATE_PATTERN.fullmatch(following):
+                    length = 12
+            try:
+                decoded.append(json.loads(f'"{buffer[i : i + length]}"'))
+            except json.JSONDecodeError:
+                decoded.append(buffer[i : i + length])
+            i += length
+        self._buffer = buffer[i:]
+        return "".join(decoded)
+
+
+class StreamedResponse:
+    """
+    에이전트의 스트리밍 응답. 순회하면 화면에 표시할 텍스트 조각(도구 호출 알림 + 응답 내용)을 내놓고,
+    순회가 끝나면 `result` 에 `update_blog_post` 와 같은 형식의 최종 응답(dict)이 채워집니다.
+    """
 
-# --- FIX: Simplified the Chat History class ---
-# The previous version incorrectly overrode the `.messages` attribute as a property,
-# which caused the "'property' object has no attribute 'append'" error.
-# This new version correctly inherits the `.messages` list from the parent class
-# and only adds the `get_messages` method for compatibility with our UI component.
-class AgentChatMessageHistory(ChatMessageHistory):
-    """Custom chat history that adds a `get_messages` method for UI compatibility."""
+    def __init__(self, chunks: Generator[str, None, dict]):
+        self._chunks = chunks
+        self.result: dict | None = None
 
-    def get_messages(self) -> List[BaseMessage]:
-        """Retrieves all messages from the history."""
-        return self.messages
+    def __iter__(self) -> Iterator[str]:
+        self.result = yield from self._chunks
 
 
 class BlogContentAgent:
@@ -81,16 +217,17 @@ class BlogContentAgent:
     중복 도구 호출을 방지하기 위한 캐싱 기능이 내장되어 있습니다.
     """
 
-    def __init__(self, retriever, processed_docs: list[Document]):
+    def __init__(self, retriever, processed_docs: list[Document], patch_edits: bool = AGENT_PATCH_EDITS):
         self.retriever = retriever
         self.processed_docs = processed_docs
         self.chat_history_store: Dict[str, AgentChatMessageHistory] = {}
 
-        # 1. LLM 초기화
+        # 1. LLM 초기화 (응답 캐시를 켜면 초안 생성과 에이전트의 모든 LLM 호출이 캐시를 거칩니다)
+        self.llm_cache = get_llm_response_cache()
         if LLM_PROVIDER == "openai":
-            self.llm = ChatOpenAI(model=LLM_MODEL, temperature=0)
+            self.llm = ChatOpenAI(model=LLM_MODEL, temperature=0, cache=self.llm_cache)
         elif LLM_PROVIDER == "ollama":
-            self.llm = ChatOllama(model=LLM_MODEL, temperature=0)
+            self.llm = ChatOllama(model=LLM_MODEL, temperature=0, cache=self.llm_cache)
         else:
             raise ValueError(f"지원되지 않는 LLM 제공자입니다: {LLM_PROVIDER}")
 
@@ -98,6 +235,14 @@ class BlogContentAgent:
         self.draft_prompt_template = ChatPromptTemplate.from_template(DRAFT_PROMPT_TEMPLATE)
         self.output_parser = StrOutputParser()
         self.draft_chain = self.draft_prompt_template | self.llm | self.output_parser
+        # 큰 문서는 구간 요약(map) 후 같은 초안 프롬프트로 최종 글을 작성(reduce)합니다.
+        self.map_reduce = MapReduceDraftGenerator(
+            self.llm,
+            ChatPromptTemplate.from_template(SECTION_SUMMARY_PROMPT_TEMPLATE),
+            self.draft_prompt_template,
+            section_tokens=DRAFT_SECTION_TOKENS,
+            max_concurrency=DRAFT_MAX_CONCURRENCY,
+        )
 
         # 3. Tool-Calling 에이전트 설정
         retriever_tool = create_retriever_tool(
@@ -106,11 +251,17 @@ class BlogContentAgent:
             "업로드된 PDF 문서에서 정보를 검색하고 반환합니다. 문서 내용에 대한 질문에 답할 때 사용하세요.",
         )
         cached_web_search_tool = CachedTavilySearchTool()
-        tools = [retriever_tool, cached_web_search_tool]
+        # 비동기 실행에서는 AgentExecutor 가 한 단계의 도구 호출들을 동시에 실행하므로, 느린 도구가 단계 전체를 붙잡지 않도록 시간 제한을 둡니다.
+        tools = [
+            TimeoutTool.wrap(tool, TOOL_TIMEOUTS.get(tool.name, TOOL_TIMEOUTS.get("default", 30)))
+            for tool in (retriever_tool, cached_web_search_tool)
+        ]
 
+        # 부분 편집(patch) 규칙을 덧붙이면 작은 수정에 전체 초안을 다시 생성하지 않습니다.
+        self.system_prompt = f"{UPDATE_PROMPT_TEMPLATE}\n{PATCH_EDIT_PROMPT_TEMPLATE}" if patch_edits else UPDATE_PROMPT_TEMPLATE
         self.update_prompt_template = ChatPromptTemplate.from_messages(
             [
-                ("system", UPDATE_PROMPT_TEMPLATE),
+                ("system", self.system_prompt),
                 MessagesPlaceholder(variable_name="chat_history"),
                 ("human", "{input}"),
                 MessagesPlaceholder(variable_name="agent_scratchpad"),
@@ -118,10 +269,27 @@ class BlogContentAgent:
         )
 
         agent = create_tool_calling_agent(self.llm, tools, self.update_prompt_template)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        # 에이전트가 모델을 stream() 으로 부르면 LLM 캐시를 거치지 않으므로, 캐시를 쓸 때는 invoke 로 부릅니다.
+        # (astream_events 로 실행할 때는 캐시에 없는 응답의 토큰이 그대로 스트리밍됩니다)
+        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, stream_runnable=self.llm_cache is None)
+
+        # 저장된 전체 기록 대신 토큰 예산에 맞게 고른 기록을 프롬프트에 넣습니다.
+        self.history_budget = HistoryBudget(
+            HISTORY_TOKEN_LIMIT,
+            MAX_HISTORY_MESSAGES,
+            HISTORY_STRATEGY,
+            summarizer=self.llm,
+            summary_prompt=ChatPromptTemplate.from_template(HISTORY_SUMMARY_PROMPT_TEMPLATE),
+        )
+        self.last_prompt_tokens = 0
+        self.last_output_tokens = 0
+        budgeted_executor = (
+            RunnablePassthrough.assign(chat_history=RunnableLambda(self._select_history, afunc=self._aselect_history))
+            | agent_executor
+        )
 
         self.agent_with_chat_history = RunnableWithMessageHistory(
-            agent_executor,
+            budgeted_executor,
             self.get_session_history,
             input_messages_key="input",
             history_messages_key="chat_history",
@@ -133,23 +301,197 @@ class BlogContentAgent:
             self.chat_history_store[session_id] = AgentChatMessageHistory()
         return self.chat_history_store[session_id]
 
+    def _select_history(self, inputs: dict, config: RunnableConfig) -> list[BaseMessage]:
+        history = self.get_session_history(config["configurable"]["session_id"])
+        return self._report_prompt_size(inputs, history, self.history_budget.select(history))
+
+    async def _aselect_history(self, inputs: dict, config: RunnableConfig) -> list[BaseMessage]:
+        history = self.get_session_history(config["configurable"]["session_id"])
+        return self._report_prompt_size(inputs, history, await self.history_budget.aselect(history))
+
+    def _report_prompt_size(
+        self, inputs: dict, history: AgentChatMessageHistory, selected: list[BaseMessage]
+    ) -> list[BaseMessage]:
+        """이번 턴 프롬프트(시스템 프롬프트 + 선택된 기록 + 요청)의 토큰 수를 기록합니다. (도구 결과 제외)"""
+        history_tokens = self.history_budget.count(selected)
+        tokenizer = self.history_budget.tokenizer
+        self.last_prompt_tokens = tokenizer.count(self.system_prompt) + history_tokens + tokenizer.count(inputs["input"])
+        logger.info(
+            "Agent prompt: %d tokens (history: %d of %d messages, %d tokens, strategy=%s).",
+            self.last_prompt_tokens, len(selected), len(history.messages), history_tokens, self.history_budget.strategy,
+        )
+        return selected
+
     def generate_draft(self, session_id: str) -> str:
         """처리된 문서에서 초기 블로그 초안을 생성합니다."""
-        content = self.format_docs(self.processed_docs)
-        draft = self.draft_chain.invoke({"content": content})
+        if self._use_map_reduce():
+            draft = self.map_reduce.generate(self.processed_docs)
+        else:
+            draft = self.draft_chain.invoke({"content": self.format_docs(self.processed_docs)})
+        self._record_draft(session_id, draft)
+        return draft
+
+    async def agenerate_draft(self, session_id: str) -> str:
+        """`generate_draft` 의 비동기 버전."""
+        draft = await self._adraft()
+        self._record_draft(session_id, draft)
+        return draft
 
+    def stream_draft(self, session_id: str) -> Iterator[str]:
+        """`generate_draft` 의 스트리밍 버전. 초안 토큰을 생성되는 대로 내놓고, 끝나면 대화 기록에 저장합니다."""
+        # stream() 은 LLM 캐시를 확인하지 않으므로, 초안 생성을 ainvoke 로 실행하면서 모델 토큰 이벤트를 받아 내놓습니다.
+        events = RunnableLambda(self._adraft).astream_events(None, version="v2")
+        parts = []
+        draft = None
+        for event in iterate_sync(events):
+            kind = event["event"]
+            if MAP_STAGE_TAG in event.get("tags", []):
+                # map-reduce 의 구간 요약은 최종 초안이 아니므로 표시하지 않습니다.
+                continue
+            if kind == "on_chat_model_start":
+                parts = []
+            elif kind == "on_chat_model_stream" or (kind == "on_chat_model_end" and not parts):
+                # 캐시에서 가져온 응답은 토큰 이벤트 없이 끝나므로 한 번에 내놓습니다.
+                message = event["data"]["chunk"] if kind == "on_chat_model_stream" else event["data"]["output"]
+                if isinstance(message.content, str) and message.content:
+                    parts.append(message.content)
+                    yield message.content
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                draft = event["data"].get("output")
+        self._record_draft(session_id, draft if isinstance(draft, str) else "".join(parts))
+
+    async def _adraft(self, _inputs=None) -> str:
+        if self._use_map_reduce():
+            return await self.map_reduce.agenerate(self.processed_docs)
+        return await self.draft_chain.ainvoke({"content": self.format_docs(self.processed_docs)})
+
+    def _use_map_reduce(self) -> bool:
+        """설정된 초안 생성 방식에 따라 map-reduce 를 쓸지 정합니다. ('auto' 는 문서 토큰 수로 판단)"""
+        if DRAFT_MODE == "auto":
+            tokens = self.map_reduce.count_tokens(self.processed_docs)
+            logger.info("Draft source: %d tokens (map-reduce threshold %d).", tokens, DRAFT_MAP_REDUCE_THRESHOLD_TOKENS)
+            return tokens > DRAFT_MAP_REDUCE_THRESHOLD_TOKENS
+        if DRAFT_MODE not in ("single", "map_reduce"):
+            raise ValueError(f"지원되지 않는 초안 생성 방식입니다: {DRAFT_MODE}")
+        return DRAFT_MODE == "map_reduce"
+
+    def _record_draft(self, session_id: str, draft: str) -> None:
         history = self.get_session_history(session_id)
         history.add_user_message("제공된 문서를 바탕으로 블로그 초안을 생성해줘.")
 
         payload = {"type": "draft", "content": draft}
         history.add_ai_message(json.dumps(payload, ensure_ascii=False))
-        return draft
 
     def update_blog_post(self, user_request: str, session_id: str) -> dict:
         """사용자 요청에 따라 블로그 게시물을 업데이트하기 위해 에이전트를 실행합니다."""
         config = {"configurable": {"session_id": session_id}}
+        started = time.perf_counter()
         response = self.agent_with_chat_history.invoke({"input": user_request}, config=config)
+        return self._finalize_response(response, session_id, started)
 
+    async def aupdate_blog_post(self, user_request: str, session_id: str) -> dict:
+        """
+        `update_blog_post` 의 비동기 버전. 모델이 한 단계에서 여러 도구를 호출하면 AgentExecutor 가 이를 동시에 실행하고,
+        도구는 비동기 구현(Tavily 비동기 클라이언트, retriever.ainvoke)을 사용합니다.
+        """
+        config = {"configurable": {"session_id": session_id}}
+        started = time.perf_counter()
+        response = await self.agent_with_chat_history.ainvoke({"input": user_request}, config=config)
+        return self._finalize_response(response, session_id, started)
+
+    def stream_blog_post_update(self, user_request: str, session_id: str) -> StreamedResponse:
+        """
+        `update_blog_post` 의 스트리밍 버전. 도구 호출 알림과 최종 응답의 "content" 를 생성되는 대로 내놓습니다.
+        반환된 객체를 끝까지 순회한 뒤 `result` 에서 최종 응답(dict)을 읽습니다.
+        """
+        return StreamedResponse(self._stream_update_events(user_request, session_id))
+
+    def _stream_update_events(self, user_request: str, session_id: str) -> Generator[str, None, dict]:
+        config = {"configurable": {"session_id": session_id}}
+        started = time.perf_counter()
+        events = self.agent_with_chat_history.astream_events({"input": user_request}, config=config, version="v2")
+        content = JsonContentStream()
+        streamed = False
+        raw_output = []
+        output = None
+        tool_runs = set()
+        for event in iterate_sync(events):
+            kind = event["event"]
+            if SUMMARY_TAG in event.get("tags", []):
+                # 대화 기록 요약(compress) 호출은 응답이 아니므로 표시하지 않습니다.
+                continue
+            if kind == "on_chat_model_start":
+                # 도구 호출 단계가 끝나고 새 LLM 호출이 시작되면 마지막 호출의 출력만 최종 응답으로 봅니다.
+                content = JsonContentStream()
+                raw_output = []
+            elif kind == "on_chat_model_stream" or (kind == "on_chat_model_end" and not raw_output):
+                # LLM 캐시에서 가져온 응답은 토큰 이벤트 없이 끝나므로 전체 내용을 한 번에 처리합니다.
+                message = event["data"]["chunk"] if kind == "on_chat_model_stream" else event["data"]["output"]
+                token = message.content
+                if isinstance(token, str) and token:
+                    raw_output.append(token)
+                    if text := content.feed(token):
+                        streamed = True
+                        yield text
+            elif kind == "on_tool_start":
+                tool_runs.add(event["run_id"])
+                # TimeoutTool 이 감싼 도구의 실행은 바깥 도구와 같은 호출이므로 한 번만 알립니다.
+                if tool_runs.intersection(event.get("parent_ids", [])):
+                    continue
+                query = event["data"].get("input", {})
+                if isinstance(query, dict):
+                    query = query.get("query", query)
+                yield f"_🔧 `{event['name']}` 실행 중: {query}_\n\n"
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                output = event["data"].get("output")
+
+        if not isinstance(output, dict):
+            logger.warning("Streaming finished without a final agent output; using the last model output.")
+            output = {"output": "".join(raw_output)}
+        result = self._finalize_response(output, session_id, started)
+        # JSON 이 아닌 일반 텍스트 응답은 스트리밍 중에 표시되지 않았으므로 마지막에 한 번에 표시합니다.
+        if not streamed and result.get("type") == "chat":
+            yield result.get("content", "")
+        return result
+
+    def _finalize_response(self, response: dict, session_id: str, started: float) -> dict:
+        """에이전트 출력을 응답으로 변환하고, 편집 연산(patch)이면 현재 초안에 적용한 전체 초안으로 바꿉니다."""
+        result = self._parse_response(response)
+        response_type = result.get("type")
+        if response_type == "patch":
+            result = self._apply_patch(result, session_id)
+        output = response.get("output", "")
+        self.last_output_tokens = self.history_budget.tokenizer.count(output if isinstance(output, str) else str(output))
+        logger.info(
+            "Edit turn: %.2fs, response type=%s, %d output tokens.",
+            time.perf_counter() - started, response_type, self.last_output_tokens,
+        )
+        return result
+
+    def _apply_patch(self, result: dict, session_id: str) -> dict:
+        """
+        편집 연산을 최신 초안에 적용합니다. 대화 기록의 patch 응답은 적용 결과(전체 초안 또는 실패 안내)로 바꾸어,
+        다음 턴과 화면이 항상 현재 초안을 기준으로 하게 합니다.
+        """
+        history = self.get_session_history(session_id)
+        # 마지막 메시지는 방금 저장된 patch 응답입니다.
+        draft = latest_draft(history.messages[:-1])
+        try:
+            if draft is None:
+                raise PatchError("편집할 초안이 없습니다.")
+            patched = {"type": "draft", "content": apply_patch(draft, result.get("operations", []))}
+            logger.info("Applied %d patch operations to the draft.", len(result.get("operations", [])))
+        except PatchError as e:
+            logger.warning("Could not apply patch: %s", e)
+            patched = {"type": "chat", "content": f"수정 사항을 초안에 적용하지 못했습니다: {e} 다시 요청해 주세요."}
+
+        if history.messages and isinstance(history.messages[-1], AIMessage):
+            history.messages[-1] = AIMessage(content=json.dumps(patched, ensure_ascii=False))
+        return patched
+
+    @staticmethod
+    def _parse_response(response: dict) -> dict:
+        """에이전트 출력(JSON 문자열)을 {"type", "content"} 응답으로 변환합니다."""
         try:
             output_str = response.get("output", "{}")
             parsed_json = json.loads(output_str)
@@ -0,0 +1,168 @@
+# src/batch_embedder.py
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.config import (
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_CONCURRENCY,
+    EMBEDDING_REQUESTS_PER_MINUTE,
+    EMBEDDING_TOKENS_PER_MINUTE,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_BACKOFF_BASE,
+)
+from src.logger import get_logger
+from src.rate_limiter import TokenBucket
+from src.tokenizer import Tokenizer, get_tokenizer
+
+
+logger = get_logger(__name__)
+
+
+class EmbeddingRateLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 제한합니다. 한 번에 1분치까지 몰아 쓸 수 있습니다."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute / 60, capacity=requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute)
+
+    def acquire(self, tokens: int) -> float:
+        return self.requests.acquire() + self.tokens.acquire(tokens)
+
+    async def aacquire(self, tokens: int) -> float:
+        return await self.requests.aacquire() + await self.tokens.aacquire(tokens)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_rate_limiter() -> EmbeddingRateLimiter:
+    """프로세스 전체(모든 세션)가 공유하는 임베딩 API 속도 제한기."""
+    return EmbeddingRateLimiter(EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_TOKENS_PER_MINUTE)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429(요청 한도 초과) 오류인지 확인합니다. (openai.RateLimitError 등 제공자별 예외를 모두 처리)"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+class BatchEmbedder:
+    """
+    청크를 토큰 수 기준 배치로 나눠, 속도 제한을 지키며 임베딩합니다.
+
+    - 배치는 `max_batch_tokens` 토큰, `max_batch_size` 개 이하로 만듭니다.
+    - 요청 전에 RPM/TPM 토큰 버킷에서 허용량을 받고, 429 오류는 지수 백오프(+jitter)로 재시도합니다.
+    - `aembed(texts, on_batch)` 는 최대 `max_concurrency` 개의 배치를 동시에 요청하고,
+      배치가 끝날 때마다 `on_batch(indices, vectors)` 를 호출하므로 완료된 배치를 바로 저장할 수 있습니다.
+      `on_batch` 는 작업 스레드에서 실행되므로(여러 배치가 동시에 호출할 수 있음) 블로킹 저장 호출을 해도
+      이벤트 루프를 막지 않지만, 스레드 안전해야 합니다.
+    - 임베딩이 캐시 래퍼(`lookup_documents` 제공)라면 캐시에 있는 텍스트는 API 를 호출하지 않으므로
+      배치와 속도 제한에서 빼고 바로 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        tokenizer: Tokenizer | None = None,
+        rate_limiter: EmbeddingRateLimiter | None = None,
+        max_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_concurrency: int = EMBEDDING_BATCH_MAX_CONCURRENCY,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        backoff_base: float = EMBEDDING_BACKOFF_BASE,
+    ):
+        self.embeddings = embeddings
+        self._tokenizer = tokenizer
+        self.rate_limiter = rate_limiter or get_embedding_rate_limiter()
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer()
+        return self._tokenizer
+
+    def make_batches(self, texts: list[str]) -> list[tuple[list[int], int]]:
+        """(텍스트 인덱스 목록, 토큰 수) 배치 목록을 원래 순서대로 만듭니다."""
+        batches: list[tuple[list[int], int]] = []
+        indices: list[int] = []
+        batch_tokens = 0
+        for index, tokens in enumerate(self.tokenizer.count_batch(texts)):
+            if indices and (batch_tokens + tokens > self.max_batch_tokens or len(indices) >= self.max_batch_size):
+                batches.append((indices, batch_tokens))
+                indices, batch_tokens = [], 0
+            indices.append(index)
+            batch_tokens += tokens
+        if indices:
+            batches.append((indices, batch_tokens))
+        return batches
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """동기 버전: 배치를 순서대로 속도 제한을 지키며 임베딩합니다. (스레드에서 호출)"""
+        vectors, missing = self._split_cached(texts)
+        for indices, tokens in self.make_batches([texts[i] for i in missing]):
+            batch = [texts[missing[i]] for i in indices]
+            for attempt in range(self.max_retries + 1):
+                self.rate_limiter.acquire(tokens)
+                try:
+                    batch_vectors = np.asarray(self.embeddings.embed_documents(batch), dtype=np.float32)
+                    break
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == self.max_retries:
+                        raise
+                    time.sleep(self._backoff(attempt))
+            vectors.update((missing[i], vector) for i, vector in zip(indices, batch_vectors))
+        return np.stack([vectors[i] for i in range(len(texts))]) if texts else np.empty((0, 0), dtype=np.float32)
+
+    async def aembed(self, texts: list[str], on_batch: Callable[[list[int], np.ndarray], None]) -> None:
+        """배치를 동시에 임베딩하고, 끝나는 배치마다 on_batch 를 호출합니다. 실패한 배치가 있으면 예외를 다시 발생시킵니다."""
+        cached, missing = await asyncio.to_thread(self._split_cached, texts)
+        if cached:
+            await asyncio.to_thread(on_batch, list(cached), np.stack(list(cached.values())))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(indices: list[int], tokens: int) -> None:
+            async with semaphore:
+                vectors = await self._aembed_batch([texts[i] for i in indices], tokens)
+            await asyncio.to_thread(on_batch, indices, vectors)
+
+        batches = self.make_batches([texts[i] for i in missing])
+        results = await asyncio.gather(
+            *(run([missing[i] for i in indices], tokens) for indices, tokens in batches), return_exceptions=True
+        )
+        # 다른 배치는 끝까지 진행시켜 저장한 뒤, 첫 번째 실패를 알립니다. (다시 호출하면 남은 배치만 처리)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.error("%d/%d embedding batches failed.", len(errors), len(results))
+            raise errors[0]
+
+    def _split_cached(self, texts: list[str]) -> tuple[dict[int, np.ndarray], list[int]]:
+        """임베딩 캐시에 있는 벡터({인덱스: 벡터})와, 캐시에 없어 API 로 임베딩할 텍스트 인덱스를 나눕니다."""
+        lookup = getattr(self.embeddings, "lookup_documents", None)
+        cached = lookup(texts) if lookup is not None and texts else {}
+        return cached, [i for i in range(len(texts)) if i not in cached]
+
+    async def _aembed_batch(self, batch: list[str], tokens: int) -> np.ndarray:
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.aacquire(tokens)
+            try:
+                return np.asarray(await self.embeddings.aembed_documents(batch), dtype=np.float32)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("Embedding batch rate-limited (429); retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_base * 2**attempt)
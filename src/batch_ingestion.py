@@ -0,0 +1,270 @@
+# src/batch_ingestion.py
+import queue
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from langchain_core.documents import Document
+
+from src.config import (
+    API_LOADER_CONFIG,
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    HYBRID_PARSER_CONFIG,
+    INGESTION_BATCH_MAX_WORKERS,
+    INGESTION_DEDUP_ENABLED,
+    INGESTION_DEDUP_MIN_PAGES,
+    INGESTION_DEDUP_NUM_PERM,
+    INGESTION_DEDUP_SHINGLE_SIZE,
+    INGESTION_DEDUP_THRESHOLD,
+    INGESTION_PARSER,
+    TEXT_SPLITTER_TYPE,
+    TOKEN_CHUNK_OVERLAP,
+    TOKEN_CHUNK_SIZE,
+    TOKEN_SPLITTER_ENCODING,
+)
+from src.dedup import DedupStats
+from src.document_preprocessor import DocumentPreprocessor
+from src.ingestion_cache import IngestionCache
+from src.ingestion_pipeline import IngestionPipeline
+from src.logger import get_logger
+from src.vector_store import VectorStore, document_ids, embedding_model_tag
+
+
+logger = get_logger(__name__)
+
+# 청크에 원본 파일명을 기록하는 메타데이터 키
+SOURCE_FILE_KEY = "source_file"
+
+
+@dataclass(frozen=True)
+class UploadedPDF:
+    """수집할 파일 하나 (파일명 + 내용)."""
+
+    name: str
+    data: bytes
+
+    @property
+    def ingestion_key(self) -> str:
+        is_token_splitter = TEXT_SPLITTER_TYPE == "token"
+        return IngestionCache.make_key(
+            self.data,
+            parser_type=INGESTION_PARSER,
+            chunk_size=TOKEN_CHUNK_SIZE if is_token_splitter else CHUNK_SIZE,
+            chunk_overlap=TOKEN_CHUNK_OVERLAP if is_token_splitter else CHUNK_OVERLAP,
+            embedding_model=embedding_model_tag(),
+            text_splitter=TEXT_SPLITTER_TYPE,
+            dedup=INGESTION_DEDUP_ENABLED,
+            options=_ingestion_options(),
+        )
+
+
+@dataclass(frozen=True)
+class FileProgress:
+    """파일별 진행 상황 이벤트. 같은 이름의 파일을 여러 개 올릴 수 있으므로 `index`(업로드 순서)로 구분합니다."""
+
+    index: int
+    filename: str
+    fraction: float
+    message: str
+    done: bool = False
+    error: str | None = None
+
+
+@dataclass
+class FileIngestResult:
+    """파일 하나의 수집 결과. 실패한 경우 `error` 에 사유가 담깁니다."""
+
+    filename: str
+    documents: list[Document] = field(default_factory=list)
+    pages: int = 0
+    seconds: float = 0.0
+    from_cache: bool = False
+    ocr_pages: list[int] = field(default_factory=list)
+    dedup: DedupStats | None = None
+    error: str | None = None
+    # 벡터 저장소에 저장한 청크 id
+    chunk_ids: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class BatchIngestStats:
+    """배치 전체의 처리량 통계."""
+
+    files: int
+    failed: int
+    pages: int
+    chunks: int
+    seconds: float
+    chunks_deduplicated: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+class BatchIngestor:
+    """
+    여러 PDF 를 제한된 크기의 스레드 풀에서 동시에 수집하여 하나의 VectorStore 에 저장합니다.
+
+    - 파일마다 IngestionPipeline 을 실행하고, 모든 청크에 `source_file` 메타데이터를 붙입니다.
+    - 한 파일이 실패해도 나머지 파일은 계속 처리합니다. 실패 사유는 결과에 기록하고,
+      실패하기 전에 저장된 그 파일의 청크는 저장소에서 지워 검색되지 않게 합니다.
+    - `run()` 은 호출한 스레드에서 파일별 진행 이벤트를 반환하므로, Streamlit 에서 바로 그릴 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        cache: IngestionCache | None = None,
+        max_workers: int = INGESTION_BATCH_MAX_WORKERS,
+    ):
+        self.vector_store = vector_store
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.results: list[FileIngestResult] = []
+        self.stats: BatchIngestStats | None = None
+
+    @property
+    def documents(self) -> list[Document]:
+        """성공한 파일의 청크를 업로드 순서대로 합친 목록."""
+        return [doc for result in self.results if result.ok for doc in result.documents]
+
+    @property
+    def complete(self) -> bool:
+        """모든 파일을 수집했는지 여부. 하나라도 실패했다면 저장소를 다른 세션이 재사용하면 안 됩니다."""
+        return bool(self.results) and all(result.ok for result in self.results)
+
+    def run(self, files: list[UploadedPDF]) -> Iterator[FileProgress]:
+        """파일들을 동시에 수집하며 진행 이벤트를 반환합니다."""
+        started = time.perf_counter()
+        events: queue.Queue[FileProgress] = queue.Queue()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(files)) or 1, thread_name_prefix="batch") as executor:
+            futures = [executor.submit(self._ingest_file, index, file, events) for index, file in enumerate(files)]
+
+            remaining = len(futures)
+            while remaining:
+                event = events.get()
+                if event.done:
+                    remaining -= 1
+                yield event
+
+            self.results = [future.result() for future in futures]
+
+        self.stats = BatchIngestStats(
+            files=len(self.results),
+            failed=sum(not result.ok for result in self.results),
+            pages=sum(result.pages for result in self.results),
+            chunks=sum(len(result.documents) for result in self.results),
+            seconds=time.perf_counter() - started,
+            chunks_deduplicated=sum(result.dedup.chunks_dropped for result in self.results if result.dedup),
+            tokens_saved=sum(result.dedup.tokens_saved for result in self.results if result.dedup),
+        )
+        logger.info(
+            "Ingested %d files (%d failed): %d pages, %d chunks in %.1fs",
+            self.stats.files,
+            self.stats.failed,
+            self.stats.pages,
+            self.stats.chunks,
+            self.stats.seconds,
+        )
+
+    def _ingest_file(self, index: int, file: UploadedPDF, events: queue.Queue) -> FileIngestResult:
+        """[작업 스레드] 파일 하나를 수집합니다. 예외는 결과로 바꿔 다른 파일에 영향을 주지 않습니다."""
+        started = time.perf_counter()
+        result = FileIngestResult(filename=file.name)
+        try:
+            self._ingest_into(index, file, result, events)
+        except Exception as e:
+            logger.exception("Failed to ingest %s", file.name)
+            result.error = f"{type(e).__name__}: {e}"
+            self._discard(result)
+        result.seconds = time.perf_counter() - started
+
+        if result.ok:
+            source = "캐시" if result.from_cache else f"{result.pages}페이지"
+            message = f"완료: {len(result.documents)}개 청크 ({source}, {result.seconds:.1f}초)"
+        else:
+            message = f"실패: {result.error}"
+        events.put(FileProgress(index, file.name, 1.0, message, done=True, error=result.error))
+        return result
+
+    def _ingest_into(self, index: int, file: UploadedPDF, result: FileIngestResult, events: queue.Queue) -> None:
+        ingestion_key = file.ingestion_key
+        # 같은 파일 목록이면 항상 같은 청크 id 가 되도록 업로드 순서와 수집 키로 id 를 구분합니다.
+        # (같은 파일을 두 번 올려도 id 가 겹치지 않아, 한쪽이 실패해 지울 때 다른 쪽 청크를 지우지 않습니다)
+        id_prefix = f"{index:04d}-{ingestion_key[:12]}-"
+
+        if self.cache is not None and (cached := self.cache.get(ingestion_key)) is not None:
+            result.documents = [_tag_source(doc, file.name) for doc in cached.documents]
+            result.pages = cached.pages
+            result.from_cache = True
+            result.chunk_ids = self.vector_store.add_embeddings(
+                result.documents, cached.embeddings, ids=document_ids(result.documents, prefix=id_prefix)
+            )
+            return
+
+        # 업로드된 바이트를 그대로 넘기므로, 경로가 꼭 필요한 파서가 아니면 임시 파일을 만들지 않습니다.
+        with DocumentPreprocessor(file.data, filename=file.name) as preprocessor:
+            pipeline = IngestionPipeline(
+                preprocessor,
+                self.vector_store,
+                metadata={SOURCE_FILE_KEY: file.name},
+                id_prefix=id_prefix,
+            )
+            # 실패했을 때 지울 수 있도록 파이프라인이 저장하는 id 목록을 그대로 공유합니다.
+            result.chunk_ids = pipeline.stored_ids
+            for progress in pipeline.run():
+                events.put(FileProgress(index, file.name, progress.fraction, progress.message))
+
+        result.documents = pipeline.documents
+        result.pages = progress.pages_done
+        result.ocr_pages = sorted(page for page, route in preprocessor.page_routes.items() if route == "ocr")
+        result.dedup = preprocessor.dedup_stats
+        if self.cache is not None and pipeline.stored_ids:
+            self.cache.put(ingestion_key, pipeline.documents, pipeline.embeddings, pages=result.pages)
+
+    def _discard(self, result: FileIngestResult) -> None:
+        """실패한 파일이 이미 저장한 청크를 지웁니다."""
+        if not result.chunk_ids:
+            return
+        try:
+            self.vector_store.delete(result.chunk_ids)
+            logger.info("Removed %d chunks of failed file %s", len(result.chunk_ids), result.filename)
+        except Exception:
+            logger.exception("Failed to remove chunks of %s", result.filename)
+        result.chunk_ids = []
+
+
+def _ingestion_options() -> dict:
+    """수집 캐시 키에 넣을, 현재 설정에서 청크 결과에 영향을 주는 세부 설정."""
+    options: dict = {}
+    if TEXT_SPLITTER_TYPE == "token":
+        options["encoding"] = TOKEN_SPLITTER_ENCODING
+    if INGESTION_DEDUP_ENABLED:
+        options["dedup"] = {
+            "boilerplate_min_pages": INGESTION_DEDUP_MIN_PAGES,
+            "similarity_threshold": INGESTION_DEDUP_THRESHOLD,
+            "num_perm": INGESTION_DEDUP_NUM_PERM,
+            "shingle_size": INGESTION_DEDUP_SHINGLE_SIZE,
+        }
+    if INGESTION_PARSER == "hybrid":
+        options["hybrid"] = HYBRID_PARSER_CONFIG
+    elif INGESTION_PARSER == "api":
+        options["api"] = API_LOADER_CONFIG
+    return options
+
+
+def _tag_source(doc: Document, filename: str) -> Document:
+    return Document(page_content=doc.page_content, metadata={**doc.metadata, SOURCE_FILE_KEY: filename})
@@ -0,0 +1,169 @@
+# src/chat_history.py
+import json
+from typing import List
+
+from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.config import LLM_MODEL
+from src.logger import get_logger
+from src.tokenizer import Tokenizer, get_tokenizer_for_model
+
+
+logger = get_logger(__name__)
+
+# 채팅 형식에서 메시지마다 붙는 역할/구분자 토큰 수 (OpenAI 채팅 모델 기준)
+MESSAGE_OVERHEAD_TOKENS = 4
+HISTORY_STRATEGIES = ("truncate", "compress")
+# 요약 LLM 호출에 붙이는 태그 (스트리밍에서 에이전트 응답 토큰과 구분)
+SUMMARY_TAG = "history_summary"
+# 최신 초안이 아닌 이전 초안 메시지를 프롬프트에 넣을 때 대신 쓰는 내용
+_STALE_DRAFT_PLACEHOLDER = "[이전 버전의 블로그 초안 - 최신 초안으로 대체되어 생략됨]"
+
+
+# --- FIX: Simplified the Chat History class ---
+# The previous version incorrectly overrode the `.messages` attribute as a property,
+# which caused the "'property' object has no attribute 'append'" error.
+# This new version correctly inherits the `.messages` list from the parent class
+# and only adds the `get_messages` method for compatibility with our UI component.
+class AgentChatMessageHistory(ChatMessageHistory):
+    """Custom chat history that adds a `get_messages` method for UI compatibility."""
+
+    # compress 전략의 누적 요약과, 요약에 반영된 앞쪽 메시지 수
+    summary: str = ""
+    summarized_until: int = 0
+
+    def get_messages(self) -> List[BaseMessage]:
+        """Retrieves all messages from the history."""
+        return self.messages
+
+
+def is_draft_message(message: BaseMessage) -> bool:
+    """{"type": "draft"} JSON 을 담은 AI 메시지인지 확인합니다."""
+    if not isinstance(message, AIMessage) or not isinstance(message.content, str):
+        return False
+    try:
+        data = json.loads(message.content)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(data, dict) and data.get("type") == "draft"
+
+
+def latest_draft(messages: list[BaseMessage]) -> str | None:
+    """가장 최근 초안 메시지의 본문. 초안이 없으면 None."""
+    for message in reversed(messages):
+        if is_draft_message(message):
+            return json.loads(message.content)["content"]
+    return None
+
+
+class HistoryBudget:
+    """
+    대화 기록 중 에이전트 프롬프트에 넣을 메시지를 토큰 예산에 맞게 고릅니다.
+
+    기록 자체(UI 에 보이는 전체 대화)는 그대로 두고, 프롬프트용 목록만 만듭니다.
+    - 최신 초안 메시지는 편집 대상이므로 항상 포함하고 예산에서 제외합니다. 그보다 오래된 초안은 짧은 표시로 바꿉니다.
+    - 나머지는 최근 메시지부터 `token_limit` 과 `max_messages` 안에서 유지합니다.
+    - `truncate` 는 넘치는 오래된 메시지를 버리고, `compress` 는 LLM 으로 누적 요약에 합쳐 시스템 메시지로 넣습니다.
+    """
+
+    def __init__(
+        self,
+        token_limit: int,
+        max_messages: int,
+        strategy: str = "truncate",
+        summarizer: BaseChatModel | None = None,
+        summary_prompt: ChatPromptTemplate | None = None,
+        tokenizer: Tokenizer | None = None,
+    ):
+        if strategy not in HISTORY_STRATEGIES:
+            raise ValueError(f"Unsupported history strategy: {strategy}")
+        if strategy == "compress" and (summarizer is None or summary_prompt is None):
+            raise ValueError("The compress strategy requires a summarizer and a summary prompt.")
+        self.token_limit = token_limit
+        self.max_messages = max_messages
+        self.strategy = strategy
+        self.summary_chain = (
+            (summary_prompt | summarizer | StrOutputParser()).with_config(tags=[SUMMARY_TAG])
+            if strategy == "compress"
+            else None
+        )
+        self._tokenizer = tokenizer
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer_for_model(LLM_MODEL)
+        return self._tokenizer
+
+    def count(self, messages: list[BaseMessage]) -> int:
+        """메시지 목록이 프롬프트에서 차지하는 토큰 수."""
+        return sum(self.tokenizer.count(str(message.content)) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+    def select(self, history: AgentChatMessageHistory) -> list[BaseMessage]:
+        """프롬프트에 넣을 메시지를 고릅니다. compress 전략이면 필요할 때 요약을 갱신합니다. (LLM 호출)"""
+        start, draft_index = self._plan(history)
+        if self.strategy == "compress" and start > history.summarized_until:
+            history.summary = self.summary_chain.invoke(self._summary_inputs(history, start, draft_index))
+            history.summarized_until = start
+        return self._assemble(history, start, draft_index)
+
+    async def aselect(self, history: AgentChatMessageHistory) -> list[BaseMessage]:
+        """`select` 의 비동기 버전."""
+        start, draft_index = self._plan(history)
+        if self.strategy == "compress" and start > history.summarized_until:
+            history.summary = await self.summary_chain.ainvoke(self._summary_inputs(history, start, draft_index))
+            history.summarized_until = start
+        return self._assemble(history, start, draft_index)
+
+    def _plan(self, history: AgentChatMessageHistory) -> tuple[int, int | None]:
+        """프롬프트에 그대로 넣을 최근 메시지의 시작 위치와 최신 초안 메시지의 위치를 구합니다."""
+        messages = history.messages
+        draft_index = next((i for i in range(len(messages) - 1, -1, -1) if is_draft_message(messages[i])), None)
+        budget = self.token_limit - (self.tokenizer.count(history.summary) if history.summary else 0)
+        start = len(messages)
+        used = kept = 0
+        for i in range(len(messages) - 1, -1, -1):
+            if i == draft_index:
+                start = i
+                continue
+            tokens = self.count([self._prompt_message(messages[i], draft_index, i)])
+            if used + tokens > budget or kept >= self.max_messages:
+                break
+            used += tokens
+            kept += 1
+            start = i
+        # 대화가 AI 응답으로 시작하지 않도록 사용자 메시지부터 유지합니다.
+        while start < len(messages) and start != draft_index and messages[start].type != "human":
+            start += 1
+        if self.strategy == "compress":
+            # 이미 요약에 들어간 메시지는 다시 넣지 않습니다.
+            start = max(start, history.summarized_until)
+        return start, draft_index
+
+    def _assemble(self, history: AgentChatMessageHistory, start: int, draft_index: int | None) -> list[BaseMessage]:
+        messages = history.messages
+        selected: list[BaseMessage] = []
+        if self.strategy == "compress" and history.summary:
+            selected.append(SystemMessage(content=f"이전 대화 요약:\n{history.summary}"))
+        if draft_index is not None and draft_index < start:
+            selected.append(messages[draft_index])
+        selected.extend(self._prompt_message(messages[i], draft_index, i) for i in range(start, len(messages)))
+        return selected
+
+    def _summary_inputs(self, history: AgentChatMessageHistory, start: int, draft_index: int | None) -> dict:
+        # 요약에는 초안 본문 대신 짧은 표시만 넣습니다. (최신 초안은 따로 유지됩니다)
+        new_messages = [
+            AIMessage(content=_STALE_DRAFT_PLACEHOLDER) if is_draft_message(message) else message
+            for message in history.messages[history.summarized_until : start]
+        ]
+        return {"summary": history.summary or "(없음)", "messages": get_buffer_string(new_messages)}
+
+    @staticmethod
+    def _prompt_message(message: BaseMessage, draft_index: int | None, index: int) -> BaseMessage:
+        if index != draft_index and is_draft_message(message):
+            return AIMessage(content=_STALE_DRAFT_PLACEHOLDER)
+        return message
@@ -0,0 +1,335 @@
+# src/collection_manager.py
+import hashlib
+import shutil
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import chromadb
+from chromadb.api import ClientAPI
+from langchain_core.documents import Document
+
+from src.config import (
+    VECTOR_STORE_BACKEND,
+    VECTOR_STORE_PERSIST_ENABLED,
+    VECTOR_STORE_PERSIST_DIRECTORY,
+    VECTOR_STORE_TTL_SECONDS,
+    VECTOR_STORE_MAX_DISK_BYTES,
+    VECTOR_STORE_REAP_INTERVAL_SECONDS,
+)
+from src.logger import get_logger
+from src.numpy_store import METADATA_FILE
+from src.vector_store import VectorStore
+
+
+logger = get_logger(__name__)
+
+# 컬렉션 복사 시 한 번에 옮길 청크 수
+_COPY_BATCH = 1000
+# 검색할 때마다 레지스트리에 쓰지 않도록, 이 간격 안의 사용 기록은 한 번으로 합칩니다.
+_MARK_USED_INTERVAL_SECONDS = 60.0
+
+
+def collection_name_for(doc_key: str, session_id: str) -> str:
+    """문서 키와 세션으로 컬렉션 이름을 만듭니다. (Chroma 규칙: 3~63자, 영숫자/하이픈)"""
+    session_hash = hashlib.sha256(session_id.encode()).hexdigest()[:12]
+    return f"doc-{doc_key[:32]}-s{session_hash}"
+
+
+class CollectionManager:
+    """
+    문서(수집 키) x 세션 단위의 Chroma 컬렉션을 만들고, 재사용하고, 정리합니다.
+
+    - 컬렉션은 `persist_directory` 아래에 저장되어 프로세스를 다시 시작해도 남아 있습니다.
+    - 같은 세션이 같은 문서를 다시 올리면 기존 컬렉션을 그대로 엽니다. 다른 세션이 이미 수집한 문서면
+      저장된 벡터를 새 컬렉션으로 복사하므로 파싱과 임베딩 없이 바로 사용할 수 있습니다.
+    - 모든 파일의 수집이 끝난 컬렉션만 `mark_complete()` 로 완료 표시하고, 완료된 컬렉션만 재사용하거나 복사합니다.
+      완료되지 않은 컬렉션을 다시 열면 남아 있는 청크를 지우고 처음부터 수집합니다.
+    - 백그라운드 reaper 가 `ttl_seconds` 동안 사용되지 않은 컬렉션을 지우고,
+      전체 크기가 `max_disk_bytes` 를 넘으면 오래된 순으로 지웁니다. 세션이 열어 둔 컬렉션(`open` 후 `release` 전)은
+      지우지 않으며, 검색할 때마다 `mark_used()` 로 마지막 사용 시각을 갱신합니다.
+
+    컬렉션 목록과 마지막 사용 시각, 완료 여부는 같은 폴더의 SQLite 레지스트리에 기록합니다.
+    backend="numpy" 이면 컬렉션마다 `persist_directory/numpy/<이름>/` 폴더(.npy + 메타데이터)를 쓰고,
+    저장하지 않는 경우에는 프로세스 메모리에 VectorStore 를 보관합니다.
+    """
+
+    def __init__(
+        self,
+        persist_directory: Path | None = VECTOR_STORE_PERSIST_DIRECTORY,
+        ttl_seconds: float = VECTOR_STORE_TTL_SECONDS,
+        max_disk_bytes: int = VECTOR_STORE_MAX_DISK_BYTES,
+        reap_interval_seconds: float = VECTOR_STORE_REAP_INTERVAL_SECONDS,
+        backend: str = VECTOR_STORE_BACKEND,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.reap_interval_seconds = reap_interval_seconds
+        self._open: set[str] = set()
+        self._last_marked: dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._reaper: threading.Thread | None = None
+        self.client: ClientAPI | None = None
+        self._numpy_root: Path | None = None
+        self._numpy_stores: dict[str, VectorStore] = {}
+
+        if persist_directory is None:
+            # 디스크에 저장하지 않는 경우에도 세션별로 컬렉션을 분리합니다.
+            if backend == "chroma":
+                self.client = chromadb.EphemeralClient()
+            # 공유 캐시 메모리 DB 는 연결이 하나라도 열려 있는 동안 유지되므로 연결 하나를 붙잡아 둡니다.
+            self._registry_uri = f"file:collections-{id(self)}?mode=memory&cache=shared"
+            self._registry_anchor = sqlite3.connect(self._registry_uri, uri=True, check_same_thread=False)
+        else:
+            persist_directory = Path(persist_directory)
+            persist_directory.mkdir(parents=True, exist_ok=True)
+            if backend == "chroma":
+                self.client = chromadb.PersistentClient(path=str(persist_directory))
+            else:
+                self._numpy_root = persist_directory / "numpy"
+            self._registry_uri = (persist_directory / "registry.sqlite3").as_uri()
+
+        with self._registry() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS collections (
+                    name TEXT PRIMARY KEY,
+                    doc_key TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    complete INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            # 완료 표시가 생기기 전에 만든 레지스트리: 기존 컬렉션은 완료 여부를 알 수 없으므로 미완료로 둡니다.
+            if "complete" not in {row[1] for row in conn.execute("PRAGMA table_info(collections)")}:
+                conn.execute("ALTER TABLE collections ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_collections_doc_key ON collections (doc_key)")
+
+    def open(self, doc_key: str, session_id: str) -> tuple[VectorStore, bool]:
+        """
+        문서와 세션에 해당하는 VectorStore 를 엽니다.
+        Returns: (vector_store, reused) — reused 가 True 이면 수집이 완료된 청크가 저장되어 있어 수집을 건너뛸 수 있습니다.
+            reused 가 False 이면 수집을 마친 뒤 `mark_complete()` 를 호출해야 다른 세션이 재사용할 수 있습니다.
+        """
+        name = collection_name_for(doc_key, session_id)
+        with self._lock:
+            vector_store = self._vector_store(name)
+            reused = self._is_complete(name) and vector_store.count() > 0
+            if not reused and vector_store.count() > 0:
+                # 이전 수집이 실패하거나 중단되어 일부 파일의 청크만 남은 컬렉션은 비우고 다시 수집합니다.
+                logger.info("Discarding incomplete collection %s (%d chunks)", name, vector_store.count())
+                self.drop(name)
+                vector_store = self._vector_store(name)
+            if not reused and (source := self._find_copy_source(doc_key, exclude=name)) is not None:
+                self._copy_collection(source, vector_store)
+                reused = vector_store.count() > 0
+                logger.info("Copied collection %s -> %s (%d chunks)", source, name, vector_store.count())
+
+            now = time.time()
+            with self._registry() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO collections (name, doc_key, session_id, created_at, last_access, complete) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET last_access = excluded.last_access, complete = excluded.complete
+                    """,
+                    (name, doc_key, session_id, now, now, int(reused)),
+                )
+            self._open.add(name)
+            if reused:
+                self.record_size(name)
+        return vector_store, reused
+
+    def touch(self, name: str) -> None:
+        """컬렉션을 방금 사용한 것으로 표시합니다. (TTL 연장)"""
+        now = time.time()
+        with self._lock:
+            self._last_marked[name] = now
+        with self._registry() as conn:
+            conn.execute("UPDATE collections SET last_access = ? WHERE name = ?", (now, name))
+
+    def mark_used(self, name: str) -> None:
+        """검색 등으로 컬렉션을 사용할 때 호출합니다. `_MARK_USED_INTERVAL_SECONDS` 안에 다시 호출되면 기록하지 않습니다."""
+        with self._lock:
+            if time.time() - self._last_marked.get(name, 0.0) < _MARK_USED_INTERVAL_SECONDS:
+                return
+        self.touch(name)
+
+    def mark_complete(self, name: str) -> None:
+        """모든 파일의 수집이 끝났음을 기록합니다. 이후 같은 문서를 여는 세션은 이 컬렉션을 재사용하거나 복사합니다."""
+        with self._registry() as conn:
+            conn.execute("UPDATE collections SET complete = 1 WHERE name = ?", (name,))
+
+    def record_size(self, name: str) -> int:
+        """컬렉션의 크기(벡터 + 본문 바이트)를 추정하여 레지스트리에 기록합니다."""
+        if self.backend == "numpy":
+            size_bytes = self._numpy_size(name)
+        else:
+            collection = self.client.get_collection(name)
+            count = collection.count()
+            size_bytes = 0
+            if count:
+                sample = collection.get(limit=100, include=["embeddings", "documents"])
+                dim = len(sample["embeddings"][0])
+                avg_text = sum(len(text.encode()) for text in sample["documents"]) / len(sample["documents"])
+                size_bytes = int(count * (dim * 4 + avg_text))
+        with self._registry() as conn:
+            conn.execute("UPDATE collections SET size_bytes = ?, last_access = ? WHERE name = ?", (size_bytes, time.time(), name))
+        return size_bytes
+
+    def release(self, name: str) -> None:
+        """세션이 컬렉션 사용을 마쳤음을 표시합니다. 디스크 예산을 넘으면 먼저 정리 대상이 됩니다."""
+        with self._lock:
+            self._open.discard(name)
+        self.touch(name)
+
+    def drop(self, name: str) -> None:
+        """컬렉션과 레지스트리 항목을 즉시 삭제합니다."""
+        with self._lock:
+            self._open.discard(name)
+            self._last_marked.pop(name, None)
+            if self.backend == "numpy":
+                self._numpy_stores.pop(name, None)
+                if self._numpy_root is not None:
+                    shutil.rmtree(self._numpy_root / name, ignore_errors=True)
+            else:
+                try:
+                    self.client.delete_collection(name)
+                except (ValueError, chromadb.errors.NotFoundError):
+                    pass
+            with self._registry() as conn:
+                conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+
+    def reap(self) -> list[str]:
+        """
+        TTL 이 지났거나 디스크 예산을 넘는 컬렉션을 삭제하고, 삭제한 이름을 반환합니다.
+        세션이 열어 둔 컬렉션은 사용 중이므로 두 경우 모두 지우지 않습니다. (열린 컬렉션만으로 예산을 넘으면 그대로 둡니다)
+        """
+        now = time.time()
+        with self._registry() as conn:
+            rows = conn.execute("SELECT name, size_bytes, last_access FROM collections ORDER BY last_access ASC").fetchall()
+        with self._lock:
+            open_names = set(self._open)
+
+        expired = [name for name, _, last_access in rows if now - last_access > self.ttl_seconds and name not in open_names]
+        remaining = [(name, size) for name, size, _ in rows if name not in expired]
+        total = sum(size for _, size in remaining)
+
+        over_budget = []
+        if total > self.max_disk_bytes:
+            # 열려 있지 않은 컬렉션을 오래된 순으로 지웁니다.
+            for name, size in remaining:
+                if name in open_names:
+                    continue
+                if total <= self.max_disk_bytes:
+                    break
+                over_budget.append(name)
+                total -= size
+
+        evicted = expired + over_budget
+        for name in evicted:
+            self.drop(name)
+        if evicted:
+            logger.info("Reaped %d collections (%d expired, %d over disk budget).", len(evicted), len(expired), len(over_budget))
+        return evicted
+
+    def start_reaper(self) -> None:
+        """`reap_interval_seconds` 마다 reap() 을 실행하는 데몬 스레드를 시작합니다."""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap_loop, name="collection-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self) -> None:
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval_seconds):
+            try:
+                self.reap()
+            except Exception:
+                logger.exception("Collection reaper failed")
+
+    def _is_complete(self, name: str) -> bool:
+        with self._registry() as conn:
+            row = conn.execute("SELECT complete FROM collections WHERE name = ?", (name,)).fetchone()
+        return bool(row and row[0])
+
+    def _find_copy_source(self, doc_key: str, exclude: str) -> str | None:
+        with self._registry() as conn:
+            rows = conn.execute(
+                "SELECT name FROM collections WHERE doc_key = ? AND name != ? AND complete = 1 ORDER BY last_access DESC",
+                (doc_key, exclude),
+            ).fetchall()
+        existing = self._existing_names()
+        return next((name for (name,) in rows if name in existing), None)
+
+    def _vector_store(self, name: str) -> VectorStore:
+        if self.backend == "chroma":
+            return VectorStore(collection_name=name, client=self.client, backend="chroma")
+        if self._numpy_root is not None:
+            return VectorStore(collection_name=name, backend="numpy", path=self._numpy_root / name)
+        # 메모리에만 저장하는 경우 같은 이름이면 같은 인스턴스를 돌려줍니다.
+        if name not in self._numpy_stores:
+            self._numpy_stores[name] = VectorStore(collection_name=name, backend="numpy")
+        return self._numpy_stores[name]
+
+    def _existing_names(self) -> set[str]:
+        if self.backend == "chroma":
+            return {collection.name for collection in self.client.list_collections()}
+        if self._numpy_root is not None:
+            return {path.parent.name for path in self._numpy_root.glob(f"*/{METADATA_FILE}")}
+        return set(self._numpy_stores)
+
+    def _numpy_size(self, name: str) -> int:
+        if self._numpy_root is not None:
+            return sum(path.stat().st_size for path in (self._numpy_root / name).glob("*") if path.is_file())
+        store = self._numpy_stores.get(name)
+        return store.store.nbytes if store is not None else 0
+
+    def _copy_collection(self, source: str, target: VectorStore) -> None:
+        """
+        저장된 벡터를 그대로 복사합니다. (임베딩 재계산 없음, id 순서 유지)
+        `target.add_embeddings` 로 저장하므로 대상의 BM25 역색인과 version 도 함께 갱신됩니다.
+        """
+        if self.backend == "numpy":
+            documents, vectors = self._vector_store(source).get_embeddings()
+            target.add_embeddings(documents, vectors, ids=[doc.id for doc in documents])
+            target.persist()
+            return
+
+        source_collection = self.client.get_collection(source)
+        for offset in range(0, source_collection.count(), _COPY_BATCH):
+            batch = source_collection.get(
+                offset=offset, limit=_COPY_BATCH, include=["embeddings", "documents", "metadatas"]
+            )
+            documents = [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(batch["documents"], batch["metadatas"])
+            ]
+            target.add_embeddings(documents, batch["embeddings"], ids=batch["ids"])
+
+    @contextmanager
+    def _registry(self) -> Iterator[sqlite3.Connection]:
+        """레지스트리 연결. with 블록이 끝나면 commit 하고 닫습니다."""
+        with closing(sqlite3.connect(self._registry_uri, uri=True, timeout=30)) as conn, conn:
+            yield conn
+
+
+@lru_cache(maxsize=1)
+def get_collection_manager() -> CollectionManager:
+    """프로세스 전체에서 공유하는 CollectionManager 를 반환하고 reaper 를 시작합니다."""
+    manager = CollectionManager(VECTOR_STORE_PERSIST_DIRECTORY if VECTOR_STORE_PERSIST_ENABLED else None, backend=VECTOR_STORE_BACKEND)
+    manager.start_reaper()
+    return manager
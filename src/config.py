@@ -86,17 +86,75 @@ LLM_PROVIDER = ACTIVE_PROFILE["llm_provider"]
 LLM_MODEL = ACTIVE_PROFILE["llm_model"]
 EMBEDDING_PROVIDER = ACTIVE_PROFILE["embedding_provider"]
 EMBEDDING_MODEL = ACTIVE_PROFILE["embedding_model"]
+EMBEDDING_DIMENSIONS = ACTIVE_PROFILE.get("embedding_dimensions")
 
 # 데이터 수집(Ingestion) 설정
 INGESTION_CONFIG = CONFIG.get("ingestion", {})
 INGESTION_PARSER = INGESTION_CONFIG.get("parser", "local")
 API_LOADER_CONFIG = INGESTION_CONFIG.get("api_loader", {})
+HYBRID_PARSER_CONFIG = INGESTION_CONFIG.get("hybrid", {})
 
 TEXT_SPLITTER_CONFIG = INGESTION_CONFIG.get("text_splitter", {})
 DEFAULTS_CONFIG = CONFIG.get("defaults", {})
 DEFAULT_TEXT_SPLITTER = DEFAULTS_CONFIG.get("text_splitter", {})
 CHUNK_SIZE = TEXT_SPLITTER_CONFIG.get("chunk_size", DEFAULT_TEXT_SPLITTER.get("chunk_size", 1024))
 CHUNK_OVERLAP = TEXT_SPLITTER_CONFIG.get("chunk_overlap", DEFAULT_TEXT_SPLITTER.get("chunk_overlap", 256))
+TEXT_SPLITTER_TYPE = TEXT_SPLITTER_CONFIG.get("type", DEFAULT_TEXT_SPLITTER.get("type", "recursive"))
+TOKEN_SPLITTER_CONFIG = TEXT_SPLITTER_CONFIG.get("token", {})
+DEFAULT_TOKEN_SPLITTER = DEFAULT_TEXT_SPLITTER.get("token", {})
+TOKEN_SPLITTER_ENCODING = TOKEN_SPLITTER_CONFIG.get("encoding", DEFAULT_TOKEN_SPLITTER.get("encoding", "auto"))
+TOKEN_CHUNK_SIZE = TOKEN_SPLITTER_CONFIG.get("chunk_size", DEFAULT_TOKEN_SPLITTER.get("chunk_size", 512))
+TOKEN_CHUNK_OVERLAP = TOKEN_SPLITTER_CONFIG.get("chunk_overlap", DEFAULT_TOKEN_SPLITTER.get("chunk_overlap", 64))
+
+DEFAULT_INGESTION = DEFAULTS_CONFIG.get("ingestion", {})
+
+# 페이지 병렬 파싱 설정
+INGESTION_PARALLEL_CONFIG = INGESTION_CONFIG.get("parallel", {})
+DEFAULT_INGESTION_PARALLEL = DEFAULT_INGESTION.get("parallel", {})
+INGESTION_PARALLEL_ENABLED = INGESTION_PARALLEL_CONFIG.get("enabled", DEFAULT_INGESTION_PARALLEL.get("enabled", False))
+INGESTION_PARALLEL_MAX_WORKERS = INGESTION_PARALLEL_CONFIG.get("max_workers", DEFAULT_INGESTION_PARALLEL.get("max_workers", None))
+INGESTION_PARALLEL_PAGES_PER_TASK = INGESTION_PARALLEL_CONFIG.get("pages_per_task", DEFAULT_INGESTION_PARALLEL.get("pages_per_task", 8))
+
+# 스트리밍 수집 설정
+INGESTION_STREAMING_CONFIG = INGESTION_CONFIG.get("streaming", {})
+DEFAULT_INGESTION_STREAMING = DEFAULT_INGESTION.get("streaming", {})
+INGESTION_STREAMING_BATCH_SIZE = INGESTION_STREAMING_CONFIG.get("batch_size", DEFAULT_INGESTION_STREAMING.get("batch_size", 64))
+INGESTION_STREAMING_MAX_INFLIGHT = INGESTION_STREAMING_CONFIG.get("max_inflight_batches", DEFAULT_INGESTION_STREAMING.get("max_inflight_batches", 2))
+
+# Upstage Document Parse 동시 요청 클라이언트 설정
+API_CLIENT_CONFIG = INGESTION_CONFIG.get("api_client", {})
+DEFAULT_API_CLIENT = DEFAULT_INGESTION.get("api_client", {})
+API_CLIENT_ENABLED = API_CLIENT_CONFIG.get("enabled", DEFAULT_API_CLIENT.get("enabled", False))
+API_CLIENT_BASE_URL = API_CLIENT_CONFIG.get("base_url", DEFAULT_API_CLIENT.get("base_url", "https://api.upstage.ai/v1/document-digitization"))
+API_CLIENT_PAGES_PER_REQUEST = API_CLIENT_CONFIG.get("pages_per_request", DEFAULT_API_CLIENT.get("pages_per_request", 10))
+API_CLIENT_MAX_WORKERS = API_CLIENT_CONFIG.get("max_workers", DEFAULT_API_CLIENT.get("max_workers", 4))
+API_CLIENT_REQUESTS_PER_SECOND = API_CLIENT_CONFIG.get("requests_per_second", DEFAULT_API_CLIENT.get("requests_per_second", 2))
+API_CLIENT_MAX_RETRIES = API_CLIENT_CONFIG.get("max_retries", DEFAULT_API_CLIENT.get("max_retries", 5))
+API_CLIENT_BACKOFF_BASE = API_CLIENT_CONFIG.get("backoff_base", DEFAULT_API_CLIENT.get("backoff_base", 1.0))
+API_CLIENT_TIMEOUT = API_CLIENT_CONFIG.get("timeout", DEFAULT_API_CLIENT.get("timeout", 120))
+_api_client_cache_dir = API_CLIENT_CONFIG.get("cache_dir", DEFAULT_API_CLIENT.get("cache_dir", None))
+API_CLIENT_CACHE_DIR = DATA_DIR / _api_client_cache_dir if _api_client_cache_dir else None
+
+# 중복 제거 설정
+INGESTION_DEDUP_CONFIG = INGESTION_CONFIG.get("dedup", {})
+DEFAULT_INGESTION_DEDUP = DEFAULT_INGESTION.get("dedup", {})
+INGESTION_DEDUP_ENABLED = INGESTION_DEDUP_CONFIG.get("enabled", DEFAULT_INGESTION_DEDUP.get("enabled", False))
+INGESTION_DEDUP_MIN_PAGES = INGESTION_DEDUP_CONFIG.get("boilerplate_min_pages", DEFAULT_INGESTION_DEDUP.get("boilerplate_min_pages", 3))
+INGESTION_DEDUP_THRESHOLD = INGESTION_DEDUP_CONFIG.get("similarity_threshold", DEFAULT_INGESTION_DEDUP.get("similarity_threshold", 0.85))
+INGESTION_DEDUP_NUM_PERM = INGESTION_DEDUP_CONFIG.get("num_perm", DEFAULT_INGESTION_DEDUP.get("num_perm", 128))
+INGESTION_DEDUP_SHINGLE_SIZE = INGESTION_DEDUP_CONFIG.get("shingle_size", DEFAULT_INGESTION_DEDUP.get("shingle_size", 5))
+
+# 여러 파일 동시 수집 설정
+INGESTION_BATCH_CONFIG = INGESTION_CONFIG.get("batch", {})
+DEFAULT_INGESTION_BATCH = DEFAULT_INGESTION.get("batch", {})
+INGESTION_BATCH_MAX_WORKERS = INGESTION_BATCH_CONFIG.get("max_workers", DEFAULT_INGESTION_BATCH.get("max_workers", 3))
+
+# 수집 결과 캐시 설정
+INGESTION_CACHE_CONFIG = INGESTION_CONFIG.get("cache", {})
+DEFAULT_INGESTION_CACHE = DEFAULT_INGESTION.get("cache", {})
+INGESTION_CACHE_ENABLED = INGESTION_CACHE_CONFIG.get("enabled", DEFAULT_INGESTION_CACHE.get("enabled", False))
+INGESTION_CACHE_PATH = DATA_DIR / INGESTION_CACHE_CONFIG.get("path", DEFAULT_INGESTION_CACHE.get("path", "cache/ingestion.sqlite3"))
+INGESTION_CACHE_MAX_BYTES = int(INGESTION_CACHE_CONFIG.get("max_size_mb", DEFAULT_INGESTION_CACHE.get("max_size_mb", 1024)) * 1024 * 1024)
 
 # 벡터 저장소 설정
 VECTOR_STORE_CONFIG = CONFIG.get("vector_store", {})
@@ -104,10 +162,71 @@ DEFAULT_VECTOR_STORE = DEFAULTS_CONFIG.get("vector_store", {})
 COLLECTION_NAME = VECTOR_STORE_CONFIG.get("collection_name", DEFAULT_VECTOR_STORE.get("collection_name", "default_collection"))
 SEARCH_TYPE = VECTOR_STORE_CONFIG.get("search_type", DEFAULT_VECTOR_STORE.get("search_type", "similarity"))
 SEARCH_KWARGS = VECTOR_STORE_CONFIG.get("search_kwargs", DEFAULT_VECTOR_STORE.get("search_kwargs", {"k": 5}))
+MMR_CONFIG = VECTOR_STORE_CONFIG.get("mmr", {})
+DEFAULT_MMR = DEFAULT_VECTOR_STORE.get("mmr", {})
+MMR_IN_MEMORY = MMR_CONFIG.get("in_memory", DEFAULT_MMR.get("in_memory", False))
+MMR_FETCH_K = MMR_CONFIG.get("fetch_k", DEFAULT_MMR.get("fetch_k", 20))
+MMR_LAMBDA_MULT = MMR_CONFIG.get("lambda_mult", DEFAULT_MMR.get("lambda_mult", 0.5))
+RETRIEVAL_MODE = VECTOR_STORE_CONFIG.get("retrieval_mode", DEFAULT_VECTOR_STORE.get("retrieval_mode", "dense"))
+LEXICAL_CONFIG = VECTOR_STORE_CONFIG.get("lexical", {})
+DEFAULT_LEXICAL = DEFAULT_VECTOR_STORE.get("lexical", {})
+LEXICAL_NGRAM = LEXICAL_CONFIG.get("ngram", DEFAULT_LEXICAL.get("ngram", 2))
+LEXICAL_K1 = LEXICAL_CONFIG.get("k1", DEFAULT_LEXICAL.get("k1", 1.5))
+LEXICAL_B = LEXICAL_CONFIG.get("b", DEFAULT_LEXICAL.get("b", 0.75))
+LEXICAL_FETCH_K = LEXICAL_CONFIG.get("fetch_k", DEFAULT_LEXICAL.get("fetch_k", 20))
+LEXICAL_RRF_K = LEXICAL_CONFIG.get("rrf_k", DEFAULT_LEXICAL.get("rrf_k", 60))
+QUERY_CACHE_CONFIG = VECTOR_STORE_CONFIG.get("query_cache", {})
+DEFAULT_QUERY_CACHE = DEFAULT_VECTOR_STORE.get("query_cache", {})
+QUERY_CACHE_ENABLED = QUERY_CACHE_CONFIG.get("enabled", DEFAULT_QUERY_CACHE.get("enabled", False))
+QUERY_CACHE_MAX_ENTRIES = QUERY_CACHE_CONFIG.get("max_entries", DEFAULT_QUERY_CACHE.get("max_entries", 128))
+VECTOR_STORE_BACKEND = VECTOR_STORE_CONFIG.get("backend", DEFAULT_VECTOR_STORE.get("backend", "chroma"))
+VECTOR_STORE_NUMPY_DTYPE = VECTOR_STORE_CONFIG.get("numpy_dtype", DEFAULT_VECTOR_STORE.get("numpy_dtype", "float32"))
+VECTOR_STORE_QUANTIZATION = VECTOR_STORE_CONFIG.get("numpy_quantization", DEFAULT_VECTOR_STORE.get("numpy_quantization", "none"))
+VECTOR_STORE_RERANK_FACTOR = VECTOR_STORE_CONFIG.get("rerank_factor", DEFAULT_VECTOR_STORE.get("rerank_factor", 4))
+
+# 컬렉션 저장/정리 설정
+VECTOR_STORE_PERSIST_CONFIG = VECTOR_STORE_CONFIG.get("persistence", {})
+DEFAULT_VECTOR_STORE_PERSIST = DEFAULT_VECTOR_STORE.get("persistence", {})
+VECTOR_STORE_PERSIST_ENABLED = VECTOR_STORE_PERSIST_CONFIG.get("enabled", DEFAULT_VECTOR_STORE_PERSIST.get("enabled", False))
+VECTOR_STORE_PERSIST_DIRECTORY = DATA_DIR / VECTOR_STORE_PERSIST_CONFIG.get("directory", DEFAULT_VECTOR_STORE_PERSIST.get("directory", "chroma"))
+VECTOR_STORE_TTL_SECONDS = VECTOR_STORE_PERSIST_CONFIG.get("ttl_hours", DEFAULT_VECTOR_STORE_PERSIST.get("ttl_hours", 24)) * 3600
+VECTOR_STORE_MAX_DISK_BYTES = int(VECTOR_STORE_PERSIST_CONFIG.get("max_disk_mb", DEFAULT_VECTOR_STORE_PERSIST.get("max_disk_mb", 2048)) * 1024 * 1024)
+VECTOR_STORE_REAP_INTERVAL_SECONDS = VECTOR_STORE_PERSIST_CONFIG.get("reap_interval_seconds", DEFAULT_VECTOR_STORE_PERSIST.get("reap_interval_seconds", 300))
+
+# 로컬 임베딩 실행 설정
+LOCAL_EMBEDDING_CONFIG = VECTOR_STORE_CONFIG.get("local_embedding", {})
+DEFAULT_LOCAL_EMBEDDING = DEFAULT_VECTOR_STORE.get("local_embedding", {})
+LOCAL_EMBEDDING_DEVICE = LOCAL_EMBEDDING_CONFIG.get("device", DEFAULT_LOCAL_EMBEDDING.get("device", "auto"))
+LOCAL_EMBEDDING_BATCH_SIZE = LOCAL_EMBEDDING_CONFIG.get("batch_size", DEFAULT_LOCAL_EMBEDDING.get("batch_size", 32))
+LOCAL_EMBEDDING_CPU_THREADS = LOCAL_EMBEDDING_CONFIG.get("cpu_threads", DEFAULT_LOCAL_EMBEDDING.get("cpu_threads", None))
+LOCAL_EMBEDDING_BACKEND = LOCAL_EMBEDDING_CONFIG.get("backend", DEFAULT_LOCAL_EMBEDDING.get("backend", "torch"))
+LOCAL_EMBEDDING_QUANTIZE = LOCAL_EMBEDDING_CONFIG.get("quantize", DEFAULT_LOCAL_EMBEDDING.get("quantize", False))
+LOCAL_EMBEDDING_ONNX_CACHE_DIR = DATA_DIR / LOCAL_EMBEDDING_CONFIG.get("onnx_cache_dir", DEFAULT_LOCAL_EMBEDDING.get("onnx_cache_dir", "cache/onnx"))
+
+# 임베딩 요청 배치/속도 제한 설정
+EMBEDDING_BATCH_CONFIG = VECTOR_STORE_CONFIG.get("embedding_batch", {})
+DEFAULT_EMBEDDING_BATCH = DEFAULT_VECTOR_STORE.get("embedding_batch", {})
+EMBEDDING_BATCH_MAX_TOKENS = EMBEDDING_BATCH_CONFIG.get("max_batch_tokens", DEFAULT_EMBEDDING_BATCH.get("max_batch_tokens", 100000))
+EMBEDDING_BATCH_MAX_SIZE = EMBEDDING_BATCH_CONFIG.get("max_batch_size", DEFAULT_EMBEDDING_BATCH.get("max_batch_size", 256))
+EMBEDDING_BATCH_MAX_CONCURRENCY = EMBEDDING_BATCH_CONFIG.get("max_concurrency", DEFAULT_EMBEDDING_BATCH.get("max_concurrency", 4))
+EMBEDDING_REQUESTS_PER_MINUTE = EMBEDDING_BATCH_CONFIG.get("requests_per_minute", DEFAULT_EMBEDDING_BATCH.get("requests_per_minute", 3000))
+EMBEDDING_TOKENS_PER_MINUTE = EMBEDDING_BATCH_CONFIG.get("tokens_per_minute", DEFAULT_EMBEDDING_BATCH.get("tokens_per_minute", 1000000))
+EMBEDDING_MAX_RETRIES = EMBEDDING_BATCH_CONFIG.get("max_retries", DEFAULT_EMBEDDING_BATCH.get("max_retries", 6))
+EMBEDDING_BACKOFF_BASE = EMBEDDING_BATCH_CONFIG.get("backoff_base", DEFAULT_EMBEDDING_BATCH.get("backoff_base", 1.0))
+
+# 임베딩 캐시 설정
+EMBEDDING_CACHE_CONFIG = VECTOR_STORE_CONFIG.get("embedding_cache", {})
+DEFAULT_EMBEDDING_CACHE = DEFAULT_VECTOR_STORE.get("embedding_cache", {})
+EMBEDDING_CACHE_ENABLED = EMBEDDING_CACHE_CONFIG.get("enabled", DEFAULT_EMBEDDING_CACHE.get("enabled", False))
+EMBEDDING_CACHE_PATH = DATA_DIR / EMBEDDING_CACHE_CONFIG.get("path", DEFAULT_EMBEDDING_CACHE.get("path", "cache/embeddings.sqlite3"))
+EMBEDDING_CACHE_MAX_ENTRIES = EMBEDDING_CACHE_CONFIG.get("max_entries", DEFAULT_EMBEDDING_CACHE.get("max_entries", 200000))
 
 # 프롬프트 설정
 DRAFT_PROMPT_TEMPLATE = PROMPTS.get("draft_prompt", "")
 UPDATE_PROMPT_TEMPLATE = PROMPTS.get("update_prompt", "")
+SECTION_SUMMARY_PROMPT_TEMPLATE = PROMPTS.get("section_summary_prompt", "")
+HISTORY_SUMMARY_PROMPT_TEMPLATE = PROMPTS.get("history_summary_prompt", "")
+PATCH_EDIT_PROMPT_TEMPLATE = PROMPTS.get("patch_edit_prompt", "")
 
 # --- 에이전트 설정 ---
 AGENT_CONFIG = CONFIG.get("agent", {})
@@ -117,6 +236,25 @@ TAVILY_CONFIG = AGENT_CONFIG.get("tavily", {})
 DEFAULT_TAVILY = DEFAULT_AGENT.get("tavily", {})
 TAVILY_MAX_RESULTS = TAVILY_CONFIG.get("max_results", DEFAULT_TAVILY.get("max_results", 3))
 TAVILY_SIMILARITY_THRESHOLD = TAVILY_CONFIG.get("similarity_threshold", DEFAULT_TAVILY.get("similarity_threshold", 0.9))
+SEARCH_CACHE_CONFIG = TAVILY_CONFIG.get("cache", {})
+DEFAULT_SEARCH_CACHE = DEFAULT_TAVILY.get("cache", {})
+SEARCH_CACHE_ENABLED = SEARCH_CACHE_CONFIG.get("enabled", DEFAULT_SEARCH_CACHE.get("enabled", False))
+SEARCH_CACHE_PATH = DATA_DIR / SEARCH_CACHE_CONFIG.get("path", DEFAULT_SEARCH_CACHE.get("path", "cache/search.sqlite3"))
+SEARCH_CACHE_MAX_ENTRIES = SEARCH_CACHE_CONFIG.get("max_entries", DEFAULT_SEARCH_CACHE.get("max_entries", 10000))
+SEARCH_CACHE_TTL_SECONDS = SEARCH_CACHE_CONFIG.get("ttl_hours", DEFAULT_SEARCH_CACHE.get("ttl_hours", 168)) * 3600
+SEARCH_CACHE_CANDIDATE_THRESHOLD = SEARCH_CACHE_CONFIG.get("candidate_threshold", DEFAULT_SEARCH_CACHE.get("candidate_threshold", 0.3))
+
+AGENT_STREAMING = AGENT_CONFIG.get("streaming", DEFAULT_AGENT.get("streaming", False))
+AGENT_PATCH_EDITS = AGENT_CONFIG.get("patch_edits", DEFAULT_AGENT.get("patch_edits", False))
+# 큰 문서의 map-reduce 초안 생성 설정
+DRAFT_CONFIG = AGENT_CONFIG.get("draft", {})
+DEFAULT_DRAFT = DEFAULT_AGENT.get("draft", {})
+DRAFT_MODE = DRAFT_CONFIG.get("mode", DEFAULT_DRAFT.get("mode", "single"))
+DRAFT_MAP_REDUCE_THRESHOLD_TOKENS = DRAFT_CONFIG.get("map_reduce_threshold_tokens", DEFAULT_DRAFT.get("map_reduce_threshold_tokens", 60000))
+DRAFT_SECTION_TOKENS = DRAFT_CONFIG.get("section_tokens", DEFAULT_DRAFT.get("section_tokens", 8000))
+DRAFT_MAX_CONCURRENCY = DRAFT_CONFIG.get("max_concurrency", DEFAULT_DRAFT.get("max_concurrency", 4))
+
+TOOL_TIMEOUTS = AGENT_CONFIG.get("tool_timeouts", DEFAULT_AGENT.get("tool_timeouts", {"default": 30}))
 
 RETRIEVER_TOOL_CONFIG = AGENT_CONFIG.get("retriever_tool", {})
 DEFAULT_RETRIEVER_TOOL = DEFAULT_AGENT.get("retriever_tool", {})
@@ -130,4 +268,15 @@ HISTORY_STRATEGY = AGENT_CONFIG.get("history_strategy", DEFAULT_AGENT.get("histo
 # LLM specific agent config
 AGENT_LLM_CONFIG = AGENT_CONFIG.get("llm", {})
 DEFAULT_AGENT_LLM = DEFAULT_AGENT.get("llm", {})
-AGENT_LLM_MAX_TOKENS = AGENT_LLM_CONFIG.get("max_tokens", DEFAULT_AGENT_LLM.get("max_tokens", None))
\ No newline at end of file
+AGENT_LLM_MAX_TOKENS = AGENT_LLM_CONFIG.get("max_tokens", DEFAULT_AGENT_LLM.get("max_tokens", None))
+LLM_CACHE_CONFIG = AGENT_LLM_CONFIG.get("cache", {})
+DEFAULT_LLM_CACHE = DEFAULT_AGENT_LLM.get("cache", {})
+LLM_CACHE_ENABLED = LLM_CACHE_CONFIG.get("enabled", DEFAULT_LLM_CACHE.get("enabled", False))
+LLM_CACHE_PATH = DATA_DIR / LLM_CACHE_CONFIG.get("path", DEFAULT_LLM_CACHE.get("path", "cache/llm.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = LLM_CACHE_CONFIG.get("max_entries", DEFAULT_LLM_CACHE.get("max_entries", 5000))
+LLM_CACHE_MAX_BYTES = LLM_CACHE_CONFIG.get("max_mb", DEFAULT_LLM_CACHE.get("max_mb", 200)) * 2**20
+LLM_CACHE_TTL_SECONDS = LLM_CACHE_CONFIG.get("ttl_hours", DEFAULT_LLM_CACHE.get("ttl_hours", 720)) * 3600
+LLM_CACHE_SEMANTIC_CONFIG = LLM_CACHE_CONFIG.get("semantic", {})
+DEFAULT_LLM_CACHE_SEMANTIC = DEFAULT_LLM_CACHE.get("semantic", {})
+LLM_CACHE_SEMANTIC_ENABLED = LLM_CACHE_SEMANTIC_CONFIG.get("enabled", DEFAULT_LLM_CACHE_SEMANTIC.get("enabled", False))
+LLM_CACHE_SEMANTIC_THRESHOLD = LLM_CACHE_SEMANTIC_CONFIG.get("similarity_threshold", DEFAULT_LLM_CACHE_SEMANTIC.get("similarity_threshold", 0.95))
\ No newline at end of file
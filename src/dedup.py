@@ -0,0 +1,109 @@
+# src/dedup.py
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+from src.minhash import MinHasher, MinHashLSH, normalize_text
+from src.tokenizer import Tokenizer, get_tokenizer
+
+
+# 페이지 번호처럼 페이지마다 달라지는 숫자는 같은 줄로 취급합니다. (예: "- 3 -", "12 / 40", "Page 7")
+# 본문 줄의 숫자까지 무시하면 안 되므로 짧은 줄에만 적용합니다.
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER_LINE_MAX_CHARS = 20
+
+
+def _line_key(line: str) -> str:
+    key = normalize_text(line)
+    return _DIGITS.sub("#", key) if len(key) <= _PAGE_NUMBER_LINE_MAX_CHARS else key
+
+
+@dataclass
+class DedupStats:
+    """중복 제거 결과 통계."""
+
+    chunks_in: int = 0
+    chunks_dropped: int = 0
+    lines_stripped: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def chunks_kept(self) -> int:
+        return self.chunks_in - self.chunks_dropped
+
+
+class ChunkDeduplicator:
+    """
+    임베딩 전에 반복되는 머리말/꼬리말 줄과 거의 같은 청크를 제거합니다.
+
+    1. `strip_boilerplate(page)`: 앞선 페이지들 중 `boilerplate_min_pages` 개 이상에서 이미 나온 줄
+       (숫자만 다른 짧은 줄 포함)을 지웁니다. 페이지를 순서대로 한 번만 보므로 스트리밍 수집에서도 쓸 수 있고,
+       처음 몇 페이지의 머리말은 남지만 이후 페이지에서는 모두 제거됩니다.
+    2. `filter_chunks(chunks)`: 이미 받은 청크와 MinHash 로 추정한 Jaccard 유사도가
+       `similarity_threshold` 이상인 청크를 버립니다. (LSH 로 후보만 비교)
+
+    한 문서(파일) 단위로 상태를 가지므로 문서마다 새 인스턴스를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        boilerplate_min_pages: int = 3,
+        similarity_threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        tokenizer: Tokenizer | None = None,
+    ):
+        self.boilerplate_min_pages = boilerplate_min_pages
+        self.similarity_threshold = similarity_threshold
+        self.stats = DedupStats()
+        self._tokenizer = tokenizer
+        self._hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self._index = MinHashLSH(num_perm=num_perm)
+        # 정규화한 줄 -> 그 줄이 나온 페이지 수
+        self._line_pages: defaultdict[str, int] = defaultdict(int)
+
+    def strip_boilerplate(self, page: Document) -> Document:
+        """앞 페이지들에서 반복된 줄을 지운 페이지를 반환합니다."""
+        lines = page.page_content.splitlines()
+        kept, stripped = [], []
+        for line in lines:
+            key = _line_key(line)
+            if key and self._line_pages[key] >= self.boilerplate_min_pages:
+                stripped.append(line)
+            else:
+                kept.append(line)
+
+        for key in {_line_key(line) for line in lines} - {""}:
+            self._line_pages[key] += 1
+
+        if not stripped:
+            return page
+        self.stats.lines_stripped += len(stripped)
+        self.stats.tokens_saved += self._count_tokens("\n".join(stripped))
+        return Document(page_content="\n".join(kept), metadata=page.metadata)
+
+    def filter_chunks(self, chunks: list[Document]) -> list[Document]:
+        """빈 청크와 이미 본 청크의 근접 중복을 제외한 청크 목록을 반환합니다."""
+        kept = []
+        for chunk in chunks:
+            self.stats.chunks_in += 1
+            if not chunk.page_content.strip():
+                self.stats.chunks_dropped += 1
+                continue
+
+            signature = self._hasher.signature(chunk.page_content)
+            if self._index.query(signature, self.similarity_threshold):
+                self.stats.chunks_dropped += 1
+                self.stats.tokens_saved += self._count_tokens(chunk.page_content)
+                continue
+
+            self._index.insert(len(self._index), signature)
+            kept.append(chunk)
+        return kept
+
+    def _count_tokens(self, text: str) -> int:
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer()
+        return self._tokenizer.count(text)
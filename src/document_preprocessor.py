@@ -1,58 +1,240 @@
 # src/document_preprocessor.py
+import tempfile
+from collections.abc import Iterator
+from functools import lru_cache, partial
 from pathlib import Path
+
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
 
-# Import all three loaders from their correct locations
+# Import the API and unstructured loaders from their correct locations
 from langchain_upstage.document_parse import UpstageDocumentParseLoader
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_unstructured import UnstructuredLoader 
+from langchain_unstructured import UnstructuredLoader
 
 # Import config values
 from src.config import (
-    INGESTION_PARSER, 
-    UPSTAGE_API_KEY, 
+    INGESTION_PARSER,
+    UPSTAGE_API_KEY,
     API_LOADER_CONFIG,
+    API_CLIENT_ENABLED,
+    API_CLIENT_BASE_URL,
+    API_CLIENT_PAGES_PER_REQUEST,
+    API_CLIENT_MAX_WORKERS,
+    API_CLIENT_REQUESTS_PER_SECOND,
+    API_CLIENT_MAX_RETRIES,
+    API_CLIENT_BACKOFF_BASE,
+    API_CLIENT_TIMEOUT,
+    API_CLIENT_CACHE_DIR,
+    HYBRID_PARSER_CONFIG,
     CHUNK_SIZE,
-    CHUNK_OVERLAP
+    CHUNK_OVERLAP,
+    TEXT_SPLITTER_TYPE,
+    TOKEN_CHUNK_OVERLAP,
+    TOKEN_CHUNK_SIZE,
+    TOKEN_SPLITTER_ENCODING,
+    INGESTION_PARALLEL_ENABLED,
+    INGESTION_PARALLEL_MAX_WORKERS,
+    INGESTION_PARALLEL_PAGES_PER_TASK,
+    INGESTION_DEDUP_ENABLED,
+    INGESTION_DEDUP_MIN_PAGES,
+    INGESTION_DEDUP_THRESHOLD,
+    INGESTION_DEDUP_NUM_PERM,
+    INGESTION_DEDUP_SHINGLE_SIZE,
 )
+from src.dedup import ChunkDeduplicator, DedupStats
+from src.hybrid_parser import HybridPDFLoader
+from src.parallel_parser import load_pdf_parallel
+from src.pdf_loader import PDFSource, PyMuPDFPageLoader, as_buffer, is_in_memory, open_pdf
+from src.text_splitter import PageAwareTokenSplitter
+from src.upstage_client import UpstageConcurrentLoader, UpstageParseClient
+
+# 페이지 병렬 파싱을 지원하는 파서
+PARALLEL_PARSERS = ("local", "unstructured", "hybrid")
+# 파일 경로 없이 메모리 버퍼에서 바로 파싱할 수 있는 파서
+IN_MEMORY_PARSERS = ("local", "hybrid", "api") if API_CLIENT_ENABLED else ("local", "hybrid")
+
+
+@lru_cache(maxsize=1)
+def get_upstage_client() -> UpstageParseClient:
+    """
+    프로세스 전체에서 공유하는 Document Parse 클라이언트를 반환합니다.
+    여러 파일을 동시에 수집해도 하나의 속도 제한을 함께 쓰도록 재사용합니다.
+    """
+    return UpstageParseClient(
+        api_key=UPSTAGE_API_KEY,
+        base_url=API_CLIENT_BASE_URL,
+        output_format=API_LOADER_CONFIG.get("output_format", "markdown"),
+        pages_per_request=API_CLIENT_PAGES_PER_REQUEST,
+        max_workers=API_CLIENT_MAX_WORKERS,
+        requests_per_second=API_CLIENT_REQUESTS_PER_SECOND,
+        max_retries=API_CLIENT_MAX_RETRIES,
+        backoff_base=API_CLIENT_BACKOFF_BASE,
+        timeout=API_CLIENT_TIMEOUT,
+        cache_dir=API_CLIENT_CACHE_DIR,
+    )
+
+
+def create_loader(parser_type: str, source: PDFSource, source_name: str | None = None) -> BaseLoader:
+    """
+    파서 종류에 맞는 문서 로더를 생성합니다. (병렬 파싱 워커에서도 사용됩니다.)
+    IN_MEMORY_PARSERS 에 속한 파서는 경로와 메모리 버퍼를 모두 받고, 나머지 파서는 파일 경로가 필요합니다.
+    """
+    if parser_type == "api":
+        if API_CLIENT_ENABLED:
+            # 페이지 구간을 동시에 요청하고 응답을 디스크에 캐시합니다.
+            return UpstageConcurrentLoader(source, get_upstage_client(), source_name)
+        return UpstageDocumentParseLoader(
+            str(source),
+            api_key=UPSTAGE_API_KEY,
+            **API_LOADER_CONFIG
+        )
+    if parser_type == "unstructured":
+        # --- FIX: Specify the language for better OCR accuracy ---
+        return UnstructuredLoader(
+            file_path=str(source),
+            mode="paged",
+            strategy="hi_res",
+            languages=["kor"] # Specify Korean language pack for Tesseract
+        )
+    if parser_type == "hybrid":
+        # 텍스트 레이어가 없는 페이지만 OCR 합니다.
+        return HybridPDFLoader(source, source_name, **HYBRID_PARSER_CONFIG)
+    # Default to "local" (PyMuPDF)
+    return PyMuPDFPageLoader(source, source_name)
+
+
+def create_text_splitter(splitter_type: str = TEXT_SPLITTER_TYPE) -> TextSplitter:
+    """설정된 텍스트 분할기를 생성합니다."""
+    if splitter_type == "token":
+        # 토큰 수 기준으로 자르고 페이지/제목 경계를 지킵니다.
+        return PageAwareTokenSplitter(
+            chunk_size=TOKEN_CHUNK_SIZE,
+            chunk_overlap=TOKEN_CHUNK_OVERLAP,
+            encoding=TOKEN_SPLITTER_ENCODING,
+        )
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+
+
+def create_deduplicator(splitter: TextSplitter) -> ChunkDeduplicator:
+    """설정된 중복 제거기를 생성합니다. 토큰 분할기를 쓰면 절약한 토큰도 같은 토크나이저로 셉니다."""
+    return ChunkDeduplicator(
+        boilerplate_min_pages=INGESTION_DEDUP_MIN_PAGES,
+        similarity_threshold=INGESTION_DEDUP_THRESHOLD,
+        num_perm=INGESTION_DEDUP_NUM_PERM,
+        shingle_size=INGESTION_DEDUP_SHINGLE_SIZE,
+        tokenizer=getattr(splitter, "tokenizer", None),
+    )
+
 
 class DocumentPreprocessor:
-    def __init__(self, filepath: Path):
-        self.filepath = filepath
+    """
+    PDF 를 파싱하고 청크로 분할합니다.
+
+    `source` 는 파일 경로 또는 bytes / memoryview / mmap 입니다. 메모리 버퍼로 주어지면
+    PyMuPDF 가 버퍼를 직접 읽고, 경로가 꼭 필요한 경우(api/unstructured 파서, 병렬 파싱)에만
+    임시 파일을 만들어 `close()` 에서 삭제합니다.
+    """
+
+    def __init__(self, source: PDFSource, filename: str | None = None):
+        self.source = source
+        self.filename = filename or (Path(source).name if not is_in_memory(source) else "document.pdf")
         self.parser_type = INGESTION_PARSER
-        
-        if self.parser_type == "api":
-            self.loader = UpstageDocumentParseLoader(
-                str(self.filepath), 
-                api_key=UPSTAGE_API_KEY, 
-                **API_LOADER_CONFIG
-            )
-        elif self.parser_type == "unstructured":
-            # --- FIX: Specify the language for better OCR accuracy ---
-            self.loader = UnstructuredLoader(
-                file_path=str(self.filepath), 
-                mode="paged",
-                strategy="hi_res",
-                languages=["kor"] # Specify Korean language pack for Tesseract
-            )
-        else: # Default to "local" (PyMuPDF)
-            self.loader = PyMuPDFLoader(str(self.filepath))
+        self._temp_path: Path | None = None
+
+        loader_source = source if self.parser_type in IN_MEMORY_PARSERS else self.filepath
+        self.loader = create_loader(self.parser_type, loader_source, self.filename)
+        # "hybrid" 파서가 페이지별로 선택한 파싱 경로 ({page: "text" | "ocr"})
+        self.page_routes: dict[int, str] = {}
 
         # Use the imported config values for the splitter
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE, 
-            chunk_overlap=CHUNK_OVERLAP
-        )
+        self.splitter = create_text_splitter()
+        self.deduplicator = create_deduplicator(self.splitter) if INGESTION_DEDUP_ENABLED else None
+
+    def __enter__(self) -> "DocumentPreprocessor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def filepath(self) -> Path:
+        """파일 경로. 메모리 버퍼로 받은 경우 처음 요청될 때 임시 파일을 만듭니다."""
+        if not is_in_memory(self.source):
+            return Path(self.source)
+        if self._temp_path is None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+                temp_file.write(as_buffer(self.source))
+                self._temp_path = Path(temp_file.name)
+        return self._temp_path
+
+    def close(self) -> None:
+        """임시 파일을 만들었다면 삭제합니다."""
+        if self._temp_path is not None and self._temp_path.exists():
+            self._temp_path.unlink()
+        self._temp_path = None
 
     def process(self) -> list[Document]:
-        documents = self.loader.load()
-        
+        return list(self.iter_chunks())
+
+    def load(self) -> list[Document]:
+        """문서를 페이지 단위로 로드합니다. 설정에 따라 페이지 병렬 파싱을 사용합니다."""
+        return list(self.iter_pages())
+
+    def iter_pages(self) -> Iterator[Document]:
+        """
+        문서를 페이지 단위로 하나씩 반환합니다.
+        loader 의 lazy_load 와 병렬 파싱 모두 페이지를 순서대로 흘려보내므로 전체 페이지를 메모리에 올리지 않습니다.
+        """
+        self.page_routes = {}
+        if self.deduplicator is not None:
+            self.deduplicator = create_deduplicator(self.splitter)
+        if INGESTION_PARALLEL_ENABLED and self.parser_type in PARALLEL_PARSERS:
+            pages = load_pdf_parallel(
+                self.filepath,
+                partial(create_loader, self.parser_type),
+                max_workers=INGESTION_PARALLEL_MAX_WORKERS,
+                pages_per_task=INGESTION_PARALLEL_PAGES_PER_TASK,
+                source_name=self.filename if is_in_memory(self.source) else None,
+            )
+        else:
+            pages = self.loader.lazy_load()
+
+        for page in pages:
+            if "parse_route" in page.metadata:
+                self.page_routes[page.metadata["page"]] = page.metadata["parse_route"]
+            yield page
+
+    def iter_chunks(self) -> Iterator[Document]:
+        """페이지를 읽는 즉시 분할하여 청크를 하나씩 반환합니다."""
+        for page in self.iter_pages():
+            yield from self.split_page(page)
+
+    def split_page(self, page: Document) -> list[Document]:
+        """한 페이지를 청크로 분할합니다. 중복 제거가 켜져 있으면 반복 문구와 근접 중복 청크를 뺍니다."""
         if self.parser_type == "api":
-            sanitized_docs = [self._sanitize_doc(doc) for doc in documents]
-            return self.splitter.split_documents(sanitized_docs)
-        
-        return self.splitter.split_documents(documents)
+            page = self._sanitize_doc(page)
+        if self.deduplicator is None:
+            return self.splitter.split_documents([page])
+        page = self.deduplicator.strip_boilerplate(page)
+        return self.deduplicator.filter_chunks(self.splitter.split_documents([page]))
+
+    @property
+    def dedup_stats(self) -> DedupStats | None:
+        """중복 제거 통계. 중복 제거가 꺼져 있으면 None."""
+        return self.deduplicator.stats if self.deduplicator is not None else None
+
+    @property
+    def page_count(self) -> int | None:
+        """PDF 의 전체 페이지 수. 알 수 없으면 None."""
+        try:
+            with open_pdf(self.source) as pdf:
+                return pdf.page_count
+        except (RuntimeError, OSError):
+            return None
 
     @staticmethod
     def _sanitize_doc(doc: Document) -> Document:
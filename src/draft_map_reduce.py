@@ -0,0 +1,189 @@
+# src/draft_map_reduce.py
+import time
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.config import LLM_MODEL
+from src.logger import get_logger
+from src.tokenizer import Tokenizer, get_tokenizer_for_model
+
+
+logger = get_logger(__name__)
+
+# 구간 요약 호출에 붙이는 태그 (스트리밍에서 최종 초안 토큰과 구분)
+MAP_STAGE_TAG = "draft_map"
+
+
+@dataclass
+class StageStats:
+    """초안 생성 단계(map/reduce)별 소요 시간과 토큰 사용량."""
+
+    stage: str
+    seconds: float
+    calls: int
+    input_tokens: int
+    output_tokens: int
+
+
+class MapReduceDraftGenerator:
+    """
+    큰 문서의 블로그 초안을 구간 요약(map) → 최종 작성(reduce) 두 단계로 생성합니다.
+
+    청크를 문서 순서대로 `section_tokens` 이하의 구간으로 묶고, 구간마다 요약을 최대 `max_concurrency` 개씩
+    동시에 요청한 뒤, 요약들을 초안 프롬프트의 `{content}` 로 넣어 최종 글을 작성합니다.
+    요약을 합친 길이도 `section_tokens` 를 넘으면, 요약들을 다시 예산 안으로 묶어 요약하는 단계(collapse)를
+    예산 안에 들어올 때까지 반복합니다.
+    단계별 지연과 토큰 사용량은 호출마다 `stats` 목록에 남고 로그로 출력됩니다. 모델이 사용량을 알려주지 않으면 토크나이저로 추정합니다.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        section_prompt: ChatPromptTemplate,
+        draft_prompt: ChatPromptTemplate,
+        tokenizer: Tokenizer | None = None,
+        section_tokens: int = 8000,
+        max_concurrency: int = 4,
+    ):
+        self.section_prompt = section_prompt
+        self.draft_prompt = draft_prompt
+        self.section_chain = (section_prompt | llm).with_config(tags=[MAP_STAGE_TAG])
+        self.draft_chain = draft_prompt | llm
+        self.section_tokens = section_tokens
+        self.max_concurrency = max_concurrency
+        self._tokenizer = tokenizer
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer_for_model(LLM_MODEL)
+        return self._tokenizer
+
+    def count_tokens(self, documents: list[Document]) -> int:
+        return sum(self.tokenizer.count_batch([doc.page_content for doc in documents]))
+
+    def split_sections(self, documents: list[Document]) -> list[str]:
+        """청크를 순서를 유지하며 토큰 예산 이하의 구간으로 묶습니다. 예산보다 큰 청크는 혼자 한 구간이 됩니다."""
+        return self._group([doc.page_content for doc in documents])
+
+    def generate(self, documents: list[Document], stats: list[StageStats] | None = None) -> str:
+        """초안을 생성합니다. `stats` 목록을 넘기면 이번 호출의 단계별 통계를 채웁니다."""
+        stats = [] if stats is None else stats
+        summaries = self.collapse(self.map(documents, stats), stats)
+        inputs = {"content": self._reduce_content(summaries)}
+        started = time.perf_counter()
+        message = self.draft_chain.invoke(inputs)
+        self._record("reduce", started, [(self.draft_prompt, inputs, message)], stats)
+        return message.content
+
+    async def agenerate(self, documents: list[Document], stats: list[StageStats] | None = None) -> str:
+        stats = [] if stats is None else stats
+        summaries = await self.acollapse(await self.amap(documents, stats), stats)
+        inputs = {"content": self._reduce_content(summaries)}
+        started = time.perf_counter()
+        message = await self.draft_chain.ainvoke(inputs)
+        self._record("reduce", started, [(self.draft_prompt, inputs, message)], stats)
+        return message.content
+
+    def map(self, documents: list[Document], stats: list[StageStats] | None = None) -> list[str]:
+        """구간 요약을 스레드로 최대 max_concurrency 개씩 동시에 요청합니다."""
+        sections = self.split_sections(documents)
+        logger.info("Map-reduce draft: %d chunks -> %d sections (<= %d tokens each).", len(documents), len(sections), self.section_tokens)
+        return self._summarize("map", self._section_inputs(sections), [] if stats is None else stats)
+
+    async def amap(self, documents: list[Document], stats: list[StageStats] | None = None) -> list[str]:
+        sections = self.split_sections(documents)
+        logger.info("Map-reduce draft: %d chunks -> %d sections (<= %d tokens each).", len(documents), len(sections), self.section_tokens)
+        return await self._asummarize("map", self._section_inputs(sections), [] if stats is None else stats)
+
+    def collapse(self, summaries: list[str], stats: list[StageStats] | None = None) -> list[str]:
+        """합친 요약이 `section_tokens` 이하가 될 때까지 요약들을 묶어 다시 요약합니다."""
+        stats = [] if stats is None else stats
+        level = 1
+        while (groups := self._collapse_groups(summaries)) is not None:
+            summaries = self._summarize(f"collapse {level}", self._section_inputs(groups), stats)
+            level += 1
+        return summaries
+
+    async def acollapse(self, summaries: list[str], stats: list[StageStats] | None = None) -> list[str]:
+        stats = [] if stats is None else stats
+        level = 1
+        while (groups := self._collapse_groups(summaries)) is not None:
+            summaries = await self._asummarize(f"collapse {level}", self._section_inputs(groups), stats)
+            level += 1
+        return summaries
+
+    def _summarize(self, stage: str, inputs: list[dict], stats: list[StageStats]) -> list[str]:
+        started = time.perf_counter()
+        messages = self.section_chain.batch(inputs, config={"max_concurrency": self.max_concurrency})
+        self._record(stage, started, [(self.section_prompt, i, m) for i, m in zip(inputs, messages)], stats)
+        return [message.content for message in messages]
+
+    async def _asummarize(self, stage: str, inputs: list[dict], stats: list[StageStats]) -> list[str]:
+        started = time.perf_counter()
+        messages = await self.section_chain.abatch(inputs, config={"max_concurrency": self.max_concurrency})
+        self._record(stage, started, [(self.section_prompt, i, m) for i, m in zip(inputs, messages)], stats)
+        return [message.content for message in messages]
+
+    def _collapse_groups(self, summaries: list[str]) -> list[str] | None:
+        """다시 요약할 요약 묶음. 합친 요약이 예산 안이면(또는 요약이 하나뿐이면) None 입니다."""
+        if len(summaries) <= 1:
+            return None
+        tokens = self.tokenizer.count(self._reduce_content(summaries))
+        if tokens <= self.section_tokens:
+            return None
+        groups = self._group(summaries)
+        if len(groups) >= len(summaries):
+            # 요약 하나하나가 예산의 절반을 넘어 묶이지 않으면 이웃한 두 개씩 묶어, 단계마다 요약 수가 반드시 줄게 합니다.
+            groups = ["\n\n".join(summaries[i : i + 2]) for i in range(0, len(summaries), 2)]
+        logger.info("Map-reduce draft: %d summaries (%d tokens) -> %d groups.", len(summaries), tokens, len(groups))
+        return groups
+
+    def _group(self, texts: list[str]) -> list[str]:
+        groups: list[list[str]] = []
+        budget = 0
+        for text, tokens in zip(texts, self.tokenizer.count_batch(texts)):
+            if not groups or budget + tokens > self.section_tokens:
+                groups.append([])
+                budget = 0
+            groups[-1].append(text)
+            budget += tokens
+        return ["\n\n".join(group) for group in groups]
+
+    @staticmethod
+    def _section_inputs(sections: list[str]) -> list[dict]:
+        return [
+            {"content": section, "section_index": index, "section_count": len(sections)}
+            for index, section in enumerate(sections, start=1)
+        ]
+
+    @staticmethod
+    def _reduce_content(summaries: list[str]) -> str:
+        return "\n\n".join(f"## 구간 {index} 요약\n\n{summary}" for index, summary in enumerate(summaries, start=1))
+
+    def _record(
+        self,
+        stage: str,
+        started: float,
+        calls: list[tuple[ChatPromptTemplate, dict, BaseMessage]],
+        stats: list[StageStats],
+    ) -> None:
+        input_tokens = output_tokens = 0
+        for prompt, inputs, message in calls:
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                input_tokens += usage["input_tokens"]
+                output_tokens += usage["output_tokens"]
+            else:
+                input_tokens += self.tokenizer.count(prompt.format(**inputs))
+                output_tokens += self.tokenizer.count(message.content)
+        stage_stats = StageStats(stage, time.perf_counter() - started, len(calls), input_tokens, output_tokens)
+        stats.append(stage_stats)
+        logger.info(
+            "Draft %s stage: %.2fs, %d calls, %d input tokens, %d output tokens.",
+            stage, stage_stats.seconds, stage_stats.calls, stage_stats.input_tokens, stage_stats.output_tokens,
+        )
@@ -0,0 +1,122 @@
+# src/draft_patch.py
+import re
+import unicodedata
+
+
+# Markdown ATX 제목 줄 ("## 제목")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+PATCH_OPERATIONS = ("replace", "insert_before", "insert_after", "delete")
+# 편집 위치를 지정하는 키 (연산마다 정확히 하나)
+PATCH_ANCHORS = ("heading", "find")
+
+
+class PatchError(ValueError):
+    """편집 연산을 초안에 적용할 수 없을 때 발생합니다. (연산 형식이 잘못되었거나, 기준 위치를 찾지 못했거나, 연산이 겹치는 경우)"""
+
+
+def _normalize_heading(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).strip().lstrip("#").strip()
+    return " ".join(text.replace("*", "").casefold().split())
+
+
+class DraftDocument:
+    """초안의 줄/제목 위치를 계산하여 편집 연산의 기준 위치를 문자 구간으로 바꿉니다."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lines = text.splitlines(keepends=True)
+        self.offsets = [0]
+        for line in self.lines:
+            self.offsets.append(self.offsets[-1] + len(line))
+        # (줄 번호, 제목 수준, 정규화한 제목) - 코드 블록 안의 '#' 줄은 제외합니다.
+        self.headings: list[tuple[int, int, str]] = []
+        in_code = False
+        for index, line in enumerate(self.lines):
+            if line.lstrip().startswith("```"):
+                in_code = not in_code
+            elif not in_code and (match := _HEADING_PATTERN.match(line.rstrip("\n"))):
+                self.headings.append((index, len(match.group(1)), _normalize_heading(match.group(2))))
+
+    def section(self, heading: str) -> tuple[int, int]:
+        """제목 줄부터 같거나 더 높은 수준의 다음 제목 직전까지의 문자 구간."""
+        target = _normalize_heading(heading)
+        for position, (line, level, name) in enumerate(self.headings):
+            if name == target:
+                end_line = next((other for other, other_level, _ in self.headings[position + 1 :] if other_level <= level), len(self.lines))
+                return self.offsets[line], self.offsets[end_line]
+        raise PatchError(f"제목을 찾을 수 없습니다: {heading!r}")
+
+    def find(self, text: str) -> tuple[int, int]:
+        start = self.text.find(text)
+        if not text or start < 0:
+            raise PatchError(f"초안에서 문장을 찾을 수 없습니다: {text[:80]!r}")
+        if self.text.find(text, start + 1) >= 0:
+            raise PatchError(f"초안에 같은 문장이 여러 번 있습니다: {text[:80]!r}")
+        return start, start + len(text)
+
+
+def apply_patch(draft: str, operations: list[dict]) -> str:
+    """
+    편집 연산 목록을 초안에 적용합니다.
+
+    연산은 `{"op": "replace" | "insert_before" | "insert_after" | "delete", <기준>, "content": "..."}` 형태이고,
+    기준은 `"heading"` (그 제목의 섹션 전체), `"find"` (초안에 한 번만 나오는 문장) 중 정확히 하나입니다.
+    (모델은 줄 번호가 없는 초안을 보므로 줄 번호 기준은 받지 않습니다)
+    모든 기준은 편집 전 초안에서 찾으므로 연산 순서는 신경 쓰지 않아도 됩니다.
+    연산 형식이 잘못되었거나, 기준 위치를 찾을 수 없거나, 연산끼리 겹치면 PatchError 를 발생시킵니다.
+    """
+    if not isinstance(operations, list):
+        raise PatchError(f"편집 연산 목록(operations)은 리스트여야 합니다: {type(operations).__name__}")
+    document = DraftDocument(draft)
+    edits: list[tuple[int, int, str]] = []
+    for operation in operations:
+        op, anchor, target, content = _validate_operation(operation)
+        if anchor == "heading":
+            start, end = document.section(target)
+        else:
+            start, end = document.find(target)
+
+        # 섹션 단위 편집은 줄바꿈으로 끝나야 다음 줄과 붙지 않습니다.
+        if anchor != "find" and content and not content.endswith("\n"):
+            content += "\n"
+        if op == "replace":
+            edits.append((start, end, content))
+        elif op == "delete":
+            edits.append((start, end, ""))
+        elif op == "insert_before":
+            edits.append((start, start, content))
+        else:
+            if anchor != "find" and end == len(draft) and draft and not draft.endswith("\n"):
+                content = "\n" + content
+            edits.append((end, end, content))
+
+    # 뒤쪽 편집부터 적용하여 앞쪽 위치가 바뀌지 않게 합니다.
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+    for (_, previous_end, _), (start, end, _) in zip(edits, edits[1:]):
+        if start < previous_end:
+            raise PatchError("편집 연산의 범위가 서로 겹칩니다.")
+    result = draft
+    for start, end, content in reversed(edits):
+        result = result[:start] + content + result[end:]
+    return result
+
+
+def _validate_operation(operation) -> tuple[str, str, str, str]:
+    """모델이 만든 편집 연산 하나의 형식을 검사하고 (op, 기준 키, 기준 값, content) 를 반환합니다."""
+    if not isinstance(operation, dict):
+        raise PatchError(f"편집 연산은 객체여야 합니다: {operation!r}")
+    op = operation.get("op")
+    if op not in PATCH_OPERATIONS:
+        raise PatchError(f"지원되지 않는 편집 연산입니다: {op!r}")
+    anchors = [key for key in PATCH_ANCHORS if key in operation]
+    if len(anchors) != 1:
+        raise PatchError(f"편집 위치(heading, find)는 정확히 하나여야 합니다: {operation!r}")
+    target = operation[anchors[0]]
+    if not isinstance(target, str):
+        raise PatchError(f"편집 위치 {anchors[0]!r} 는 문자열이어야 합니다: {target!r}")
+    content = operation.get("content", "")
+    if content is None and op == "delete":
+        content = ""
+    if not isinstance(content, str):
+        raise PatchError(f"편집 내용(content)은 문자열이어야 합니다: {content!r}")
+    return op, anchors[0], target, content
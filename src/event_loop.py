@@ -0,0 +1,58 @@
+# src/event_loop.py
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Coroutine, Iterator
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    프로세스 전체가 공유하는 백그라운드 이벤트 루프. 처음 호출할 때 데몬 스레드에서 시작합니다.
+
+    ChatOpenAI, Tavily, OpenAIEmbeddings 의 비동기 클라이언트는 연결 풀(httpx)을 처음 사용한 루프에 묶어 두므로,
+    호출마다 `asyncio.run` 으로 새 루프를 만들면 닫힌 루프의 연결을 다시 쓰다가 실패하거나 재시도로 느려집니다.
+    동기 코드(Streamlit 스크립트 스레드, 수집 작업 스레드)의 비동기 호출은 모두 이 루프에서 실행합니다.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="shared-event-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """코루틴을 공유 이벤트 루프에서 실행하고 결과를 기다립니다. 공유 루프 안에서 호출하면 교착되므로 RuntimeError 를 발생시킵니다."""
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the shared event loop; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iterate_sync(items: AsyncIterator[T]) -> Iterator[T]:
+    """비동기 이터레이터를 공유 이벤트 루프에서 하나씩 꺼내 동기 이터레이터로 사용합니다. (Streamlit 스크립트 스레드용)"""
+    async def next_item() -> T:
+        return await anext(items)
+
+    try:
+        while True:
+            try:
+                yield run_sync(next_item())
+            except StopAsyncIteration:
+                break
+    finally:
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            run_sync(aclose())
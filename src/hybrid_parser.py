@@ -0,0 +1,119 @@
+# src/hybrid_parser.py
+import tempfile
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import pymupdf
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from langchain_unstructured import UnstructuredLoader
+
+from src.logger import get_logger
+from src.pdf_loader import PDFSource, PyMuPDFPageLoader, open_pdf
+
+
+logger = get_logger(__name__)
+
+ROUTE_TEXT = "text"
+ROUTE_OCR = "ocr"
+
+
+@dataclass(frozen=True)
+class PageProfile:
+    """페이지의 텍스트 레이어/이미지 분석 결과와 선택된 파싱 경로."""
+
+    page: int
+    text_chars: int
+    image_coverage: float
+    route: str
+
+
+class HybridPDFLoader(BaseLoader):
+    """
+    텍스트 레이어가 있는 페이지는 PyMuPDF 로, 스캔/이미지 위주 페이지만 unstructured(Tesseract) OCR 로 파싱하는 로더.
+
+    페이지마다 추출 가능한 글자 수와 이미지가 덮는 면적 비율을 보고 경로를 고릅니다.
+    - 글자 수가 `min_text_chars` 미만이면 OCR
+    - 이미지가 페이지의 `max_image_coverage` 이상을 덮고 글자 수가 `image_page_max_chars` 미만이면 OCR
+    - 그 외에는 PyMuPDF 텍스트 그대로 사용
+
+    결과 Document 는 PyMuPDFPageLoader 와 같은 메타데이터에 `parse_route` ("text" / "ocr") 를 더해 반환합니다.
+    PDF 는 경로 또는 메모리 버퍼로 받을 수 있고, 임시 파일은 OCR 할 페이지를 unstructured 에 넘길 때만 만듭니다.
+    """
+
+    def __init__(
+        self,
+        source: PDFSource,
+        source_name: str | None = None,
+        min_text_chars: int = 50,
+        max_image_coverage: float = 0.6,
+        image_page_max_chars: int = 200,
+        ocr_strategy: str = "hi_res",
+        languages: list[str] | None = None,
+    ):
+        self.source = source
+        self.source_name = source_name
+        self.min_text_chars = min_text_chars
+        self.max_image_coverage = max_image_coverage
+        self.image_page_max_chars = image_page_max_chars
+        self.ocr_strategy = ocr_strategy
+        self.languages = languages or ["kor"]
+        self.page_profiles: list[PageProfile] = []
+
+    def lazy_load(self) -> Iterator[Document]:
+        # 1) 페이지별 경로만 먼저 정하고 텍스트는 버립니다. (전체 페이지를 메모리에 들고 있지 않기 위해)
+        with open_pdf(self.source) as pdf:
+            self.page_profiles = [self._profile_page(page, page.get_text().strip()) for page in pdf]
+
+        ocr_pages = [profile.page for profile in self.page_profiles if profile.route == ROUTE_OCR]
+        logger.info("Hybrid parser: %d/%d pages routed to OCR %s", len(ocr_pages), len(self.page_profiles), ocr_pages)
+        # OCR 은 대상 페이지를 한 번에 처리해야 빠르므로, OCR 한 페이지의 텍스트만 미리 들고 있습니다.
+        ocr_texts = self._ocr_pages(ocr_pages) if ocr_pages else {}
+
+        # 2) 텍스트 레이어는 페이지를 하나씩 다시 읽으며 반환합니다.
+        for doc, profile in zip(PyMuPDFPageLoader(self.source, self.source_name).lazy_load(), self.page_profiles):
+            # OCR 결과가 비어 있으면 PyMuPDF 텍스트를 그대로 사용합니다.
+            content = (ocr_texts.get(profile.page) or doc.page_content) if profile.route == ROUTE_OCR else doc.page_content
+            yield Document(page_content=content, metadata={**doc.metadata, "parse_route": profile.route})
+
+    def _profile_page(self, page: pymupdf.Page, text: str) -> PageProfile:
+        """페이지의 글자 수와 이미지 면적 비율로 파싱 경로를 결정합니다."""
+        text_chars = len(text.strip())
+
+        page_area = abs(page.rect) or 1.0
+        image_area = sum(abs(pymupdf.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+        image_coverage = min(image_area / page_area, 1.0)
+
+        needs_ocr = text_chars < self.min_text_chars or (
+            image_coverage >= self.max_image_coverage and text_chars < self.image_page_max_chars
+        )
+        return PageProfile(
+            page=page.number,
+            text_chars=text_chars,
+            image_coverage=round(image_coverage, 3),
+            route=ROUTE_OCR if needs_ocr else ROUTE_TEXT,
+        )
+
+    def _ocr_pages(self, pages: list[int]) -> dict[int, str]:
+        """선택된 페이지만 잘라낸 PDF 를 unstructured 로 OCR 하고, 원본 페이지 번호별 텍스트를 반환합니다."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part_path = Path(temp_dir) / "ocr_pages.pdf"
+            with open_pdf(self.source) as pdf, pymupdf.open() as part:
+                for page in pages:
+                    part.insert_pdf(pdf, from_page=page, to_page=page)
+                part.save(part_path)
+
+            elements = UnstructuredLoader(
+                file_path=str(part_path),
+                strategy=self.ocr_strategy,
+                languages=self.languages,
+            ).load()
+
+        # unstructured 는 요소(element) 단위로 반환하므로 페이지별로 모읍니다. (page_number 는 1-based)
+        texts_by_part_page: dict[int, list[str]] = defaultdict(list)
+        for element in elements:
+            texts_by_part_page[element.metadata.get("page_number", 1)].append(element.page_content)
+
+        return {page: "\n".join(texts_by_part_page.get(index + 1, [])) for index, page in enumerate(pages)}
@@ -0,0 +1,180 @@
+# src/ingestion_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import INGESTION_CACHE_MAX_BYTES, INGESTION_CACHE_PATH
+from src.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedIngestion:
+    """캐시에서 복원한 청크와 임베딩 행렬 (행 순서 = 청크 순서), 원본 파일의 페이지 수."""
+
+    documents: list[Document]
+    embeddings: np.ndarray
+    pages: int
+
+
+class IngestionCache:
+    """
+    업로드된 파일의 분할 청크와 임베딩을 디스크(SQLite)에 저장하는 content-addressed 캐시.
+
+    키는 파일 바이트의 SHA-256 과 파서/청크 크기/청크 겹침/임베딩 모델을 합쳐 만들기 때문에,
+    같은 PDF 를 같은 설정으로 다시 올리면 파싱과 임베딩을 모두 건너뛸 수 있습니다.
+    전체 크기가 `max_bytes` 를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+    """
+
+    def __init__(self, path: Path = INGESTION_CACHE_PATH, max_bytes: int = INGESTION_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    documents TEXT NOT NULL,
+                    embeddings BLOB NOT NULL,
+                    dim INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    pages INTEGER
+                )
+                """
+            )
+            # 페이지 수를 기록하기 전에 만든 캐시: 기존 항목은 페이지 수를 모르므로 NULL 로 두고 조회 시 miss 로 처리합니다.
+            if "pages" not in {row[1] for row in conn.execute("PRAGMA table_info(entries)")}:
+                conn.execute("ALTER TABLE entries ADD COLUMN pages INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+
+    @staticmethod
+    def make_key(
+        file_bytes: bytes,
+        *,
+        parser_type: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        embedding_model: str,
+        text_splitter: str = "recursive",
+        dedup: bool = False,
+        options: dict | None = None,
+    ) -> str:
+        """
+        파일 내용과 수집 설정으로 캐시 키를 만듭니다.
+        `options` 에는 결과 청크에 영향을 주는 나머지 세부 설정(분할기 인코딩, 중복 제거 기준, 파서 옵션 등)을 넣습니다.
+        """
+        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        settings = f"{parser_type}|{text_splitter}|{chunk_size}|{chunk_overlap}|{embedding_model}|dedup={dedup}"
+        if options:
+            settings += "|" + json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{file_hash}|{settings}".encode()).hexdigest()
+
+    def get(self, key: str) -> CachedIngestion | None:
+        """캐시된 청크와 임베딩을 반환합니다. 없으면(또는 페이지 수가 없는 이전 항목이면) None."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT documents, embeddings, dim, pages FROM entries WHERE key = ? AND pages IS NOT NULL", (key,)
+            ).fetchone()
+            if row is None:
+                self._count(hit=False)
+                return None
+            conn.execute(
+                "UPDATE entries SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+
+        self._count(hit=True)
+        documents_json, blob, dim, pages = row
+        documents = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in json.loads(documents_json)]
+        embeddings = np.frombuffer(blob, dtype=np.float32).reshape(-1, dim)
+        return CachedIngestion(documents=documents, embeddings=embeddings, pages=pages)
+
+    def put(self, key: str, documents: list[Document], embeddings, pages: int) -> None:
+        """
+        청크와 임베딩, 원본 페이지 수를 저장하고, 용량을 넘으면 LRU 순서로 정리합니다.
+        (청크가 없는 페이지도 있으므로 페이지 수는 청크에서 다시 셀 수 없어 따로 저장합니다)
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(documents):
+            raise ValueError("embeddings must be a 2-D array with one row per document.")
+
+        documents_json = json.dumps(
+            [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents],
+            ensure_ascii=False,
+        )
+        blob = matrix.tobytes()
+        size_bytes = len(documents_json.encode()) + len(blob)
+        if size_bytes > self.max_bytes:
+            logger.warning("Ingestion cache entry (%d bytes) exceeds the cache limit; skipping.", size_bytes)
+            return
+
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries (key, documents, embeddings, dim, size_bytes, created_at, last_access, pages)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, documents_json, blob, matrix.shape[1], size_bytes, now, now, pages),
+            )
+            self._evict(conn)
+
+    @property
+    def stats(self) -> dict:
+        """hit/miss 카운터와 현재 캐시 크기를 반환합니다."""
+        with closing(self._connect()) as conn:
+            entries, size_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "size_bytes": size_bytes,
+        }
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용되지 않은 항목을 삭제합니다."""
+        (total,) = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute("SELECT key, size_bytes FROM entries ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size_bytes
+        conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.info("Evicted %d ingestion cache entries (LRU).", len(evicted))
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
@@ -0,0 +1,160 @@
+# src/ingestion_pipeline.py
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import INGESTION_STREAMING_BATCH_SIZE, INGESTION_STREAMING_MAX_INFLIGHT
+from src.document_preprocessor import DocumentPreprocessor
+from src.logger import get_logger
+from src.vector_store import VectorStore, document_ids
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class IngestionProgress:
+    """스트리밍 수집 중 발생하는 진행 상황 이벤트."""
+
+    pages_done: int
+    total_pages: int | None
+    chunks_created: int
+    chunks_stored: int
+    fraction: float
+    done: bool = False
+
+    @property
+    def message(self) -> str:
+        pages = f"{self.pages_done}/{self.total_pages}" if self.total_pages else f"{self.pages_done}"
+        return f"페이지 {pages} 파싱 · 청크 {self.chunks_stored}/{self.chunks_created} 임베딩 완료"
+
+
+class IngestionPipeline:
+    """
+    페이지 → 청크 → 임베딩 배치 → 벡터 저장소 upsert 로 이어지는 제너레이터 기반 수집 파이프라인.
+
+    파싱은 호출한 스레드에서, 임베딩과 upsert 는 작업 스레드에서 수행하므로 두 단계가 겹쳐 실행됩니다.
+    저장은 `VectorStore.add_documents` (속도 제한 + 429 재시도 + 임베딩 캐시) 를 거치며, 청크 id 는
+    `id_prefix` 와 파일 안의 청크 번호, 내용으로 정해지므로 같은 파일을 다시 수집하면 이미 저장된 청크를 건너뜁니다.
+    처리 중인 배치는 최대 `max_inflight_batches` 개로 제한되어, 문서 크기와 관계없이
+    메모리에 올라오는 페이지/임베딩 요청 수가 일정하게 유지됩니다.
+    임베딩은 저장소에만 두고 따로 모으지 않으며, `embeddings` 는 필요할 때 저장소에서 읽어 옵니다.
+    청크 목록(`documents`)은 에이전트가 초안을 쓸 때 전체를 사용하므로 끝까지 유지합니다.
+
+    Examples:
+        >>> pipeline = IngestionPipeline(preprocessor, vector_store)
+        >>> for progress in pipeline.run():
+        ...     progress_bar.progress(progress.fraction, text=progress.message)
+        >>> documents = pipeline.documents
+    """
+
+    def __init__(
+        self,
+        preprocessor: DocumentPreprocessor,
+        vector_store: VectorStore,
+        batch_size: int = INGESTION_STREAMING_BATCH_SIZE,
+        max_inflight_batches: int = INGESTION_STREAMING_MAX_INFLIGHT,
+        metadata: dict | None = None,
+        id_prefix: str = "",
+    ):
+        self.preprocessor = preprocessor
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.max_inflight_batches = max(1, max_inflight_batches)
+        # 모든 청크에 덧붙일 메타데이터 (예: 원본 파일명)
+        self.metadata = metadata or {}
+        # 청크 id 앞에 붙여 파일을 구분하는 문자열
+        self.id_prefix = id_prefix
+
+        # 에이전트가 초안 생성에 사용하는 전체 청크 목록
+        self.documents: list[Document] = []
+        # 벡터 저장소에 저장하는 청크 id (`documents` 와 같은 순서, 수집이 실패하면 이 id 로 저장한 청크를 지웁니다)
+        self.stored_ids: list[str] = []
+        self._total_pages: int | None = None
+        self._pages_done = 0
+        self._chunks_stored = 0
+        self._fraction = 0.0
+
+    @property
+    def embeddings(self) -> np.ndarray | None:
+        """`documents` 순서의 임베딩 행렬. 저장소에서 읽어 오므로 `run()` 이 끝난 뒤에 사용합니다."""
+        if not self.stored_ids:
+            return None
+        return self.vector_store.get_vectors(self.stored_ids)
+
+    def run(self) -> Iterator[IngestionProgress]:
+        """파이프라인을 실행하며 진행 이벤트를 반환합니다."""
+        self._total_pages = self.preprocessor.page_count
+        inflight: deque[Future] = deque()
+        batch: list[Document] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_inflight_batches, thread_name_prefix="ingest") as executor:
+            for page in self.preprocessor.iter_pages():
+                self._pages_done += 1
+                chunks = self.preprocessor.split_page(page)
+                for chunk in chunks:
+                    chunk.metadata.update(self.metadata)
+                self.documents.extend(chunks)
+                batch.extend(chunks)
+
+                while len(batch) >= self.batch_size:
+                    # 처리 중인 배치가 가득 차면 가장 오래된 배치가 끝날 때까지 파싱을 멈춥니다. (backpressure)
+                    if len(inflight) >= self.max_inflight_batches:
+                        self._complete(inflight.popleft())
+                    head, batch = batch[: self.batch_size], batch[self.batch_size :]
+                    inflight.append(executor.submit(self._embed_and_store, head, self._assign_ids(head)))
+
+                yield self._progress()
+
+            if batch:
+                inflight.append(executor.submit(self._embed_and_store, batch, self._assign_ids(batch)))
+            while inflight:
+                self._complete(inflight.popleft())
+                yield self._progress()
+
+        if (dedup := self.preprocessor.dedup_stats) is not None:
+            logger.info(
+                "Dedup kept %d/%d chunks (%d boilerplate lines stripped, ~%d embedding tokens saved).",
+                dedup.chunks_kept,
+                dedup.chunks_in,
+                dedup.lines_stripped,
+                dedup.tokens_saved,
+            )
+        yield self._progress(done=True)
+
+    def _assign_ids(self, batch: list[Document]) -> list[str]:
+        """배치의 청크 id 를 파일 안의 청크 번호로 정하고, 저장하기 전에 기록합니다. (실패해도 지울 수 있도록)"""
+        ids = document_ids(batch, prefix=self.id_prefix, start=len(self.stored_ids))
+        self.stored_ids.extend(ids)
+        return ids
+
+    def _embed_and_store(self, batch: list[Document], ids: list[str]) -> int:
+        """[작업 스레드] 배치를 임베딩해 저장합니다. 이미 저장된 청크는 건너뜁니다."""
+        self.vector_store.add_documents(batch, ids=ids)
+        return len(batch)
+
+    def _complete(self, future: Future) -> None:
+        self._chunks_stored += future.result()
+
+    def _progress(self, done: bool = False) -> IngestionProgress:
+        chunks_created = len(self.documents)
+        if done:
+            fraction = 1.0
+        else:
+            parsed = self._pages_done / self._total_pages if self._total_pages else 0.0
+            stored = self._chunks_stored / chunks_created if chunks_created else 0.0
+            # 파싱과 임베딩을 절반씩 반영하고, 진행률이 뒤로 가지 않도록 합니다.
+            fraction = min(parsed * 0.5 + parsed * stored * 0.5, 0.99)
+        self._fraction = max(self._fraction, fraction)
+        return IngestionProgress(
+            pages_done=self._pages_done,
+            total_pages=self._total_pages,
+            chunks_created=chunks_created,
+            chunks_stored=self._chunks_stored,
+            fraction=self._fraction,
+            done=done,
+        )
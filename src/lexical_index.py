@@ -0,0 +1,115 @@
+# src/lexical_index.py
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+# 한글 연속 구간과 그 밖의 단어 문자(영문/숫자 등) 연속 구간을 따로 나눕니다. ("perplexity는" → "perplexity", "는")
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[^\W가-힣]+")
+
+
+def tokenize(text: str, ngram: int = 2) -> list[str]:
+    """
+    한국어를 고려한 BM25 용 토큰화.
+
+    한글 구간은 조사/어미가 붙어도 맞도록 글자 n-gram 으로 나누고(n 보다 짧으면 그대로),
+    영문/숫자 구간은 소문자 단어 그대로 사용합니다. 형태소 분석기 없이 동작합니다.
+    """
+    tokens: list[str] = []
+    for word in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if "가" <= word[0] <= "힣" and len(word) > ngram:
+            tokens.extend(word[i : i + ngram] for i in range(len(word) - ngram + 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """
+    청크 단위 BM25 역색인.
+
+    용어마다 (문서 위치, 빈도) 를 `array` 두 개로 저장하여 파이썬 객체 오버헤드 없이 작게 유지하고,
+    검색은 쿼리 용어의 posting 을 NumPy 로 한 번에 점수화합니다.
+    문서는 하나씩 추가할 수 있고(수집 중 점진적 색인), 같은 id 를 다시 추가하면 이전 버전을 대체합니다.
+    """
+
+    def __init__(self, ngram: int = 2, k1: float = 1.5, b: float = 0.75):
+        self.ngram = ngram
+        self.k1 = k1
+        self.b = b
+        self.documents: list[Document] = []
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._lengths = array("I")
+        self._alive = array("B")
+        self._positions: dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, documents: list[Document]) -> None:
+        """문서를 색인합니다. 문서의 `id` 가 같으면 이전 문서를 대체합니다."""
+        with self._lock:
+            for doc in documents:
+                if doc.id is not None and doc.id in self._positions:
+                    self._remove(self._positions.pop(doc.id))
+                position = len(self.documents)
+                counts = Counter(tokenize(doc.page_content, self.ngram))
+                for term, tf in counts.items():
+                    docs, tfs = self._postings.setdefault(term, (array("I"), array("I")))
+                    docs.append(position)
+                    tfs.append(tf)
+                length = sum(counts.values())
+                self.documents.append(doc)
+                self._lengths.append(length)
+                self._alive.append(1)
+                self._total_length += length
+                if doc.id is not None:
+                    self._positions[doc.id] = position
+
+    def remove(self, ids: list[str]) -> None:
+        """id 에 해당하는 문서를 색인에서 뺍니다. 없는 id 는 무시합니다."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._positions:
+                    self._remove(self._positions.pop(doc_id))
+
+    def search(self, query: str, k: int = 4) -> list[tuple[Document, float]]:
+        """BM25 점수 상위 k 개 (점수가 0 인 문서는 제외)."""
+        with self._lock:
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool) if len(self._alive) else np.zeros(0, bool)
+            num_docs = int(alive.sum())
+            if num_docs == 0 or k <= 0:
+                return []
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            avg_length = self._total_length / num_docs
+            norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+
+            scores = np.zeros(len(lengths), dtype=np.float32)
+            for term in set(tokenize(query, self.ngram)):
+                if term not in self._postings:
+                    continue
+                docs_array, tfs_array = self._postings[term]
+                docs = np.frombuffer(docs_array, dtype=np.uint32)
+                tfs = np.frombuffer(tfs_array, dtype=np.uint32).astype(np.float32)
+                df = int(alive[docs].sum())
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+            scores[~alive] = 0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.documents[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def _remove(self, position: int) -> None:
+        # posting 에서 지우지 않고 표시만 합니다. (검색 시 점수에서 제외)
+        self._alive[position] = 0
+        self._total_length -= self._lengths[position]
@@ -0,0 +1,242 @@
+# src/llm_cache.py
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_SEMANTIC_ENABLED,
+    LLM_CACHE_SEMANTIC_THRESHOLD,
+)
+from src.logger import get_logger
+from src.minhash import normalize_text
+
+
+logger = get_logger(__name__)
+
+# llm_string 에서 모델 이름을 뽑아 통계에 표시합니다.
+_MODEL_PATTERN = re.compile(r'"model(?:_name)?": "([^"]+)"')
+# 의미 캐시에서 질문을 다시 비교할 최대 후보 수 (최근 사용 순)
+_MAX_SEMANTIC_CANDIDATES = 64
+# 이보다 긴 사용자 메시지(예: 초안 생성 프롬프트 전체)는 채팅 질문이 아니므로 의미 캐시에 넣지 않습니다.
+_MAX_QUESTION_CHARS = 1000
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LLM 응답을 SQLite 에 저장하는 LangChain 캐시. 모델 인스턴스의 `cache=` 로 연결합니다.
+
+    - 키는 (모델 설정 = llm_string, 프롬프트) 의 해시입니다. 채팅 모델의 프롬프트는 메시지 전체를 직렬화한 것이므로
+      도구 호출 결과(ToolMessage)도 키에 포함되어, 도구 결과가 달라지면 다른 항목이 됩니다.
+    - `ttl_seconds` 가 지난 항목은 사용하지 않고, `max_entries` 또는 `max_bytes` 를 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다.
+    - 항목마다 적중 횟수와 마지막 사용 시각을 기록합니다. (`entry_stats`)
+    - `semantic_threshold` 를 주면 정확히 일치하는 항목이 없을 때, 앞선 대화가 같고 마지막 사용자 질문만 거의 같은
+      (SequenceMatcher 비율 ≥ 임계값) 항목의 답변을 사용합니다. 도구 호출이 없는 직접 답변만 이렇게 재사용합니다.
+    - `path` 가 None 이면 이 인스턴스 안에서만 쓰는 메모리 DB 를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 2**20,
+        ttl_seconds: float = 30 * 24 * 3600,
+        semantic_threshold: float | None = None,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path is None:
+            # 공유 캐시 메모리 DB 는 연결이 하나라도 열려 있는 동안 유지되므로 연결 하나를 붙잡아 둡니다.
+            self._uri = f"file:llm-cache-{id(self)}?mode=memory&cache=shared"
+            self._anchor = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._uri = self.path.as_uri()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    context_hash TEXT,
+                    question TEXT,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_context ON llm_cache (context_hash)")
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        now = time.time()
+        key = _hash(llm_string) + _hash(prompt)
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT key, value, model FROM llm_cache WHERE key = ? AND created_at > ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            semantic = False
+            if row is None and self.semantic_threshold is not None:
+                row = self._semantic_lookup(conn, prompt, llm_string, now)
+                semantic = row is not None
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET hits = hits + 1, last_access = ? WHERE key = ?", (now, row[0]))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.semantic_hits += semantic
+        logger.info("LLM cache %shit (model=%s).", "semantic " if semantic else "", row[2])
+        return loads(row[1], allowed_objects="core")
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        value = dumps(return_val)
+        context_hash, question = self._question(prompt, llm_string)
+        model = match.group(1) if (match := _MODEL_PATTERN.search(llm_string)) else "unknown"
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (key, model, context_hash, question, value, size, created_at, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (_hash(llm_string) + _hash(prompt), model, context_hash, question, value, len(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def clear(self, **kwargs: Any) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    @property
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def entry_stats(self, limit: int = 20) -> list[dict]:
+        """적중 횟수가 많은 순으로 항목별 통계를 반환합니다."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT key, model, question, size, hits, created_at, last_access FROM llm_cache ORDER BY hits DESC, last_access DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        columns = ("key", "model", "question", "size", "hits", "created_at", "last_access")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _question(self, prompt: str, llm_string: str) -> tuple[str | None, str | None]:
+        """
+        의미 캐시용 (앞선 대화의 해시, 마지막 사용자 질문). 프롬프트가 사용자 메시지로 끝나지 않으면(도구 결과 이후 단계 등)
+        의미 캐시 대상이 아니므로 (None, None) 을 반환합니다.
+        """
+        if self.semantic_threshold is None:
+            return None, None
+        try:
+            messages = loads(prompt, allowed_objects="messages")
+        except Exception:
+            return None, None
+        if not isinstance(messages, list) or not messages or not isinstance(messages[-1], HumanMessage):
+            return None, None
+        if not isinstance(messages[-1].content, str) or len(messages[-1].content) > _MAX_QUESTION_CHARS:
+            return None, None
+        context_hash = _hash(llm_string) + _hash(dumps(messages[:-1]))
+        return context_hash, normalize_text(messages[-1].content)
+
+    def _semantic_lookup(self, conn: sqlite3.Connection, prompt: str, llm_string: str, now: float) -> tuple[str, str, str] | None:
+        context_hash, question = self._question(prompt, llm_string)
+        if context_hash is None:
+            return None
+        rows = conn.execute(
+            """
+            SELECT key, value, model, question FROM llm_cache
+            WHERE context_hash = ? AND created_at > ? ORDER BY last_access DESC LIMIT ?
+            """,
+            (context_hash, now - self.ttl_seconds, _MAX_SEMANTIC_CANDIDATES),
+        ).fetchall()
+        best, best_ratio = None, self.semantic_threshold
+        for key, value, model, cached_question in rows:
+            matcher = SequenceMatcher(None, question, cached_question)
+            if matcher.quick_ratio() < best_ratio or (ratio := matcher.ratio()) < best_ratio:
+                continue
+            # 도구를 호출하는 응답은 질문에 맞춘 검색어를 담고 있으므로 재사용하지 않습니다.
+            generations = loads(value, allowed_objects="core")
+            if any(isinstance(getattr(g, "message", None), AIMessage) and g.message.tool_calls for g in generations):
+                continue
+            best, best_ratio = (key, value, model), ratio
+        return best
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        evicted = 0
+        if entries > self.max_entries or size > self.max_bytes:
+            # 제한을 넘는 만큼 가장 오래 사용되지 않은 항목부터 지웁니다.
+            for key, entry_size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+                if entries - evicted <= self.max_entries and size <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                evicted += 1
+                size -= entry_size
+        if expired or evicted:
+            logger.info("Evicted %d LLM cache entries (%d expired, %d LRU).", expired + evicted, expired, evicted)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, timeout=30)
+        if self.path is not None:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 캐시이므로 WAL 체크포인트 때만 fsync 합니다.
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+
+@lru_cache(maxsize=1)
+def get_llm_response_cache() -> LLMResponseCache | None:
+    """프로세스 전체에서 공유하는 LLM 응답 캐시. 설정에서 켜지 않았으면 None."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return LLMResponseCache(
+        LLM_CACHE_PATH,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+        max_bytes=LLM_CACHE_MAX_BYTES,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        semantic_threshold=LLM_CACHE_SEMANTIC_THRESHOLD if LLM_CACHE_SEMANTIC_ENABLED else None,
+    )
@@ -0,0 +1,194 @@
+# src/local_embeddings.py
+import os
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# 추론 백엔드: "torch" (sentence-transformers) 또는 "onnx" (optimum + onnxruntime)
+BACKENDS = ("torch", "onnx")
+
+
+def detect_device(preferred: str = "auto") -> str:
+    """
+    사용할 장치를 고릅니다. "auto" 이면 cuda → mps → cpu 순으로 사용 가능한 장치를 선택하고,
+    지정한 장치를 쓸 수 없으면 경고를 남기고 cpu 로 대체합니다.
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+
+    available = {
+        "cuda": torch.cuda.is_available(),
+        "mps": getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available(),
+        "cpu": True,
+    }
+    if preferred == "auto":
+        return next(device for device, ok in available.items() if ok)
+    if available.get(preferred.split(":")[0], False):
+        return preferred
+    logger.warning("Embedding device '%s' is not available; falling back to cpu.", preferred)
+    return "cpu"
+
+
+def default_pooling(model_name: str) -> str:
+    """BGE 계열은 [CLS] 풀링, 나머지 sentence-transformers 모델은 mean 풀링을 사용합니다."""
+    return "cls" if "bge" in model_name.lower() else "mean"
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    로컬 Hugging Face 임베딩 모델을 장치에 맞게 최적화하여 실행합니다.
+
+    - 장치를 자동으로 감지하고(GPU 가 없으면 CPU), CPU 에서는 `cpu_threads` 로 스레드 수를 고정합니다.
+    - 텍스트를 길이순으로 정렬해 배치를 만들어 padding 낭비를 줄이고, 결과는 원래 순서로 돌려줍니다.
+    - `quantize=True` 이면 CPU 에서 int8 동적 양자화를 적용합니다.
+      ("torch": Linear 층 동적 양자화, "onnx": onnxruntime 동적 양자화 모델을 `onnx_cache_dir` 에 저장해 재사용)
+    - `dimensions` 를 주면 앞쪽 차원만 남기고 다시 정규화합니다. (Matryoshka 학습 모델용)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "auto",
+        batch_size: int = 32,
+        cpu_threads: int | None = None,
+        backend: str = "torch",
+        quantize: bool = False,
+        normalize: bool = True,
+        pooling: str | None = None,
+        onnx_cache_dir: Path | None = None,
+        dimensions: int | None = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported embedding backend: {backend} (choose from {BACKENDS})")
+        self.model_name = model_name
+        self.device = detect_device(device)
+        self.batch_size = max(1, batch_size)
+        self.backend = backend
+        # int8 동적 양자화는 CPU 커널만 있으므로 GPU 에서는 적용하지 않습니다.
+        self.quantize = quantize and self.device == "cpu"
+        self.normalize = normalize
+        self.pooling = pooling or default_pooling(model_name)
+        self.onnx_cache_dir = onnx_cache_dir
+        self.dimensions = dimensions
+        self.cpu_threads = cpu_threads or os.cpu_count() or 1
+
+        if self.device == "cpu":
+            self._configure_cpu_threads(self.cpu_threads)
+        if backend == "onnx":
+            self._tokenizer, self._model = self._load_onnx()
+        else:
+            self._model = self._load_torch()
+        logger.info(
+            "Loaded embedding model %s (backend=%s, device=%s, int8=%s, batch_size=%d)",
+            model_name, backend, self.device, self.quantize, self.batch_size,
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        # 길이가 비슷한 텍스트끼리 배치를 만들어 padding 토큰 계산을 줄입니다.
+        order = np.argsort([len(text) for text in texts])
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            indices = order[start : start + self.batch_size]
+            batch = self._encode([texts[i] for i in indices])
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            vectors[indices] = batch
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        vectors = self._encode_onnx(texts) if self.backend == "onnx" else self._encode_torch(texts)
+        if self.dimensions is not None and self.dimensions < vectors.shape[1]:
+            vectors = vectors[:, : self.dimensions]
+            if self.normalize:
+                vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors
+
+    def _encode_torch(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(
+            self._model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            ),
+            dtype=np.float32,
+        )
+
+    def _encode_onnx(self, texts: list[str]) -> np.ndarray:
+        inputs = self._tokenizer(texts, padding=True, truncation=True, return_tensors="np")
+        hidden = self._model(**inputs).last_hidden_state
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = np.asarray(pooled, dtype=np.float32)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def _load_torch(self):
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(self.model_name, device=self.device)
+        if self.quantize:
+            import torch
+
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _load_onnx(self):
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding backend requires `pip install optimum[onnxruntime]`.") from e
+
+        provider = "CUDAExecutionProvider" if self.device.startswith("cuda") else "CPUExecutionProvider"
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = self.cpu_threads
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        if not self.quantize:
+            return tokenizer, ORTModelForFeatureExtraction.from_pretrained(
+                self.model_name, export=True, provider=provider, session_options=session_options
+            )
+
+        if self.onnx_cache_dir is None:
+            raise ValueError("onnx_cache_dir is required to store the int8-quantized ONNX model.")
+        quantized_dir = self.onnx_cache_dir / f"{self.model_name.replace('/', '__')}-int8"
+        if not quantized_dir.exists():
+            # 처음 한 번만 ONNX 로 내보내고 int8 동적 양자화한 모델을 저장합니다.
+            logger.info("Exporting %s to int8 ONNX at %s", self.model_name, quantized_dir)
+            exported = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(exported)
+            quantizer.quantize(
+                save_dir=quantized_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False),
+            )
+        return tokenizer, ORTModelForFeatureExtraction.from_pretrained(
+            quantized_dir, file_name="model_quantized.onnx", provider=provider, session_options=session_options
+        )
+
+    @staticmethod
+    def _configure_cpu_threads(threads: int) -> None:
+        try:
+            import torch
+        except ImportError:
+            return
+        torch.set_num_threads(threads)
@@ -1,5 +1,6 @@
 import json
 import logging
+import logging.handlers
 from datetime import datetime
 from pathlib import Path
 
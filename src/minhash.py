@@ -0,0 +1,109 @@
+# src/minhash.py
+import re
+import zlib
+from collections import defaultdict
+from collections.abc import Hashable, Iterator
+
+import numpy as np
+
+
+# 해시 값 범위(32-bit)보다 큰 메르센 소수. a * h + b 가 uint64 를 넘지 않도록 a, b 는 32-bit 로 뽑습니다.
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """대소문자와 공백 차이를 무시하도록 텍스트를 정규화합니다."""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class MinHasher:
+    """
+    문자 n-gram(shingle) 집합의 MinHash 서명을 계산합니다.
+
+    한국어는 형태소 분석 없이도 문자 n-gram 으로 유사도를 충분히 잘 잡아냅니다.
+    해시 함수와 시드가 고정되어 있으므로 서명은 프로세스가 달라도 같습니다. (디스크에 저장 가능)
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set[str]:
+        text = normalize_text(text)
+        if len(text) <= self.shingle_size:
+            return {text} if text else set()
+        return {text[i : i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """텍스트의 MinHash 서명 (길이 num_perm 의 uint64 배열)을 반환합니다."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (num_shingles, num_perm) 행렬로 모든 순열을 한 번에 계산합니다.
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """두 서명으로 추정한 Jaccard 유사도."""
+        return float(np.mean(sig_a == sig_b))
+
+
+class MinHashLSH:
+    """
+    MinHash 서명을 band 단위로 나눠 버킷에 넣는 LSH 인덱스.
+    `query` 는 한 band 라도 같은 후보만 골라 서명 유사도를 확인하므로 전체 비교 없이 근접 중복을 찾습니다.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: list[defaultdict[bytes, list[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._signatures)
+
+    def insert(self, key: Hashable, signature: np.ndarray) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def query(self, signature: np.ndarray, threshold: float) -> list[tuple[Hashable, float]]:
+        """유사도가 threshold 이상인 (key, 유사도) 목록을 유사도 내림차순으로 반환합니다."""
+        candidates = list({key for band, band_key in enumerate(self._band_keys(signature)) for key in self._buckets[band].get(band_key, ())})
+        if not candidates:
+            return []
+        # 후보 서명을 한 행렬로 쌓아 유사도를 한 번에 계산합니다.
+        similarities = (np.stack([self._signatures[key] for key in candidates]) == signature).mean(axis=1)
+        order = np.argsort(-similarities, kind="stable")
+        return [(candidates[i], float(similarities[i])) for i in order if similarities[i] >= threshold]
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[band * self.rows : (band + 1) * self.rows].tobytes() for band in range(self.bands)]
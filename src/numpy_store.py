@@ -0,0 +1,415 @@
+# src/numpy_store.py
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as LangChainVectorStore
+
+
+VECTORS_FILE = "vectors.npy"
+CODES_FILE = "codes.npy"
+SCALES_FILE = "scales.npy"
+METADATA_FILE = "metadata.json"
+QUANTIZATIONS = ("none", "int8", "binary")
+# float16 / int8 행렬은 이 행 수만큼씩 float32 로 올려서 곱합니다. (NumPy 의 float16·정수 행렬곱은 CPU 에서 매우 느리고, 블록이 작아야 캐시에 머뭅니다)
+_SCORE_BLOCK_ROWS = 1024
+
+
+def maximal_marginal_relevance(
+    query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5
+) -> list[int]:
+    """
+    정규화된 벡터에 대해 MMR 로 k 개를 고릅니다. (candidates 안의 인덱스 목록을 반환)
+
+    후보끼리의 유사도 행렬을 한 번에 계산하고, 이미 고른 문서와의 최대 유사도를 벡터로 갱신하므로
+    반복마다 파이썬 루프 없이 O(후보 수) 연산만 합니다.
+    """
+    if len(candidates) == 0 or k <= 0:
+        return []
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+    k = min(k, len(candidates))
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = pairwise[selected[0]].copy()
+    chosen = np.zeros(len(candidates), dtype=bool)
+    chosen[selected[0]] = True
+    for _ in range(k - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[chosen] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        chosen[best] = True
+        np.maximum(max_similarity, pairwise[best], out=max_similarity)
+    return selected
+
+
+def _argtop(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k 개의 인덱스를 점수 내림차순으로 반환합니다. (전체 정렬 대신 argpartition)"""
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _replace_file(target: Path, write: Callable[[IO[bytes]], Any]) -> None:
+    """같은 폴더의 임시 파일에 쓴 뒤 `os.replace` 로 바꿉니다. (기존 파일의 memory-map 은 이전 내용을 유지)"""
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(temp_path, target)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class _Snapshot(NamedTuple):
+    """검색 한 번에 쓰는 저장소 상태. 잠금 안에서 만들어 두면 이후 쓰기와 섞이지 않습니다."""
+
+    vectors: np.ndarray
+    codes: np.ndarray | None
+    scales: np.ndarray | None
+    ids: list[str]
+    texts: list[str]
+    metadatas: list[dict]
+
+    def document(self, position: int) -> Document:
+        return Document(id=self.ids[position], page_content=self.texts[position], metadata=self.metadatas[position])
+
+
+class NumpyVectorStore(LangChainVectorStore):
+    """
+    벡터를 하나의 연속된 NumPy 행렬(float32 또는 float16)에 담는 프로세스 내 벡터 저장소.
+
+    - 벡터는 정규화하여 저장하므로 코사인 유사도가 행렬-벡터 곱 한 번으로 계산됩니다. (정확한 top-k)
+    - `save(path)` 는 `vectors.npy` + `metadata.json` 을 쓰고, `load(path)` 는 `.npy` 를 읽기 전용
+      memory-map 으로 열어 여러 워커 프로세스가 같은 페이지 캐시를 공유합니다.
+      불러온 저장소에 문서를 추가하면 그때 메모리로 복사합니다.
+    - 행렬은 용량을 두 배씩 늘려 가며 채우므로 배치 추가가 전체 복사를 반복하지 않습니다.
+    - `quantization` 이 "int8"(차원당 1바이트) 또는 "binary"(차원당 1비트)이면 양자화한 코드로 후보
+      `k * rerank_factor` 개를 고른 뒤 원래 벡터로 다시 점수를 매깁니다. 저장 후 다시 열면 코드만 메모리에
+      올리고 원래 벡터는 memory-map 으로 두므로, 재정렬에 쓰인 행만 읽힙니다.
+    - 여러 수집 스레드가 동시에 upsert 해도 되도록 쓰기는 잠금 안에서 하고, 검색은 잠금 안에서 만든
+      스냅샷(행렬 view + 목록)으로 계산합니다. 새 문서는 스냅샷 범위 밖의 행에만 쓰고, 행렬을 키우거나
+      이미 있는 id 를 덮어쓰거나 delete 하면 새 배열/목록을 만들어 쓰므로(copy-on-write) 스냅샷은 그대로 유효합니다.
+    """
+
+    def __init__(
+        self, embedding: Embeddings, dtype: str = "float32", quantization: str = "none", rerank_factor: int = 4
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization} (choose from {QUANTIZATIONS})")
+        self.embedding = embedding
+        self.dtype = np.dtype(dtype)
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self._codes: np.ndarray | None = None
+        self._scales: np.ndarray | None = None
+        self._matrix = np.empty((0, 0), dtype=self.dtype)
+        self._size = 0
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict] = []
+        self._positions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """저장된 벡터 행렬 (행 = 문서, 정규화됨)."""
+        with self._lock:
+            return self._matrix[: self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """벡터(양자화 코드 포함)와 본문이 차지하는 대략적인 바이트 수."""
+        snapshot = self._snapshot()
+        return snapshot.vectors.nbytes + self._index_nbytes(snapshot) * (self.quantization != "none") + sum(
+            len(text.encode()) for text in snapshot.texts[: len(snapshot.vectors)]
+        )
+
+    @property
+    def index_nbytes(self) -> int:
+        """검색 시 전부 읽는 행렬의 바이트 수. (양자화하면 코드, 아니면 벡터 행렬)"""
+        return self._index_nbytes(self._snapshot())
+
+    @staticmethod
+    def _index_nbytes(snapshot: _Snapshot) -> int:
+        if snapshot.codes is None:
+            return snapshot.vectors.nbytes
+        return snapshot.codes.nbytes + (snapshot.scales.nbytes if snapshot.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --- 쓰기 ---
+
+    def add_texts(
+        self, texts: Iterable[str], metadatas: list[dict] | None = None, *, ids: list[str] | None = None, **kwargs: Any
+    ) -> list[str]:
+        texts = list(texts)
+        vectors = self.embedding.embed_documents(texts)
+        return self.upsert(ids or [str(uuid.uuid4()) for _ in texts], vectors, texts, metadatas)
+
+    def upsert(
+        self, ids: Sequence[str], embeddings, texts: Sequence[str], metadatas: Sequence[dict | None] | None = None
+    ) -> list[str]:
+        """이미 계산된 벡터를 저장합니다. 같은 id 가 있으면 덮어씁니다."""
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32)).astype(self.dtype)
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            if len(vectors) and self._matrix.shape[1] not in (0, vectors.shape[1]):
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store ({self._matrix.shape[1]}).")
+
+            new_ids = {doc_id for doc_id in ids if doc_id not in self._positions}
+            matrix = self._matrix
+            self._reserve(self._size + len(new_ids), vectors.shape[1] if len(vectors) else 0)
+            if len(new_ids) < len(set(ids)):
+                # 기존 행을 덮어쓰므로 스냅샷이 보고 있는 배열/목록 대신 복사본에 씁니다.
+                if self._matrix is matrix:
+                    self._matrix = matrix.copy()
+                self._texts = list(self._texts)
+                self._metadatas = list(self._metadatas)
+            for i, doc_id in enumerate(ids):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    position = self._size
+                    self._positions[doc_id] = position
+                    self._ids.append(doc_id)
+                    self._texts.append(texts[i])
+                    self._metadatas.append(metadatas[i] or {})
+                    self._size += 1
+                else:
+                    self._texts[position] = texts[i]
+                    self._metadatas[position] = metadatas[i] or {}
+                self._matrix[position] = vectors[i]
+            self._codes = self._scales = None
+        return list(ids)
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        removed = set(ids or [])
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in removed]
+            self._matrix = np.ascontiguousarray(self._matrix[: self._size][keep])
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._size = len(keep)
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._codes = self._scales = None
+        return True
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """행렬 용량을 `rows` 행 이상으로 늘립니다. `_lock` 을 잡은 상태에서 호출해야 합니다."""
+        capacity, current_dim = self._matrix.shape
+        # memory-map 으로 불러온 읽기 전용 행렬에 쓰기 전에 메모리로 복사합니다.
+        writable = self._matrix.flags.writeable and not isinstance(self._matrix, np.memmap)
+        if rows <= capacity and writable:
+            return
+        dim = current_dim or dim
+        grown = np.empty((max(rows, capacity * 2, 16), dim), dtype=self.dtype)
+        if self._size:
+            grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    # --- 읽기 ---
+
+    def get_by_ids(self, ids: Sequence[str], /) -> list[Document]:
+        with self._lock:
+            return [self._document(self._positions[doc_id]) for doc_id in ids if doc_id in self._positions]
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """id 순서대로 저장된 벡터(정규화됨)를 float32 행렬로 반환합니다. 없는 id 가 있으면 KeyError 를 발생시킵니다."""
+        with self._lock:
+            return np.asarray(self._matrix[[self._positions[doc_id] for doc_id in ids]], dtype=np.float32)
+
+    def documents(self) -> list[Document]:
+        """저장된 문서를 추가한 순서대로 반환합니다."""
+        with self._lock:
+            return [self._document(i) for i in range(self._size)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, **kwargs)]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """정확한 코사인 유사도 top-k."""
+        snapshot = self._snapshot()
+        indices, scores = self._top_k(snapshot, self._query_vector(embedding), k)
+        return [(snapshot.document(i), float(score)) for i, score in zip(indices, scores)]
+
+    def max_marginal_relevance_search(
+        self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> list[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+        )
+
+    def max_marginal_relevance_search_by_vector(
+        self, embedding: list[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> list[Document]:
+        query = self._query_vector(embedding)
+        snapshot = self._snapshot()
+        candidate_indices, _ = self._top_k(snapshot, query, max(k, fetch_k))
+        candidates = snapshot.vectors[candidate_indices].astype(np.float32)
+        selected = maximal_marginal_relevance(query, candidates, k, lambda_mult)
+        return [snapshot.document(int(candidate_indices[i])) for i in selected]
+
+    def _select_relevance_score_fn(self):
+        # 코사인 유사도 [-1, 1] 을 [0, 1] 관련도로 바꿉니다.
+        return lambda score: (score + 1) / 2
+
+    def _query_vector(self, embedding) -> np.ndarray:
+        return _normalize(np.asarray(embedding, dtype=np.float32))
+
+    def _snapshot(self) -> _Snapshot:
+        """잠금 안에서 현재 행렬 view 와 목록, (필요하면 다시 만든) 양자화 코드를 함께 가져옵니다."""
+        with self._lock:
+            codes, scales = self._quantized() if self.quantization != "none" and self._size else (None, None)
+            return _Snapshot(self._matrix[: self._size], codes, scales, self._ids, self._texts, self._metadatas)
+
+    def _top_k(self, snapshot: _Snapshot, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        size = len(snapshot.vectors)
+        if size == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        k = min(k, size)
+        if snapshot.codes is None:
+            scores = self._scores(snapshot.vectors, query)
+            top = _argtop(scores, k)
+            return top, scores[top]
+
+        # 양자화 코드로 후보를 넉넉히 고른 뒤, 후보만 원래 벡터로 정확히 다시 점수를 매깁니다.
+        candidates = _argtop(self._coarse_scores(snapshot, query), min(k * self.rerank_factor, size))
+        candidates.sort()  # memory-map 에서 행을 순서대로 읽도록 정렬합니다.
+        exact = snapshot.vectors[candidates].astype(np.float32) @ query
+        top = _argtop(exact, k)
+        return candidates[top], exact[top]
+
+    @staticmethod
+    def _scores(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if vectors.dtype == np.float32:
+            return vectors @ query
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), _SCORE_BLOCK_ROWS):
+            block = vectors[start : start + _SCORE_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32) @ query
+        return scores
+
+    def _coarse_scores(self, snapshot: _Snapshot, query: np.ndarray) -> np.ndarray:
+        codes, scales = snapshot.codes, snapshot.scales
+        if self.quantization == "binary":
+            # 부호 비트가 다른 차원 수(해밍 거리)가 작을수록 가깝습니다.
+            query_bits = np.packbits(query > 0)
+            return -np.bitwise_count(codes ^ query_bits).sum(axis=1, dtype=np.int32).astype(np.float32)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_BLOCK_ROWS):
+            block = codes[start : start + _SCORE_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32) @ query
+        return scores * scales
+
+    def _quantized(self) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        양자화 코드를 (필요하면 다시) 만듭니다. 문서가 바뀌면 upsert/delete 에서 비워 둡니다.
+        `_lock` 을 잡은 상태에서 호출해야 합니다.
+        """
+        if self._codes is None or len(self._codes) != self._size:
+            vectors = self._matrix[: self._size].astype(np.float32)
+            if self.quantization == "binary":
+                self._codes, self._scales = np.packbits(vectors > 0, axis=1), None
+            else:
+                # 행마다 최대 절댓값을 127 로 맞추는 대칭 int8 양자화
+                scales = np.clip(np.abs(vectors).max(axis=1), 1e-12, None) / 127
+                self._codes = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._scales = scales.astype(np.float32)
+        return self._codes, self._scales
+
+    def _document(self, position: int) -> Document:
+        return Document(id=self._ids[position], page_content=self._texts[position], metadata=self._metadatas[position])
+
+    # --- 저장 / 불러오기 ---
+
+    def save(self, path: Path) -> None:
+        """
+        `path` 폴더에 벡터(.npy)와 메타데이터(.json)를 저장합니다.
+        파일마다 임시 파일에 쓴 뒤 바꿔치기하므로, 이 폴더를 memory-map 으로 열고 있는 저장소(자기 자신 포함)는
+        저장 중에도 이전 파일을 그대로 읽습니다.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        snapshot = self._snapshot()
+        size = len(snapshot.vectors)
+        _replace_file(path / VECTORS_FILE, lambda f: np.save(f, np.ascontiguousarray(snapshot.vectors)))
+        for name, array in ((CODES_FILE, snapshot.codes), (SCALES_FILE, snapshot.scales)):
+            if array is not None:
+                _replace_file(path / name, lambda f, array=array: np.save(f, array))
+            else:
+                (path / name).unlink(missing_ok=True)
+        metadata = {
+            "dtype": self.dtype.name,
+            "quantization": self.quantization,
+            "rerank_factor": self.rerank_factor,
+            "ids": snapshot.ids[:size],
+            "texts": snapshot.texts[:size],
+            "metadatas": snapshot.metadatas[:size],
+        }
+        _replace_file(path / METADATA_FILE, lambda f: f.write(json.dumps(metadata, ensure_ascii=False).encode("utf-8")))
+
+    @classmethod
+    def load(cls, path: Path, embedding: Embeddings, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        save() 로 저장한 폴더를 엽니다. `mmap=True` 이면 벡터를 읽기 전용 memory-map 으로 엽니다.
+        양자화 코드는 검색마다 전부 읽으므로 메모리로 불러옵니다.
+        """
+        path = Path(path)
+        metadata = json.loads((path / METADATA_FILE).read_text(encoding="utf-8"))
+        store = cls(
+            embedding,
+            dtype=metadata["dtype"],
+            quantization=metadata.get("quantization", "none"),
+            rerank_factor=metadata.get("rerank_factor", 4),
+        )
+        store._matrix = np.load(path / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        store._size = len(metadata["ids"])
+        store._ids = metadata["ids"]
+        store._texts = metadata["texts"]
+        store._metadatas = metadata["metadatas"]
+        store._positions = {doc_id: i for i, doc_id in enumerate(store._ids)}
+        if (path / CODES_FILE).exists():
+            store._codes = np.load(path / CODES_FILE)
+            store._scales = np.load(path / SCALES_FILE) if (path / SCALES_FILE).exists() else None
+        return store
+
+    @classmethod
+    def from_texts(
+        cls, texts: list[str], embedding: Embeddings, metadatas: list[dict] | None = None, **kwargs: Any
+    ) -> "NumpyVectorStore":
+        store = cls(
+            embedding,
+            dtype=kwargs.pop("dtype", "float32"),
+            quantization=kwargs.pop("quantization", "none"),
+            rerank_factor=kwargs.pop("rerank_factor", 4),
+        )
+        store.add_texts(texts, metadatas, **kwargs)
+        return store
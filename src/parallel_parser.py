@@ -0,0 +1,125 @@
+# src/parallel_parser.py
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+import pymupdf
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+from src.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# 페이지 번호를 담는 메타데이터 키 (PyMuPDFLoader 는 0-based "page", unstructured 는 1-based "page_number")
+PAGE_METADATA_KEYS = ("page", "page_number")
+
+
+def split_page_ranges(total_pages: int, pages_per_task: int) -> list[tuple[int, int]]:
+    """전체 페이지를 [start, end) 구간 목록으로 나눕니다."""
+    pages_per_task = max(1, pages_per_task)
+    return [(start, min(start + pages_per_task, total_pages)) for start in range(0, total_pages, pages_per_task)]
+
+
+def load_pdf_parallel(
+    filepath: Path,
+    loader_factory: Callable[[Path], BaseLoader],
+    max_workers: int | None = None,
+    pages_per_task: int = 8,
+    source_name: str | None = None,
+) -> Iterator[Document]:
+    """
+    PDF 를 페이지 구간으로 나눠 워커 프로세스 풀에서 파싱하고, 원래 페이지 순서대로 하나씩 반환합니다.
+
+    구간은 워커 수의 두 배까지만 미리 제출하므로, 앞 구간의 페이지를 소비하는 동안 뒤 구간을 파싱하면서도
+    메모리에 올라오는 페이지 수는 문서 크기와 관계없이 일정합니다.
+
+    각 구간은 원본의 메타데이터를 복사한 임시 PDF 로 잘라 `loader_factory` 로 만든 로더에 넘깁니다.
+    결과의 페이지 번호와 파일 경로 메타데이터는 원본 파일 기준으로 되돌리므로,
+    단일 프로세스로 `loader.load()` 한 것과 같은 메타데이터를 갖습니다.
+
+    Args:
+        filepath: 파싱할 PDF 경로
+        loader_factory: 경로를 받아 로더를 만드는 함수. 프로세스로 전달되므로 pickle 가능해야 합니다.
+        max_workers: 워커 프로세스 수 (None 이면 CPU 코어 수)
+        pages_per_task: 한 작업이 담당할 페이지 수
+        source_name: 메타데이터의 `source` 에 기록할 이름 (None 이면 filepath)
+    """
+    filepath = Path(filepath)
+    with pymupdf.open(filepath) as pdf:
+        total_pages = len(pdf)
+
+    page_ranges = split_page_ranges(total_pages, pages_per_task)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(page_ranges))
+    if max_workers <= 1:
+        # 원본을 그대로 파싱하므로 페이지 번호는 그대로 두고, source 이름만 다른 경로와 같게 맞춥니다.
+        for doc in loader_factory(filepath).lazy_load():
+            yield _rebase_metadata(doc, filepath, 0, total_pages, source_name)
+        return
+
+    logger.info("Parsing %d pages in %d tasks on %d processes.", total_pages, len(page_ranges), max_workers)
+    # Streamlit 처럼 스레드가 여럿인 프로세스에서 fork 는 안전하지 않으므로 spawn 을 사용합니다.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        pending = iter(page_ranges)
+        inflight: deque[Future] = deque()
+        try:
+            while True:
+                while len(inflight) < max_workers * 2 and (page_range := next(pending, None)) is not None:
+                    start, end = page_range
+                    inflight.append(
+                        executor.submit(_load_page_range, filepath, loader_factory, start, end, total_pages, source_name)
+                    )
+                if not inflight:
+                    break
+                # 제출 순서대로 결과를 꺼내므로 페이지 순서가 유지됩니다.
+                yield from inflight.popleft().result()
+        finally:
+            # 소비를 중간에 멈추면 아직 시작하지 않은 구간은 취소합니다.
+            for future in inflight:
+                future.cancel()
+
+
+def _load_page_range(
+    filepath: Path,
+    loader_factory: Callable[[Path], BaseLoader],
+    start: int,
+    end: int,
+    total_pages: int,
+    source_name: str | None,
+) -> list[Document]:
+    """[워커 프로세스] 페이지 구간만 잘라낸 PDF 를 파싱하고 메타데이터를 원본 기준으로 되돌립니다."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        part_path = Path(temp_dir) / filepath.name
+        with pymupdf.open(filepath) as pdf, pymupdf.open() as part:
+            part.insert_pdf(pdf, from_page=start, to_page=end - 1)
+            part.set_metadata(pdf.metadata)
+            part.save(part_path)
+
+        documents = loader_factory(part_path).load()
+
+    return [_rebase_metadata(doc, filepath, start, total_pages, source_name) for doc in documents]
+
+
+def _rebase_metadata(
+    doc: Document, filepath: Path, page_offset: int, total_pages: int, source_name: str | None
+) -> Document:
+    meta = dict(doc.metadata)
+    for key in PAGE_METADATA_KEYS:
+        if isinstance(meta.get(key), int):
+            meta[key] += page_offset
+    for key in ("source", "file_path"):
+        if key in meta:
+            meta[key] = source_name or str(filepath)
+    if "filename" in meta:
+        meta["filename"] = Path(source_name).name if source_name else filepath.name
+    if "file_directory" in meta:
+        meta["file_directory"] = str(filepath.parent)
+    if "total_pages" in meta:
+        meta["total_pages"] = total_pages
+    return Document(page_content=doc.page_content, metadata=meta)
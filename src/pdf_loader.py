@@ -0,0 +1,63 @@
+# src/pdf_loader.py
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+
+import pymupdf
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+
+# 파일 경로 또는 메모리에 올라와 있는 PDF 내용
+PDFSource = str | Path | bytes | bytearray | memoryview | mmap.mmap
+
+
+def is_in_memory(source: PDFSource) -> bool:
+    """PDF 가 파일 경로가 아니라 메모리 버퍼로 주어졌는지 확인합니다."""
+    return isinstance(source, bytes | bytearray | memoryview | mmap.mmap)
+
+
+def as_buffer(source: bytes | bytearray | memoryview | mmap.mmap) -> bytes | memoryview:
+    """PyMuPDF 가 복사 없이 읽을 수 있는 형태(bytes 또는 memoryview)로 바꿉니다."""
+    if isinstance(source, bytes | memoryview):
+        return source
+    # bytearray 는 PyMuPDF 가 bytes 로 복사하고, mmap 은 stream 으로 받지 않으므로 memoryview 로 감쌉니다.
+    return memoryview(source)
+
+
+def open_pdf(source: PDFSource) -> pymupdf.Document:
+    """경로 또는 메모리 버퍼에서 PDF 를 엽니다."""
+    if is_in_memory(source):
+        return pymupdf.open(stream=as_buffer(source), filetype="pdf")
+    return pymupdf.open(source)
+
+
+class PyMuPDFPageLoader(BaseLoader):
+    """
+    PyMuPDF 로 PDF 를 페이지 단위 Document 로 읽는 로더.
+
+    PyMuPDFLoader 와 달리 파일 경로뿐 아니라 bytes / memoryview / mmap 도 받을 수 있어서,
+    업로드된 파일을 임시 파일로 쓰고 다시 읽는 과정 없이 메모리에서 바로 파싱합니다.
+    메타데이터는 PyMuPDFLoader 와 같은 키(`source`, `file_path`, `page`, `total_pages` 와 PDF 문서 정보)를 사용합니다.
+    """
+
+    def __init__(self, source: PDFSource, source_name: str | None = None):
+        self.source = source
+        self.source_name = source_name or (str(source) if not is_in_memory(source) else "document.pdf")
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open_pdf(self.source) as pdf:
+            doc_metadata = {
+                "producer": "PyMuPDF",
+                "creator": "PyMuPDF",
+                "creationdate": "",
+                "source": self.source_name,
+                "file_path": self.source_name,
+                "total_pages": pdf.page_count,
+            }
+            for key, value in pdf.metadata.items():
+                if isinstance(value, str) and value.strip():
+                    doc_metadata[key.lower()] = value.strip()
+
+            for page in pdf:
+                yield Document(page_content=page.get_text().strip(), metadata={**doc_metadata, "page": page.number})
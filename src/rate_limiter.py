@@ -0,0 +1,56 @@
+# src/rate_limiter.py
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    스레드 안전한 토큰 버킷 속도 제한기.
+
+    초당 `rate` 개씩 토큰이 채워지고 최대 `capacity` 개까지 쌓입니다.
+    `acquire(n)` 은 토큰 n 개가 모일 때까지 기다렸다가 꺼냅니다. (요청 수 / 토큰 수 제한 모두에 사용)
+    `aacquire(n)` 은 같은 버킷을 이벤트 루프를 막지 않고 기다립니다. (스레드와 코루틴이 한 버킷을 함께 쓸 수 있습니다)
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """토큰을 꺼냅니다. 기다린 시간(초)을 반환합니다."""
+        # 용량보다 큰 요청은 용량만큼만 기다리게 하여 영원히 막히지 않도록 합니다.
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while (delay := self._try_take(amount)) > 0:
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def aacquire(self, amount: float = 1.0) -> float:
+        """acquire() 의 비동기 버전."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while (delay := self._try_take(amount)) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+    def _try_take(self, amount: float) -> float:
+        """토큰이 충분하면 꺼내고 0 을, 부족하면 더 기다려야 하는 시간을 반환합니다."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -1,21 +1,253 @@
 # src/retriever.py
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, PrivateAttr
+
 from src.vector_store import VectorStore
-from src.config import SEARCH_KWARGS, SEARCH_TYPE
+from src.numpy_store import maximal_marginal_relevance
+from src.config import (
+    SEARCH_KWARGS,
+    SEARCH_TYPE,
+    MMR_IN_MEMORY,
+    MMR_FETCH_K,
+    MMR_LAMBDA_MULT,
+    QUERY_CACHE_ENABLED,
+    QUERY_CACHE_MAX_ENTRIES,
+    RETRIEVAL_MODE,
+    LEXICAL_FETCH_K,
+    LEXICAL_RRF_K,
+)
+from src.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class InMemoryMMRRetriever(BaseRetriever):
+    """
+    세션의 청크 임베딩 행렬을 메모리에 들고 MMR 검색을 하는 Retriever.
+
+    쿼리마다 벡터 저장소에서 후보 임베딩을 다시 읽지 않고, 쿼리-청크 유사도와 후보 간 중복도 행렬을
+    NumPy 연산 한 번씩으로 계산합니다. `vector_store` 를 주면 문서가 추가되었을 때(version 변경) 행렬을 다시 읽습니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embeddings: Embeddings
+    documents: list[Document]
+    matrix: np.ndarray
+    k: int = 4
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+    vector_store: Any = None
+    _version: int = PrivateAttr(default=0)
+
+    @classmethod
+    def from_vector_store(cls, vector_store: VectorStore, **kwargs) -> "InMemoryMMRRetriever":
+        documents, matrix = cls._load(vector_store)
+        retriever = cls(
+            embeddings=vector_store.embeddings, documents=documents, matrix=matrix, vector_store=vector_store, **kwargs
+        )
+        retriever._version = vector_store.version
+        return retriever
+
+    @staticmethod
+    def _load(vector_store: VectorStore) -> tuple[list[Document], np.ndarray]:
+        documents, matrix = vector_store.get_embeddings()
+        if len(matrix):
+            matrix = matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+        return documents, matrix
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        if self.vector_store is not None and self.vector_store.version != self._version:
+            self._version = self.vector_store.version
+            self.documents, self.matrix = self._load(self.vector_store)
+        if not self.documents:
+            return []
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+
+        scores = self.matrix @ query_vector
+        fetch_k = min(max(self.k, self.fetch_k), len(scores))
+        candidates = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+        selected = maximal_marginal_relevance(query_vector, self.matrix[candidates], self.k, self.lambda_mult)
+        return [self.documents[int(candidates[i])] for i in selected]
+
+
+class LexicalRetriever(BaseRetriever):
+    """BM25 역색인만 사용하는 Retriever. 임베딩 API 를 호출하지 않습니다."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        return [doc for doc, _ in self.vector_store.lexical_index.search(query, self.k)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 검색과 임베딩 검색의 순위를 Reciprocal Rank Fusion 으로 합칩니다.
+    문서 점수 = Σ 1 / (rrf_k + 순위) 이므로 한쪽에서만 높은 문서보다 양쪽에서 모두 상위인 문서가 앞에 옵니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    dense_retriever: BaseRetriever
+    vector_store: Any
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        dense = self.dense_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        lexical = [doc for doc, _ in self.vector_store.lexical_index.search(query, max(self.k, self.fetch_k))]
+
+        scores: dict[str, float] = {}
+        documents: dict[str, Document] = {}
+        for ranking in (dense, lexical):
+            for rank, doc in enumerate(ranking, start=1):
+                key = doc.id or doc.page_content
+                scores[key] = scores.get(key, 0.0) + 1 / (self.rrf_k + rank)
+                documents.setdefault(key, doc)
+        ranked = sorted(scores, key=scores.get, reverse=True)[: self.k]
+        return [documents[key] for key in ranked]
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 공백, 앞뒤 문장부호만 다른 쿼리를 같은 키로 만듭니다."""
+    normalized = " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+    return normalized.strip(" .,!?;:'\"")
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    검색 결과를 세션 단위 LRU 로 캐시하는 Retriever 래퍼.
+
+    키는 정규화한 쿼리 + search_type + search_kwargs 입니다. 캐시에 있으면 내부 retriever 를 호출하지 않으므로
+    쿼리 임베딩 API 호출과 벡터 검색이 모두 생략됩니다. `vector_store` 의 version 이 바뀌면(문서 추가) 캐시를 비웁니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    retriever: BaseRetriever
+    vector_store: Any = None
+    search_type: str = SEARCH_TYPE
+    search_kwargs: dict = {}
+    max_entries: int = 128
+    hits: int = 0
+    misses: int = 0
+    _cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _version: int | None = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        key = (normalize_query(query), self.search_type, json.dumps(self.search_kwargs, sort_keys=True, default=str))
+        with self._lock:
+            version = self.vector_store.version if self.vector_store is not None else None
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                logger.debug("Retriever cache hit: %r", query)
+                return [doc.model_copy(deep=True) for doc in self._cache[key]]
+            self.misses += 1
+
+        documents = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        with self._lock:
+            # 검색하는 동안 문서가 추가되었다면 오래된 결과이므로 저장하지 않습니다.
+            if self._version == (self.vector_store.version if self.vector_store is not None else None):
+                self._cache[key] = [doc.model_copy(deep=True) for doc in documents]
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return documents
+
+
+class UsageTrackingRetriever(BaseRetriever):
+    """검색할 때마다(캐시 적중 포함) `on_use` 를 호출하는 Retriever 래퍼. 세션이 쓰는 컬렉션의 TTL 을 연장하는 데 씁니다."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    retriever: BaseRetriever
+    on_use: Callable[[], None]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        try:
+            self.on_use()
+        except Exception:
+            # 사용 기록은 부가 기능이므로 실패해도 검색은 계속합니다.
+            logger.warning("Failed to record retriever usage", exc_info=True)
+        return self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+
 
 class RetrieverFactory:
     """
     설정 파일(config.yaml)에 정의된 값을 기반으로 Retriever를 생성하는 팩토리 클래스.
     """
     @staticmethod
-    def create(vector_store: VectorStore):
+    def create(vector_store: VectorStore, on_use: Callable[[], None] | None = None):
         """
         주어진 VectorStore와 중앙 설정 값을 사용하여 Retriever를 생성합니다.
+        search_type 이 "mmr" 이고 `mmr.in_memory` 가 켜져 있으면 InMemoryMMRRetriever 를 사용합니다.
+        retrieval_mode 가 "hybrid" 이면 BM25 와 RRF 로 결합하고, "lexical" 이면 BM25 만 사용합니다.
+        `query_cache.enabled` 이면 결과를 CachedRetriever 로 감쌉니다.
+        `on_use` 를 주면 검색할 때마다 호출합니다. (예: CollectionManager.mark_used)
         Args:
             vector_store (VectorStore): Retriever를 생성할 기반 VectorStore 객체.
+            on_use (Callable | None): 검색할 때마다 호출할 함수.
         Returns:
             langchain_core.retrievers.BaseRetriever: 설정된 Retriever 객체.
         """
-        return vector_store.as_retriever(
-            search_type=SEARCH_TYPE,
-            search_kwargs=SEARCH_KWARGS,
-        )
+        if SEARCH_TYPE == "mmr":
+            search_kwargs = {"fetch_k": MMR_FETCH_K, "lambda_mult": MMR_LAMBDA_MULT, **SEARCH_KWARGS}
+        else:
+            search_kwargs = SEARCH_KWARGS
+        k = search_kwargs.get("k", 4)
+        # hybrid 에서는 임베딩 검색도 fetch_k 개의 후보 순위를 내놓아야 RRF 로 합칠 수 있습니다.
+        dense_kwargs = dict(search_kwargs)
+        if RETRIEVAL_MODE == "hybrid":
+            dense_kwargs["k"] = max(k, LEXICAL_FETCH_K)
+            if "fetch_k" in dense_kwargs:
+                dense_kwargs["fetch_k"] = max(dense_kwargs["fetch_k"], dense_kwargs["k"])
+
+        if RETRIEVAL_MODE == "lexical":
+            retriever = LexicalRetriever(vector_store=vector_store, k=k)
+        elif SEARCH_TYPE == "mmr" and MMR_IN_MEMORY:
+            retriever = InMemoryMMRRetriever.from_vector_store(vector_store, **dense_kwargs)
+        else:
+            retriever = vector_store.as_retriever(
+                search_type=SEARCH_TYPE,
+                search_kwargs=dense_kwargs,
+            )
+
+        if RETRIEVAL_MODE == "hybrid":
+            retriever = HybridRetriever(
+                dense_retriever=retriever, vector_store=vector_store, k=k, fetch_k=LEXICAL_FETCH_K, rrf_k=LEXICAL_RRF_K
+            )
+        elif RETRIEVAL_MODE not in ("dense", "lexical"):
+            raise ValueError(f"Unsupported retrieval mode: {RETRIEVAL_MODE}")
+
+        if QUERY_CACHE_ENABLED:
+            retriever = CachedRetriever(
+                retriever=retriever,
+                vector_store=vector_store,
+                search_type=f"{RETRIEVAL_MODE}:{SEARCH_TYPE}",
+                search_kwargs=search_kwargs,
+                max_entries=QUERY_CACHE_MAX_ENTRIES,
+            )
+        if on_use is not None:
+            retriever = UsageTrackingRetriever(retriever=retriever, on_use=on_use)
+        return retriever
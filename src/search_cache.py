@@ -0,0 +1,248 @@
+# src/search_cache.py
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from src.config import (
+    TAVILY_SIMILARITY_THRESHOLD,
+    TAVILY_MAX_RESULTS,
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_PATH,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_CACHE_CANDIDATE_THRESHOLD,
+)
+from src.logger import get_logger
+from src.minhash import MinHasher, MinHashLSH, normalize_text
+
+
+logger = get_logger(__name__)
+
+# 쿼리는 짧으므로 문서 중복 제거(5-gram)보다 작은 3-gram 으로 서명을 만듭니다.
+_SHINGLE_SIZE = 3
+_NUM_PERM = 64
+# 32 band x 2 row: 추정 Jaccard 약 0.3 이상이면 높은 확률로 후보가 됩니다. (candidate_threshold 기본값과 맞춤)
+# 짧은 쿼리는 한두 글자만 달라도 3-gram Jaccard 가 크게 떨어지므로, band 를 잘게 나눠 후보를 넓게 잡습니다.
+_BANDS = 32
+# SequenceMatcher 로 다시 비교할 최대 후보 수 (추정 Jaccard 유사도 순)
+_MAX_CANDIDATES = 16
+# 다른 프로세스가 추가한 항목을 가져오는 최소 간격 (초)
+_SYNC_INTERVAL = 1.0
+
+
+class SearchCache:
+    """
+    유사한 웹 검색 쿼리의 결과를 재사용하는 영속 캐시.
+
+    - 문자 3-gram MinHash/LSH 인덱스로 후보 쿼리를 찾고(`candidate_threshold` 이상), 후보에 대해서만
+      SequenceMatcher 비율이 `similarity_threshold` 이상인지 확인합니다.
+    - LSH 는 확률적이어서 비율이 기준을 넘는 쿼리를 놓칠 수 있으므로, 후보에서 찾지 못하면 길이로 걸러 낸
+      나머지 쿼리를 SequenceMatcher 로 다시 확인합니다. (비율의 상한 2·min(길이)/(길이 합) 이 기준 미만이면 건너뜀)
+    - 결과는 SQLite 에 저장되어 세션과 프로세스가 공유합니다. 다른 프로세스가 추가한 항목은 조회 전에
+      인덱스로 가져오고, 삭제된 항목은 조회 시 확인하여 인덱스에서 뺍니다.
+    - `ttl_seconds` 가 지난 항목은 사용하지 않고, `max_entries` 를 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다.
+    - 결과는 `max_results` 별로 따로 저장합니다. (설정이 바뀌면 이전 결과를 쓰지 않습니다)
+    - `path` 가 None 이면 이 인스턴스 안에서만 쓰는 메모리 DB 를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        similarity_threshold: float = 0.9,
+        candidate_threshold: float = 0.3,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_results: int = 3,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.similarity_threshold = similarity_threshold
+        self.candidate_threshold = candidate_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_results = max_results
+        self.hits = 0
+        self.misses = 0
+        self._hasher = MinHasher(num_perm=_NUM_PERM, shingle_size=_SHINGLE_SIZE)
+        self._index = MinHashLSH(num_perm=_NUM_PERM, bands=_BANDS)
+        self._synced_at = 0.0
+        self._last_sync = 0.0
+        # 조회 시각(LRU)은 모아 두었다가 다음 쓰기/동기화 때 한 번에 기록합니다. (조회 경로에서 commit 을 피함)
+        self._touched: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+        if self.path is None:
+            # 공유 캐시 메모리 DB 는 연결이 하나라도 열려 있는 동안 유지되므로 연결 하나를 붙잡아 둡니다.
+            self._uri = f"file:search-cache-{id(self)}?mode=memory&cache=shared"
+            self._anchor = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._uri = self.path.as_uri()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query TEXT NOT NULL,
+                    max_results INTEGER NOT NULL,
+                    signature BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (query, max_results)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_last_access ON search_cache (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_created_at ON search_cache (created_at)")
+
+    def get(self, query: str) -> tuple[str, str] | None:
+        """유사한 쿼리의 캐시된 결과가 있으면 (캐시된 쿼리, 결과) 를, 없으면 None 을 반환합니다."""
+        normalized = normalize_text(query)
+        signature = self._hasher.signature(normalized)
+        with self._lock:
+            self._sync()
+            candidates = self._index.query(signature, self.candidate_threshold)
+        checked = [key for key, _ in candidates[:_MAX_CANDIDATES]]
+        match = self._best_match(normalized, checked)
+        if match is None:
+            # LSH 가 놓친 근접 쿼리를 찾기 위해, 길이상 기준을 넘을 수 있는 나머지 쿼리를 확인합니다.
+            with self._lock:
+                keys = list(self._index)
+            skip = set(checked)
+            match = self._best_match(normalized, [key for key in keys if key not in skip and self._may_match(normalized, key)])
+        with self._lock:
+            if match is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return match
+
+    def put(self, query: str, result: str) -> None:
+        normalized = normalize_text(query)
+        signature = self._hasher.signature(normalized)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache (query, max_results, signature, result, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (normalized, self.max_results, signature.tobytes(), result, now, now),
+            )
+            self._flush_touched(conn)
+            self._evict(conn, now)
+        with self._lock:
+            self._index.insert(normalized, signature)
+
+    @property
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM search_cache WHERE max_results = ?", (self.max_results,)).fetchone()
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0, "entries": entries}
+
+    def _best_match(self, normalized: str, keys: list[str]) -> tuple[str, str] | None:
+        """SequenceMatcher 비율이 기준 이상인 쿼리 중 가장 비슷한 것의 (쿼리, 결과) 를 반환합니다."""
+        # quick_ratio 류는 ratio 의 상한이므로 먼저 걸러 비싼 ratio() 계산을 줄입니다.
+        # 조회 쿼리를 두 번째 시퀀스로 고정하면 그 색인(b2j)을 한 번만 만들고 후보만 바꿔 가며 비교할 수 있습니다.
+        matcher = SequenceMatcher(None, b=normalized)
+        ranked = []
+        for key in keys:
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() >= self.similarity_threshold and matcher.quick_ratio() >= self.similarity_threshold:
+                ranked.append((matcher.ratio(), key))
+        for ratio, key in sorted(ranked, reverse=True):
+            if ratio < self.similarity_threshold:
+                break
+            if (result := self._load(key)) is not None:
+                return key, result
+        return None
+
+    def _may_match(self, a: str, b: str) -> bool:
+        """길이만으로 구한 SequenceMatcher 비율의 상한이 기준 이상인지 확인합니다."""
+        total = len(a) + len(b)
+        return total > 0 and 2 * min(len(a), len(b)) / total >= self.similarity_threshold
+
+    def _sync(self) -> None:
+        """다른 프로세스(또는 이전 실행)가 추가한 항목을 LSH 인덱스에 넣습니다. (최대 _SYNC_INTERVAL 마다)"""
+        now = time.monotonic()
+        if now - self._last_sync < _SYNC_INTERVAL:
+            return
+        self._last_sync = now
+        with closing(self._connect()) as conn, conn:
+            self._flush_touched(conn)
+            rows = conn.execute(
+                "SELECT query, signature, created_at FROM search_cache WHERE max_results = ? AND created_at > ? AND created_at > ?",
+                (self.max_results, self._synced_at, time.time() - self.ttl_seconds),
+            ).fetchall()
+        for key, blob, created_at in rows:
+            self._index.insert(key, np.frombuffer(blob, dtype=np.uint64))
+            self._synced_at = max(self._synced_at, created_at)
+
+    def _load(self, key: str) -> str | None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT result, created_at FROM search_cache WHERE query = ? AND max_results = ?", (key, self.max_results)
+            ).fetchone()
+        with self._lock:
+            if row is None or now - row[1] > self.ttl_seconds:
+                # 다른 프로세스가 지웠거나 만료된 항목입니다.
+                self._index.remove(key)
+                return None
+            self._touched[key] = now
+        return row[0]
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        conn.executemany(
+            "UPDATE search_cache SET last_access = MAX(last_access, ?) WHERE query = ? AND max_results = ?",
+            [(at, key, self.max_results) for key, at in touched.items()],
+        )
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "SELECT rowid, query, max_results FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).fetchall()
+        (entries,) = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = max(0, entries - len(expired) - self.max_entries)
+        least_recent = conn.execute(
+            "SELECT rowid, query, max_results FROM search_cache WHERE created_at >= ? ORDER BY last_access ASC LIMIT ?",
+            (now - self.ttl_seconds, overflow),
+        ).fetchall() if overflow else []
+        evicted = expired + least_recent
+        if not evicted:
+            return
+        conn.executemany("DELETE FROM search_cache WHERE rowid = ?", [(rowid,) for rowid, _, _ in evicted])
+        with self._lock:
+            for _, key, max_results in evicted:
+                if max_results == self.max_results:
+                    self._index.remove(key)
+        logger.info("Evicted %d search cache entries (%d expired, %d LRU).", len(evicted), len(expired), len(least_recent))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, timeout=30)
+        if self.path is not None:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 캐시이므로 WAL 체크포인트 때만 fsync 합니다.
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> SearchCache:
+    """프로세스 전체(모든 세션)에서 공유하는 웹 검색 캐시. 설정에서 끄면 디스크에 저장하지 않습니다."""
+    return SearchCache(
+        SEARCH_CACHE_PATH if SEARCH_CACHE_ENABLED else None,
+        similarity_threshold=TAVILY_SIMILARITY_THRESHOLD,
+        candidate_threshold=SEARCH_CACHE_CANDIDATE_THRESHOLD,
+        max_entries=SEARCH_CACHE_MAX_ENTRIES,
+        ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+        max_results=TAVILY_MAX_RESULTS,
+    )
@@ -0,0 +1,93 @@
+# src/text_splitter.py
+import re
+from typing import Any
+
+from langchain_text_splitters import TextSplitter
+
+from src.tokenizer import Tokenizer, get_tokenizer
+
+
+# 마크다운 제목(# ...) 또는 번호가 붙은 제목(1. / 1.2) / Ⅰ. / 가.)으로 시작하는 줄
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+\S|(\d+(\.\d+)*|[IVX]+|[Ⅰ-Ⅻ]+|[가-하])[.)]\s+\S)")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。])\s+")
+
+
+class PageAwareTokenSplitter(TextSplitter):
+    """
+    토큰 수 기준으로 청크 크기를 맞추고, 페이지와 제목 경계를 지키는 텍스트 분할기.
+
+    - `split_documents` 는 Document(=페이지) 단위로 분할하므로 청크가 페이지를 넘지 않고 `page` 메타데이터가 유지됩니다.
+    - 페이지 안에서는 줄 단위로 토큰을 세어 `chunk_size` 토큰까지 채우고, 제목 줄을 만나면
+      현재 청크가 `chunk_size` 의 1/4 이상 찼을 때 새 청크를 시작합니다. (제목 앞에서는 overlap 을 붙이지 않습니다)
+    - 한 줄이 `chunk_size` 를 넘으면 문장 단위로, 문장도 넘으면 토큰 단위로 자릅니다.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        chunk_overlap: int = 64,
+        encoding: str = "auto",
+        tokenizer: Tokenizer | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._tokenizer = tokenizer or get_tokenizer(encoding)
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        return self._tokenizer
+
+    def split_text(self, text: str) -> list[str]:
+        chunks: list[str] = []
+        current: list[tuple[str, int]] = []
+        current_tokens = 0
+
+        for line, tokens, is_heading in self._iter_units(text):
+            # 줄바꿈 구분자도 한 토큰으로 셉니다.
+            cost = tokens + 1
+            starts_section = is_heading and current_tokens >= self._chunk_size // 4
+            if current and (current_tokens + cost > self._chunk_size or starts_section):
+                chunks.append("\n".join(unit for unit, _ in current))
+                current = [] if starts_section else self._overlap_tail(current, limit=self._chunk_size - cost)
+                current_tokens = sum(unit_tokens + 1 for _, unit_tokens in current)
+            current.append((line, tokens))
+            current_tokens += cost
+
+        if current:
+            chunks.append("\n".join(unit for unit, _ in current))
+        return chunks
+
+    def _iter_units(self, text: str):
+        """(텍스트, 토큰 수, 제목 여부) 단위를 반환합니다. chunk_size 를 넘는 줄은 더 잘게 나눕니다."""
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            tokens = self._tokenizer.count(line)
+            if tokens < self._chunk_size:
+                yield line, tokens, bool(HEADING_PATTERN.match(line))
+                continue
+            for sentence in SENTENCE_BOUNDARY.split(line):
+                sentence_tokens = self._tokenizer.count(sentence)
+                if sentence_tokens < self._chunk_size:
+                    yield sentence, sentence_tokens, False
+                else:
+                    yield from self._split_by_tokens(sentence)
+
+    def _split_by_tokens(self, text: str):
+        token_ids = self._tokenizer.encode(text)
+        window = self._chunk_size - 1
+        for start in range(0, len(token_ids), window):
+            piece = token_ids[start : start + window]
+            yield self._tokenizer.decode(piece), len(piece), False
+
+    def _overlap_tail(self, units: list[tuple[str, int]], limit: int) -> list[tuple[str, int]]:
+        """다음 청크 앞에 붙일 마지막 줄들 (chunk_overlap 과 limit 토큰 이내)."""
+        budget = min(self._chunk_overlap, limit)
+        tail: list[tuple[str, int]] = []
+        used = 0
+        for unit, tokens in reversed(units):
+            if used + tokens + 1 > budget:
+                break
+            tail.insert(0, (unit, tokens))
+            used += tokens + 1
+        return tail
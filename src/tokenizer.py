@@ -0,0 +1,73 @@
+# src/tokenizer.py
+from collections.abc import Callable
+from functools import lru_cache
+
+import tiktoken
+
+from src.config import EMBEDDING_MODEL, EMBEDDING_PROVIDER
+from src.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# 모델에 맞는 인코딩을 찾지 못했을 때 사용할 tiktoken 인코딩
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class Tokenizer:
+    """tiktoken 또는 Hugging Face 토크나이저를 같은 인터페이스(encode/decode/count)로 감싼 래퍼."""
+
+    def __init__(self, name: str, encode: Callable[[str], list[int]], decode: Callable[[list[int]], str]):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def count(self, text: str) -> int:
+        """텍스트의 토큰 수를 반환합니다."""
+        return len(self.encode(text))
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        """여러 텍스트의 토큰 수를 반환합니다."""
+        return [len(self.encode(text)) for text in texts]
+
+
+@lru_cache(maxsize=8)
+def get_tokenizer(name: str = "auto") -> Tokenizer:
+    """
+    토크나이저를 생성하고 프로세스 안에서 재사용합니다.
+
+    Args:
+        name: "auto" (현재 임베딩 모델에 맞는 토크나이저), "hf:<모델명>" (Hugging Face),
+            또는 tiktoken 인코딩 이름 (예: "cl100k_base")
+    """
+    if name == "auto":
+        if EMBEDDING_PROVIDER == "huggingface":
+            return get_tokenizer(f"hf:{EMBEDDING_MODEL}")
+        return get_tokenizer_for_model(EMBEDDING_MODEL)
+
+    if name.startswith("hf:"):
+        model_name = name.removeprefix("hf:")
+        try:
+            from transformers import AutoTokenizer
+
+            hf_tokenizer = AutoTokenizer.from_pretrained(model_name)
+        except (ImportError, OSError) as e:
+            logger.warning("Could not load tokenizer for %s (%s); falling back to %s", model_name, e, DEFAULT_ENCODING)
+            return get_tokenizer(DEFAULT_ENCODING)
+        return Tokenizer(
+            name,
+            encode=lambda text: hf_tokenizer.encode(text, add_special_tokens=False),
+            decode=hf_tokenizer.decode,
+        )
+
+    encoding = tiktoken.get_encoding(name)
+    return Tokenizer(name, encode=encoding.encode_ordinary, decode=encoding.decode)
+
+
+def get_tokenizer_for_model(model_name: str) -> Tokenizer:
+    """OpenAI 모델 이름에 맞는 tiktoken 토크나이저를 반환합니다. 모르는 모델이면 기본 인코딩을 사용합니다."""
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        encoding_name = DEFAULT_ENCODING
+    return get_tokenizer(encoding_name)
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 import streamlit as st
 
 from src.agent import BlogContentAgent
+from src.config import AGENT_STREAMING
+from src.event_loop import run_sync
 from src.ui.enums import SessionKey
 
 
@@ -69,7 +71,10 @@ class ContentsEditor:
         if st.button("블로그 초안 생성하기", type="primary"):
             model_name = agent.llm.model_name if hasattr(agent.llm, "model_name") else agent.llm.model
             with st.status(f"💬 초안 생성 중... (LLM: '{model_name}')", expanded=True) as status:
-                draft = agent.generate_draft(session_id)
+                if AGENT_STREAMING:
+                    draft = st.write_stream(agent.stream_draft(session_id))
+                else:
+                    draft = run_sync(agent.agenerate_draft(session_id))
                 st.session_state[SessionKey.BLOG_DRAFT] = draft
                 status.update(label="✅ 블로그 포스트 초안 생성 완료!", state="complete", expanded=False)
             st.rerun()
@@ -106,7 +111,11 @@ class ContentsEditor:
                         st.markdown(content_to_display)
 
             if user_request := st.chat_input("수정하고 싶은 내용을 입력하세요..."):
-                self._handle_user_prompt(agent, user_request, session_id)
+                if AGENT_STREAMING:
+                    with chat_container:
+                        self._stream_user_prompt(agent, user_request, session_id)
+                else:
+                    self._handle_user_prompt(agent, user_request, session_id)
 
     def _parse_ai_message(self, content: str, role: str) -> str:
         """
@@ -125,13 +134,29 @@ class ContentsEditor:
     def _handle_user_prompt(self, agent: BlogContentAgent, prompt: str, session_id: str):
         """Handles user input by calling the agent and updating the state."""
         with st.spinner("⏳ 수정 사항 반영 중..."):
-            response_data = agent.update_blog_post(prompt, session_id)
+            # 비동기 경로에서는 한 단계의 도구 호출(문서 검색, 웹 검색)이 동시에 실행됩니다. 공유 이벤트 루프에서 실행하여
+            # 비동기 클라이언트의 연결 풀을 턴마다 다시 쓸 수 있게 합니다.
+            response_data = run_sync(agent.aupdate_blog_post(prompt, session_id))
 
             if response_data.get("type") == "draft":
                 st.session_state[SessionKey.BLOG_DRAFT] = response_data.get("content")
 
         st.rerun()
 
+    def _stream_user_prompt(self, agent: BlogContentAgent, prompt: str, session_id: str):
+        """Streams the agent's response into the chat panel as it is generated, then updates the state."""
+        with st.chat_message(Message.ROLE_USER):
+            st.markdown(prompt)
+        with st.chat_message(Message.ROLE_ASSISTANT):
+            response = agent.stream_blog_post_update(prompt, session_id)
+            st.write_stream(response)
+
+        response_data = response.result or {}
+        if response_data.get("type") == "draft":
+            st.session_state[SessionKey.BLOG_DRAFT] = response_data.get("content")
+
+        st.rerun()
+
     def finalize_draft(self):
         """Saves the final draft to the session state for the publishing stage."""
         st.session_state[SessionKey.BLOG_POST] = st.session_state.get(SessionKey.BLOG_DRAFT)
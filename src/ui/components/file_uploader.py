@@ -1,14 +1,23 @@
 # src/ui/components/file_uploader.py
-import tempfile
-from pathlib import Path
+import hashlib
+import uuid
 
 import streamlit as st
+from langchain_core.documents import Document
 
-from src.config import INGESTION_PARSER
-from src.document_preprocessor import DocumentPreprocessor
+from src.batch_ingestion import BatchIngestor, UploadedPDF
+from src.collection_manager import get_collection_manager
+from src.config import INGESTION_CACHE_ENABLED, INGESTION_PARSER
+from src.ingestion_cache import IngestionCache
 from src.retriever import RetrieverFactory
 from src.ui.enums import SessionKey
-from src.vector_store import VectorStore
+from src.vector_store import CachedEmbeddings, VectorStore
+
+
+@st.cache_resource
+def get_ingestion_cache() -> IngestionCache:
+    """프로세스 전체에서 공유하는 수집 캐시를 반환합니다."""
+    return IngestionCache()
 
 
 class FileUploader:
@@ -22,38 +31,97 @@ class FileUploader:
     def render(self) -> bool:
         """Renders the Streamlit UI for file uploading and processing."""
         st.subheader("자료 업로드")
-        if uploaded_file := st.file_uploader(
-            f"'{', '.join(self.available_types)}' 형식의 파일을 선택해주세요.",
+        if uploaded_files := st.file_uploader(
+            f"'{', '.join(self.available_types)}' 형식의 파일을 선택해주세요. (여러 개 선택 가능)",
             type=self.available_types,
+            accept_multiple_files=True,
         ):
-            with st.spinner(f"문서를 처리 중입니다... (파서: '{INGESTION_PARSER}')"):
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                    temp_file.write(uploaded_file.getbuffer())
-                    file_path = Path(temp_file.name)
-
-                try:
-                    # 1. Preprocess the document
-                    preprocessor = DocumentPreprocessor(file_path)
-                    documents = preprocessor.process()
-                    # *** FIX: Save processed documents to session state for the agent ***
-                    st.session_state["processed_documents"] = documents
-                    st.info(f"문서 전처리 완료: {len(documents)}개 청크 생성")
-
-                    # 2. Store documents in the vector store
-                    vector_store = VectorStore()
-                    vector_store.add_documents(documents)
-                    st.session_state[SessionKey.VECTOR_STORE] = vector_store
-                    st.info("VectorStore 초기화 완료")
-
-                    # 3. Create the retriever
-                    retriever = RetrieverFactory.create(vector_store)
-                    st.session_state[SessionKey.RETRIEVER] = retriever
-                    st.info("Retriever 초기화 완료")
-
-                finally:
-                    if file_path.exists():
-                        file_path.unlink()
+            files = [UploadedPDF(name=uploaded_file.name, data=uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+            ingestion_key = hashlib.sha256("|".join(file.ingestion_key for file in files).encode()).hexdigest()
+
+            # Streamlit 은 버튼 클릭마다 스크립트를 다시 실행하므로, 이미 처리한 파일이면 건너뜁니다.
+            if st.session_state.get(SessionKey.INGESTION_KEY) != ingestion_key:
+                if not self._ingest(files, ingestion_key):
+                    return False
+                st.session_state[SessionKey.INGESTION_KEY] = ingestion_key
 
             if st.button("다음 단계로 이동"):
                 return True
-        return False
\ No newline at end of file
+        return False
+
+    def _ingest(self, files: list[UploadedPDF], ingestion_key: str) -> bool:
+        """파일들을 동시에 수집하여 하나의 VectorStore 와 Retriever 를 세션에 저장합니다."""
+        manager = get_collection_manager()
+        session_id = st.session_state.setdefault(SessionKey.SESSION_ID, uuid.uuid4().hex)
+        if previous_collection := st.session_state.pop(SessionKey.COLLECTION_NAME, None):
+            manager.release(previous_collection)
+
+        # 이 세션이나 다른 세션이 같은 파일들을 이미 수집했다면 저장된 컬렉션을 그대로 사용합니다.
+        vector_store, reused = manager.open(ingestion_key, session_id)
+        if reused:
+            documents = vector_store.get_documents()
+            st.info(f"이전에 처리한 문서를 불러왔습니다. ({len(documents)}개 청크)")
+        else:
+            documents, complete = self._ingest_into(vector_store, files)
+            if not documents:
+                manager.drop(vector_store.collection_name)
+                return False
+            vector_store.persist()
+            # 일부 파일이 실패했다면 완료 표시를 하지 않아, 다시 올리면 재사용하지 않고 다시 수집합니다.
+            if complete:
+                manager.mark_complete(vector_store.collection_name)
+            manager.record_size(vector_store.collection_name)
+
+        # *** FIX: Save processed documents to session state for the agent ***
+        st.session_state["processed_documents"] = documents
+        st.session_state[SessionKey.VECTOR_STORE] = vector_store
+        st.session_state[SessionKey.COLLECTION_NAME] = vector_store.collection_name
+        st.info("VectorStore 초기화 완료")
+
+        # 2. Create the retriever
+        collection_name = vector_store.collection_name
+        retriever = RetrieverFactory.create(vector_store, on_use=lambda: manager.mark_used(collection_name))
+        st.session_state[SessionKey.RETRIEVER] = retriever
+        st.info("Retriever 초기화 완료")
+        return True
+
+    def _ingest_into(self, vector_store: VectorStore, files: list[UploadedPDF]) -> tuple[list[Document], bool]:
+        """파일들을 파싱/임베딩하여 vector_store 에 저장하고, (생성된 청크, 모든 파일 성공 여부) 를 반환합니다."""
+        cache = get_ingestion_cache() if INGESTION_CACHE_ENABLED else None
+        ingestor = BatchIngestor(vector_store, cache=cache)
+
+        # 1. Parse, split, embed and store every file concurrently (or restore them from the ingestion cache)
+        st.caption(f"문서를 처리 중입니다... (파서: '{INGESTION_PARSER}')")
+        # 같은 이름의 파일이 여러 개일 수 있으므로 업로드 순서로 진행 막대를 찾습니다.
+        progress_bars = [st.progress(0.0, text=f"{file.name}: 대기 중") for file in files]
+        for event in ingestor.run(files):
+            progress_bars[event.index].progress(event.fraction, text=f"{event.filename}: {event.message}")
+
+        for result in ingestor.results:
+            if not result.ok:
+                st.error(f"'{result.filename}' 처리 실패: {result.error}")
+            elif result.ocr_pages:
+                st.caption(f"'{result.filename}' 하이브리드 파싱: OCR 페이지 {[page + 1 for page in result.ocr_pages]}")
+
+        documents = ingestor.documents
+        if not documents:
+            st.error("처리된 문서가 없습니다. 파일을 확인해주세요.")
+            return [], False
+
+        stats = ingestor.stats
+        st.info(
+            f"문서 전처리 완료: {stats.files - stats.failed}/{stats.files}개 파일, {stats.chunks}개 청크 "
+            f"({stats.seconds:.1f}초, {stats.pages_per_second:.1f} 페이지/초, {stats.chunks_per_second:.1f} 청크/초)"
+        )
+        if stats.chunks_deduplicated or stats.tokens_saved:
+            st.caption(
+                f"중복 제거: 청크 {stats.chunks_deduplicated}개, 임베딩 토큰 약 {stats.tokens_saved:,}개 절약"
+            )
+        if isinstance(vector_store.embeddings, CachedEmbeddings):
+            embedding_stats = vector_store.embeddings.stats
+            st.caption(
+                f"임베딩 캐시: 적중률 {embedding_stats['hit_rate']:.0%} "
+                f"({embedding_stats['hits']}/{embedding_stats['hits'] + embedding_stats['misses']}), "
+                f"저장된 임베딩 {embedding_stats['entries']:,}개"
+            )
+        return documents, ingestor.complete
@@ -4,6 +4,7 @@ from datetime import datetime
 import streamlit as st
 from github import GithubException
 
+from src.collection_manager import get_collection_manager
 from src.config import TIMEZONE
 from src.ui.enums import SessionKey
 
@@ -179,8 +180,12 @@ class Publisher:
             return False
 
     def _clear_post_data(self):
+        # 컬렉션은 바로 지우지 않고 반납만 합니다. (같은 문서를 다시 올리면 재사용, 나머지는 reaper 가 정리)
+        if collection_name := st.session_state.pop(SessionKey.COLLECTION_NAME, None):
+            get_collection_manager().release(collection_name)
         del st.session_state[SessionKey.VECTOR_STORE]
         del st.session_state[SessionKey.RETRIEVER]
+        st.session_state.pop(SessionKey.INGESTION_KEY, None)
         del st.session_state[SessionKey.BLOG_DRAFT]
         del st.session_state[SessionKey.BLOG_POST]
         del st.session_state[SessionKey.BLOG_CREATOR_AGENT]
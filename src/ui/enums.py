@@ -17,6 +17,8 @@ class SessionKey(str, Enum):
     USER_REQUEST = "user_request"
     VECTOR_STORE = "vector_store"
     RETRIEVER = "retriever"
+    INGESTION_KEY = "ingestion_key"
+    COLLECTION_NAME = "collection_name"
 
     IS_PUBLISHED = "is_published"
     SESSION_ID = "session_id"
@@ -0,0 +1,196 @@
+# src/upstage_client.py
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pymupdf
+import requests
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+from src.logger import get_logger
+from src.parallel_parser import split_page_ranges
+from src.pdf_loader import PDFSource, as_buffer, is_in_memory, open_pdf
+from src.rate_limiter import TokenBucket
+
+
+logger = get_logger(__name__)
+
+DOCUMENT_PARSE_BASE_URL = "https://api.upstage.ai/v1/document-digitization"
+# 재시도할 HTTP 상태 코드 (요청 한도 초과와 일시적인 서버 오류)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class UpstageParseError(RuntimeError):
+    """Document Parse API 호출이 재시도 후에도 실패했을 때 발생합니다."""
+
+
+class UpstageParseClient:
+    """
+    Upstage Document Parse API 클라이언트.
+
+    PDF 를 `pages_per_request` 페이지씩 잘라 최대 `max_workers` 개의 요청을 동시에 보냅니다.
+    - 요청은 토큰 버킷으로 초당 `requests_per_second` 개까지만 보냅니다.
+    - 연결 오류, 429, 5xx 응답은 지수 백오프(+jitter)로 재시도하고, `Retry-After` 헤더가 있으면 따릅니다.
+    - 응답(elements)은 `cache_dir` 에 파일 해시 + 페이지 구간 + 요청 설정을 키로 저장하므로,
+      같은 파일을 다시 파싱하면 API 를 호출하지 않고 디스크에서 읽습니다.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = DOCUMENT_PARSE_BASE_URL,
+        model: str = "document-parse",
+        output_format: str = "markdown",
+        ocr: str = "auto",
+        pages_per_request: int = 10,
+        max_workers: int = 4,
+        requests_per_second: float = 2.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        timeout: float = 120.0,
+        cache_dir: Path | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.output_format = output_format
+        self.ocr = ocr
+        self.pages_per_request = max(1, pages_per_request)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def parse(self, source: PDFSource) -> Iterator[tuple[int, list[dict]]]:
+        """
+        페이지 구간별로 API 를 호출하여 (구간 시작 페이지, elements) 를 페이지 순서대로 반환합니다.
+        elements 의 `page` 는 구간 안에서의 1-based 페이지 번호입니다.
+        """
+        data = as_buffer(source) if is_in_memory(source) else Path(source).read_bytes()
+        file_hash = hashlib.sha256(data).hexdigest()
+        with open_pdf(source) as pdf:
+            page_ranges = split_page_ranges(pdf.page_count, self.pages_per_request)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(page_ranges)) or 1, thread_name_prefix="upstage") as executor:
+            futures = [executor.submit(self._parse_range, data, file_hash, start, end) for start, end in page_ranges]
+            # 제출 순서대로 결과를 꺼내므로 앞 구간이 끝나는 즉시 다음 단계로 넘길 수 있습니다.
+            for (start, _), future in zip(page_ranges, futures):
+                yield start, future.result()
+
+    def _parse_range(self, data: bytes | memoryview, file_hash: str, start: int, end: int) -> list[dict]:
+        cache_path = self._cache_path(file_hash, start, end)
+        if cache_path is not None and cache_path.exists():
+            self.cache_hits += 1
+            return json.loads(cache_path.read_text(encoding="utf-8"))
+
+        with open_pdf(data) as pdf, pymupdf.open() as part:
+            part.insert_pdf(pdf, from_page=start, to_page=end - 1)
+            part_bytes = part.tobytes()
+
+        elements = self._request(part_bytes, f"pages {start + 1}-{end}")
+        if cache_path is not None:
+            _write_atomic(cache_path, json.dumps(elements, ensure_ascii=False))
+        return elements
+
+    def _request(self, document: bytes, label: str) -> list[dict]:
+        """구간 PDF 하나를 보내고 elements 를 반환합니다. 일시적인 오류는 재시도합니다."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            retry_after = None
+            try:
+                self.requests_sent += 1
+                response = requests.post(
+                    self.base_url,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    files={"document": ("document.pdf", document, "application/pdf")},
+                    data={
+                        "model": self.model,
+                        "ocr": self.ocr,
+                        "output_formats": f"['{self.output_format}']",
+                        "coordinates": "false",
+                    },
+                    timeout=self.timeout,
+                )
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json().get("elements", [])
+                reason = f"HTTP {response.status_code}"
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise UpstageParseError(f"Document Parse failed for {label} after {attempt + 1} attempts ({reason})")
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            logger.warning("Document Parse %s failed (%s); retrying in %.1fs", label, reason, delay)
+            time.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 동시에 실패한 요청들이 같은 시각에 다시 몰리지 않도록 합니다.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _cache_path(self, file_hash: str, start: int, end: int) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        settings = hashlib.sha256(f"{self.model}|{self.output_format}|{self.ocr}".encode()).hexdigest()[:16]
+        return self.cache_dir / f"{file_hash}_{settings}_{start}-{end}.json"
+
+
+class UpstageConcurrentLoader(BaseLoader):
+    """
+    UpstageParseClient 로 PDF 를 페이지 단위 Document 로 읽는 로더.
+
+    메타데이터의 `page` 는 UpstageDocumentParseLoader(split="page") 와 같이 1-based 페이지 번호입니다.
+    """
+
+    def __init__(self, source: PDFSource, client: UpstageParseClient, source_name: str | None = None):
+        self.source = source
+        self.client = client
+        self.source_name = source_name or (str(source) if not is_in_memory(source) else "document.pdf")
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open_pdf(self.source) as pdf:
+            total_pages = pdf.page_count
+
+        for start, elements in self.client.parse(self.source):
+            pages: dict[int, list[str]] = {}
+            for element in elements:
+                content = element.get("content", {}).get(self.client.output_format, "")
+                pages.setdefault(element["page"], []).append(content)
+            for page in sorted(pages):
+                yield Document(
+                    page_content="\n".join(pages[page]),
+                    metadata={"page": start + page, "source": self.source_name, "total_pages": total_pages},
+                )
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """동시에 같은 구간을 쓰더라도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체합니다."""
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False, suffix=".tmp") as temp_file:
+        temp_file.write(text)
+    os.replace(temp_file.name, path)
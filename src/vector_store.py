@@ -1,43 +1,431 @@
 # src/vector_store.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+
+import chromadb
+import numpy as np
+from chromadb.api import ClientAPI
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
 # 지원하는 모든 임베딩 모델 클래스를 import합니다.
 from langchain_openai import OpenAIEmbeddings
-from langchain_huggingface import HuggingFaceEmbeddings
 
 # 중앙 설정 파일에서 필요한 설정값을 가져옵니다.
-from src.config import EMBEDDING_PROVIDER, EMBEDDING_MODEL, COLLECTION_NAME
+from src.config import (
+    EMBEDDING_PROVIDER,
+    EMBEDDING_MODEL,
+    COLLECTION_NAME,
+    VECTOR_STORE_BACKEND,
+    VECTOR_STORE_NUMPY_DTYPE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    LOCAL_EMBEDDING_DEVICE,
+    LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_CPU_THREADS,
+    LOCAL_EMBEDDING_BACKEND,
+    LOCAL_EMBEDDING_QUANTIZE,
+    LOCAL_EMBEDDING_ONNX_CACHE_DIR,
+    EMBEDDING_DIMENSIONS,
+    VECTOR_STORE_QUANTIZATION,
+    VECTOR_STORE_RERANK_FACTOR,
+    LEXICAL_NGRAM,
+    LEXICAL_K1,
+    LEXICAL_B,
+)
+from src.batch_embedder import BatchEmbedder
+from src.event_loop import run_sync
+from src.lexical_index import BM25Index
+from src.local_embeddings import LocalEmbeddings, detect_device
+from src.logger import get_logger
+from src.numpy_store import METADATA_FILE, NumpyVectorStore
+
+
+logger = get_logger(__name__)
+
+# SQLite 한 쿼리에 넣을 최대 파라미터 수
+_SQLITE_BATCH = 500
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 결과를 SQLite 에 저장해 두고 재사용하는 임베딩 래퍼.
+
+    키는 모델 이름 + 용도(document/query) + 정규화한 텍스트의 SHA-256 이므로,
+    세션이나 문서가 달라도 같은 텍스트는 한 번만 임베딩합니다.
+    - 벡터는 float32 바이트(blob)로 저장합니다.
+    - `embed_documents` 는 캐시에 없는 텍스트만 모아 한 번에 임베딩합니다.
+    - 항목 수가 `max_entries` 를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, path: Path, max_entries: int = 200_000):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed(texts, "document", self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed([text], "query", lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def lookup_documents(self, texts: list[str]) -> dict[int, np.ndarray]:
+        """캐시에 있는 문서 임베딩만 {텍스트 인덱스: 벡터} 로 반환합니다. 임베딩 API 를 호출하지 않습니다."""
+        keys = [self._key(text, "document") for text in texts]
+        found = self._lookup(set(keys))
+        hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+        with self._lock:
+            self.hits += len(hits)
+        return hits
+
+    @property
+    def stats(self) -> dict:
+        """hit/miss 카운터와 현재 캐시 항목 수를 반환합니다."""
+        with closing(self._connect()) as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def _embed(self, texts: list[str], kind: str, embed_fn) -> list[list[float]]:
+        keys = [self._key(text, kind) for text in texts]
+        found = self._lookup(set(keys))
+
+        # 캐시에 없는 텍스트는 중복을 제거하고 한 번의 호출로 임베딩합니다.
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            computed = dict(zip(missing, vectors))
+            self._store(computed)
+            found.update(computed)
+
+        with self._lock:
+            self.misses += sum(key in missing for key in keys)
+            self.hits += sum(key not in missing for key in keys)
+        return [found[key].tolist() for key in keys]
+
+    def _key(self, text: str, kind: str) -> str:
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return f"{self.model_name}|{kind}|{hashlib.sha256(normalized.encode()).hexdigest()}"
+
+    def _lookup(self, keys: set[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        key_list = list(keys)
+        with closing(self._connect()) as conn, conn:
+            for start in range(0, len(key_list), _SQLITE_BATCH):
+                batch = key_list[start : start + _SQLITE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def _store(self, vectors: dict[str, np.ndarray]) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in vectors.items()],
+            )
+            (entries,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if entries > self.max_entries:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (entries - self.max_entries,),
+                )
+                logger.info("Evicted %d cached embeddings (LRU).", entries - self.max_entries)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+
+def create_embeddings() -> Embeddings:
+    """설정된 임베딩 제공자(provider)에 따라 임베딩 모델을 생성합니다."""
+    if EMBEDDING_PROVIDER == "openai":
+        # OpenAI API를 사용하는 경우
+        # text-embedding-3 계열은 `dimensions` 로 앞쪽 차원만 받을 수 있습니다. (Matryoshka)
+        if EMBEDDING_DIMENSIONS:
+            return OpenAIEmbeddings(model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS)
+        return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+    if EMBEDDING_PROVIDER == "huggingface":
+        # 로컬 Hugging Face 모델을 사용하는 경우 (GPU 가 없으면 최적화된 CPU 경로)
+        return LocalEmbeddings(
+            model_name=EMBEDDING_MODEL,
+            device=LOCAL_EMBEDDING_DEVICE,
+            batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+            cpu_threads=LOCAL_EMBEDDING_CPU_THREADS,
+            backend=LOCAL_EMBEDDING_BACKEND,
+            quantize=LOCAL_EMBEDDING_QUANTIZE,
+            normalize=True,
+            onnx_cache_dir=LOCAL_EMBEDDING_ONNX_CACHE_DIR,
+            dimensions=EMBEDDING_DIMENSIONS,
+        )
+    raise ValueError(f"Unsupported embedding provider: {EMBEDDING_PROVIDER}")
+
+
+def embedding_model_tag() -> str:
+    """
+    설정된 임베딩이 만드는 벡터를 구분하는 태그. 임베딩 캐시와 수집 캐시의 키가 함께 사용하므로,
+    모델·차원·양자화 중 하나라도 바뀌면 두 캐시 모두 이전 벡터를 쓰지 않습니다.
+    """
+    tag = f"{EMBEDDING_PROVIDER}/{EMBEDDING_MODEL}"
+    if EMBEDDING_DIMENSIONS:
+        tag += f"/d{EMBEDDING_DIMENSIONS}"
+    # 양자화 모델의 벡터는 원본과 조금 다르므로 따로 구분합니다. (LocalEmbeddings 와 같이 CPU 에서만 양자화)
+    if EMBEDDING_PROVIDER == "huggingface" and LOCAL_EMBEDDING_QUANTIZE and detect_device(LOCAL_EMBEDDING_DEVICE) == "cpu":
+        tag += f"/{LOCAL_EMBEDDING_BACKEND}-int8"
+    return tag
+
+
+@lru_cache(maxsize=1)
+def get_cached_embeddings() -> CachedEmbeddings:
+    """프로세스 전체(모든 세션)에서 공유하는 캐시 임베딩을 반환합니다."""
+    return CachedEmbeddings(
+        create_embeddings(),
+        model_name=embedding_model_tag(),
+        path=EMBEDDING_CACHE_PATH,
+        max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+    )
+
+
+def document_ids(documents: list[Document], prefix: str = "", start: int = 0) -> list[str]:
+    """
+    문서 순서와 내용(본문 + 메타데이터)으로 정해지는 id. 같은 문서 목록이면 항상 같은 id 가 나옵니다.
+
+    `prefix` 로 파일을 구분하고 `start` 로 파일 안에서의 청크 번호를 이어 붙이면,
+    여러 배치로 나눠 저장해도 id 가 겹치지 않고 저장소에서 파일별·청크 순서대로 정렬됩니다.
+    """
+    ids = []
+    for i, doc in enumerate(documents, start=start):
+        content = doc.page_content + json.dumps(doc.metadata, sort_keys=True, ensure_ascii=False, default=str)
+        ids.append(f"{prefix}{i:08d}-{hashlib.sha256(content.encode()).hexdigest()[:12]}")
+    return ids
+
 
 class VectorStore:
     """
     LangChain 표준 인터페이스를 따르는 벡터 스토어 래퍼 클래스.
-    설정에 따라 적절한 임베딩 모델을 사용하여 문서를 벡터화하고 ChromaDB에 저장합니다.
-    """
-    def __init__(self):
-        # 설정된 임베딩 제공자(provider)에 따라 모델을 초기화합니다.
-        if EMBEDDING_PROVIDER == "openai":
-            # OpenAI API를 사용하는 경우
-            self.embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
-        elif EMBEDDING_PROVIDER == "huggingface":
-            # 로컬 Hugging Face 모델을 사용하는 경우 (GPU 활용)
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=EMBEDDING_MODEL,
-                model_kwargs={'device': 'cuda'}, # GPU가 있는 환경을 위함
-                encode_kwargs={'normalize_embeddings': True},
+    설정에 따라 적절한 임베딩 모델을 사용하여 문서를 벡터화하고 ChromaDB 또는 NumPy 행렬에 저장합니다.
+
+    - backend="chroma": `client` 를 주면 해당 Chroma 클라이언트(예: 디스크에 저장되는 PersistentClient)의
+      컬렉션을 사용하고, 주지 않으면 프로세스 메모리 안의 컬렉션을 사용합니다.
+    - backend="numpy": 프로세스 내 `NumpyVectorStore` 를 사용합니다. `path` 를 주면 그 폴더에 저장된 인덱스를
+      읽기 전용 memory-map 으로 열고, `persist()` 로 다시 저장합니다.
+    """
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        client: ClientAPI | None = None,
+        backend: str = VECTOR_STORE_BACKEND,
+        path: Path | None = None,
+    ):
+        # 설정된 임베딩 제공자(provider)에 따라 모델을 초기화합니다. 캐시가 켜져 있으면 모든 세션이 같은 캐시를 씁니다.
+        self.embeddings = get_cached_embeddings() if EMBEDDING_CACHE_ENABLED else create_embeddings()
+        self.collection_name = collection_name
+        self.backend = backend
+        self.path = Path(path) if path is not None else None
+
+        # 토큰 수 기준 배치 + RPM/TPM 속도 제한 + 429 재시도로 임베딩합니다.
+        self.embedder = BatchEmbedder(self.embeddings)
+
+        if backend == "numpy":
+            if self.path is not None and (self.path / METADATA_FILE).exists():
+                self.store = NumpyVectorStore.load(self.path, self.embeddings)
+            else:
+                self.store = NumpyVectorStore(
+                    self.embeddings,
+                    dtype=VECTOR_STORE_NUMPY_DTYPE,
+                    quantization=VECTOR_STORE_QUANTIZATION,
+                    rerank_factor=VECTOR_STORE_RERANK_FACTOR,
+                )
+        elif backend == "chroma":
+            # ChromaDB 벡터 스토어를 초기화합니다.
+            client = client if client is not None else chromadb.Client()
+            self.store = Chroma(
+                collection_name=collection_name,
+                embedding_function=self.embeddings,
+                client=client,
             )
+            # 미리 계산한 임베딩의 저장/조회는 같은 컬렉션을 chromadb 클라이언트 API 로 직접 다룹니다.
+            self._collection = client.get_collection(collection_name)
         else:
-            raise ValueError(f"Unsupported embedding provider: {EMBEDDING_PROVIDER}")
+            raise ValueError(f"Unsupported vector store backend: {backend}")
+        # 저장 순서대로 정렬되는 id 를 만들기 위한 일련번호 (재사용한 컬렉션이면 이어서 번호를 붙입니다)
+        self._next_index = self.count()
+        self._id_lock = threading.Lock()
+        # 문서가 추가될 때마다 증가합니다. (검색 결과 캐시 등의 무효화 기준)
+        self._version = 0
+        # BM25 역색인: 새 저장소는 수집하면서 함께 색인하고, 다시 연 저장소는 처음 사용할 때 만듭니다.
+        self._lexical_index = self._new_lexical_index() if self._next_index == 0 else None
 
-        # ChromaDB 벡터 스토어를 초기화합니다.
-        self.store = Chroma(
-            collection_name=COLLECTION_NAME, 
-            embedding_function=self.embeddings
-        )
+    @property
+    def version(self) -> int:
+        """저장된 문서가 바뀔 때마다 증가하는 번호."""
+        return self._version
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """저장된 청크의 BM25 역색인."""
+        with self._id_lock:
+            if self._lexical_index is None:
+                index = self._new_lexical_index()
+                index.add(self._stored_documents())
+                self._lexical_index = index
+            return self._lexical_index
+
+    def count(self) -> int:
+        """저장된 청크 수."""
+        if isinstance(self.store, NumpyVectorStore):
+            return len(self.store)
+        return self._collection.count()
+
+    def get_documents(self) -> list[Document]:
+        """저장된 청크를 저장한 순서대로 반환합니다. (디스크에서 다시 연 컬렉션의 문서 복원용)"""
+        return [Document(page_content=doc.page_content, metadata=doc.metadata) for doc in self._stored_documents()]
+
+    def _stored_documents(self) -> list[Document]:
+        """id 가 채워진 청크를 id(저장 순서) 순으로 반환합니다."""
+        if isinstance(self.store, NumpyVectorStore):
+            return sorted(self.store.documents(), key=lambda doc: doc.id)
+        result = self._collection.get(include=["documents", "metadatas"])
+        rows = sorted(zip(result["ids"], result["documents"], result["metadatas"]), key=lambda row: row[0])
+        return [Document(id=doc_id, page_content=text, metadata=metadata or {}) for doc_id, text, metadata in rows]
+
+    def get_embeddings(self) -> tuple[list[Document], np.ndarray]:
+        """저장된 청크와 임베딩 행렬(float32, 행 = 청크)을 저장한 순서대로 반환합니다."""
+        if isinstance(self.store, NumpyVectorStore):
+            documents = self.store.documents()
+            order = sorted(range(len(documents)), key=lambda i: documents[i].id)
+            matrix = np.asarray(self.store.vectors[order], dtype=np.float32)
+            return [documents[i] for i in order], matrix
+        result = self._collection.get(include=["embeddings", "documents", "metadatas"])
+        if not result["ids"]:
+            return [], np.empty((0, 0), dtype=np.float32)
+        order = sorted(range(len(result["ids"])), key=lambda i: result["ids"][i])
+        documents = [
+            Document(id=result["ids"][i], page_content=result["documents"][i], metadata=result["metadatas"][i] or {})
+            for i in order
+        ]
+        matrix = np.asarray(result["embeddings"], dtype=np.float32).reshape(len(order), -1)[order]
+        return documents, matrix
+
+    def persist(self) -> None:
+        """numpy 백엔드의 인덱스를 `path` 에 저장합니다. (Chroma 는 클라이언트가 저장하므로 할 일이 없습니다)"""
+        if isinstance(self.store, NumpyVectorStore) and self.path is not None:
+            self.store.save(self.path)
+
+    def add_documents(self, documents: list[Document], ids: list[str] | None = None) -> list[str]:
+        """문서를 벡터 스토어에 추가합니다. (aadd_documents 를 공유 이벤트 루프에서 실행)"""
+        return run_sync(self.aadd_documents(documents, ids=ids))
+
+    async def aadd_documents(self, documents: list[Document], ids: list[str] | None = None) -> list[str]:
+        """
+        문서를 토큰 수 기준 배치로 나눠 속도 제한 안에서 동시에 임베딩하고, 배치가 끝날 때마다 바로 저장합니다.
+
+        id 는 문서 순서와 내용으로 정해지므로(`document_ids`), 중간에 실패한 뒤 같은 문서로 다시 호출하면
+        이미 저장된 배치는 건너뛰고 남은 청크만 임베딩합니다.
+        """
+        ids = ids or document_ids(documents)
+        existing = self._existing_ids(ids) if documents else set()
+        pending = [i for i, doc_id in enumerate(ids) if doc_id not in existing]
+        if existing:
+            logger.info("Resuming: %d/%d chunks already stored.", len(existing), len(ids))
+
+        # 배치 저장은 BatchEmbedder 가 작업 스레드에서 실행하므로 이벤트 루프를 막지 않습니다.
+        def store_batch(batch_indices: list[int], vectors) -> None:
+            positions = [pending[i] for i in batch_indices]
+            self.add_embeddings([documents[p] for p in positions], vectors, ids=[ids[p] for p in positions])
+
+        await self.embedder.aembed([documents[i].page_content for i in pending], on_batch=store_batch)
+        return ids
+
+    def add_embeddings(self, documents: list[Document], embeddings, ids: list[str] | None = None) -> list[str]:
+        """이미 계산된 임베딩과 함께 문서를 저장합니다. 임베딩 API 호출이 발생하지 않습니다."""
+        if not documents:
+            return []
+        if ids is None:
+            with self._id_lock:
+                start = self._next_index
+                self._next_index += len(documents)
+            ids = [f"{start + i:08d}-{uuid.uuid4().hex[:12]}" for i in range(len(documents))]
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata or None for doc in documents]
+        if isinstance(self.store, NumpyVectorStore):
+            self.store.upsert(ids, embeddings, texts, metadatas)
+        else:
+            self._collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+        with self._id_lock:
+            if self._lexical_index is not None:
+                self._lexical_index.add(
+                    [Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata) for doc_id, doc in zip(ids, documents)]
+                )
+            self._version += 1
+        return ids
+
+    def get_vectors(self, ids: list[str]) -> np.ndarray:
+        """id 순서대로 저장된 임베딩 행렬(float32)을 반환합니다. (numpy 백엔드는 정규화된 벡터)"""
+        if isinstance(self.store, NumpyVectorStore):
+            return self.store.get_vectors(ids)
+        result = self._collection.get(ids=ids, include=["embeddings"])
+        rows = dict(zip(result["ids"], result["embeddings"]))
+        return np.asarray([rows[doc_id] for doc_id in ids], dtype=np.float32)
+
+    def delete(self, ids: list[str]) -> None:
+        """id 에 해당하는 청크를 저장소와 BM25 역색인에서 지웁니다. (실패한 파일의 청크 정리용)"""
+        if not ids:
+            return
+        if isinstance(self.store, NumpyVectorStore):
+            self.store.delete(ids)
+        else:
+            self._collection.delete(ids=ids)
+        with self._id_lock:
+            if self._lexical_index is not None:
+                self._lexical_index.remove(ids)
+            self._version += 1
+
+    @staticmethod
+    def _new_lexical_index() -> BM25Index:
+        return BM25Index(ngram=LEXICAL_NGRAM, k1=LEXICAL_K1, b=LEXICAL_B)
 
-    def add_documents(self, documents: list[Document], **kwargs) -> list[str]:
-        """문서를 벡터 스토어에 추가합니다."""
-        return self.store.add_documents(documents, **kwargs)
+    def _existing_ids(self, ids: list[str]) -> set[str]:
+        if isinstance(self.store, NumpyVectorStore):
+            return {doc.id for doc in self.store.get_by_ids(ids)}
+        return set(self._collection.get(ids=ids, include=[])["ids"])
 
     def as_retriever(self, **kwargs):
         """벡터 스토어를 LangChain Retriever로 변환합니다."""
@@ -0,0 +1,84 @@
+# tests/conftest.py
+import os
+import uuid
+import zlib
+
+import numpy as np
+import pymupdf
+import pytest
+from langchain_core.embeddings import Embeddings
+
+
+# src.config 는 import 시점에 API 키를 요구하므로, 외부 API 를 호출하지 않는 테스트용 값을 넣어둡니다.
+for key in ("OPENAI_API_KEY", "UPSTAGE_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(key, "test-key")
+
+from src.tokenizer import Tokenizer  # noqa: E402
+
+
+@pytest.fixture
+def char_tokenizer() -> Tokenizer:
+    """글자 하나를 토큰 하나로 세는 토크나이저. (tiktoken 인코딩 파일을 내려받지 않고 토큰 수를 예측할 수 있습니다)"""
+    return Tokenizer("chars", encode=lambda text: [ord(c) for c in text], decode=lambda ids: "".join(map(chr, ids)))
+
+
+class HashEmbeddings(Embeddings):
+    """글자 bigram 을 해시해 벡터를 만드는 결정적 임베딩 대역. 비슷한 텍스트는 비슷한 벡터가 되고, 호출 수를 셉니다."""
+
+    dim = 64
+
+    def __init__(self):
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+    def _vector(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for a, b in zip(text, text[1:]):
+            vector[zlib.crc32(f"{a}{b}".encode()) % self.dim] += 1.0
+        vector[0] += 1e-3  # 빈 텍스트도 0 벡터가 되지 않도록
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def fake_embeddings() -> HashEmbeddings:
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def make_vector_store(monkeypatch, fake_embeddings, char_tokenizer):
+    """외부 API 없이 동작하는 VectorStore 를 만드는 함수. 컬렉션 이름은 테스트마다 새로 정합니다."""
+    import src.batch_embedder as batch_embedder
+    import src.vector_store as vector_store
+
+    monkeypatch.setattr(vector_store, "create_embeddings", lambda: fake_embeddings)
+    monkeypatch.setattr(vector_store, "get_cached_embeddings", lambda: fake_embeddings)
+    monkeypatch.setattr(batch_embedder, "get_tokenizer", lambda: char_tokenizer)
+
+    def make(backend: str = "chroma", **kwargs):
+        kwargs.setdefault("collection_name", f"test-{uuid.uuid4().hex[:12]}")
+        return vector_store.VectorStore(backend=backend, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def make_pdf():
+    """페이지마다 주어진 텍스트 줄을 쓴 PDF 바이트를 만듭니다."""
+
+    def make(pages: list[list[str]]) -> bytes:
+        with pymupdf.open() as pdf:
+            for lines in pages:
+                page = pdf.new_page()
+                for i, line in enumerate(lines):
+                    page.insert_text((72, 72 + 14 * i), line)
+            return pdf.tobytes()
+
+    return make
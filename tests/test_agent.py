@@ -0,0 +1,181 @@
+# tests/test_agent.py
+import asyncio
+import json
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.tools import StructuredTool
+
+from src.agent import BlogContentAgent, JsonContentStream, TimeoutTool
+
+
+class EmptyRetriever(BaseRetriever):
+    """검색 결과가 없는 리트리버 대역."""
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return []
+
+
+@pytest.fixture
+def agent():
+    return BlogContentAgent(EmptyRetriever(), [])
+
+
+def draft_message(content: str) -> AIMessage:
+    return AIMessage(content=json.dumps({"type": "draft", "content": content}, ensure_ascii=False))
+
+
+def test_apply_patch_rewrites_the_history_with_the_patched_draft(agent):
+    history = agent.get_session_history("s1")
+    history.messages = [
+        HumanMessage(content="초안을 써 줘"),
+        draft_message("# 제목\n\n첫 문장입니다.\n"),
+        HumanMessage(content="첫 문장을 고쳐 줘"),
+    ]
+    patch = {"type": "patch", "operations": [{"op": "replace", "find": "첫 문장입니다.", "content": "고친 문장입니다."}]}
+    history.messages.append(AIMessage(content=json.dumps(patch)))
+
+    result = agent._apply_patch(patch, "s1")
+
+    assert result == {"type": "draft", "content": "# 제목\n\n고친 문장입니다.\n"}
+    assert json.loads(history.messages[-1].content) == result
+    # 이전 초안은 그대로 남습니다.
+    assert json.loads(history.messages[1].content)["content"] == "# 제목\n\n첫 문장입니다.\n"
+
+
+def test_apply_patch_uses_the_latest_draft(agent):
+    history = agent.get_session_history("s1")
+    patch = {"type": "patch", "operations": [{"op": "insert_after", "heading": "제목", "content": "추가"}]}
+    history.messages = [draft_message("# 옛 제목\n"), draft_message("# 제목\n"), AIMessage(content=json.dumps(patch))]
+
+    assert agent._apply_patch(patch, "s1")["content"] == "# 제목\n추가\n"
+
+
+def test_failed_patch_becomes_a_chat_reply_in_the_history(agent):
+    history = agent.get_session_history("s1")
+    patch = {"type": "patch", "operations": [{"op": "delete", "heading": "없는 제목"}]}
+    history.messages = [draft_message("# 제목\n본문\n"), AIMessage(content=json.dumps(patch))]
+
+    result = agent._apply_patch(patch, "s1")
+
+    assert result["type"] == "chat"
+    assert "없는 제목" in result["content"]
+    assert json.loads(history.messages[-1].content) == result
+    assert json.loads(history.messages[0].content)["content"] == "# 제목\n본문\n"
+
+
+def test_patch_without_a_draft_is_reported(agent):
+    history = agent.get_session_history("s1")
+    patch = {"type": "patch", "operations": []}
+    history.messages = [HumanMessage(content="고쳐 줘"), AIMessage(content=json.dumps(patch))]
+
+    assert agent._apply_patch(patch, "s1")["type"] == "chat"
+
+
+def stream(chunks: list[str]) -> str:
+    content = JsonContentStream()
+    return "".join(content.feed(chunk) for chunk in chunks)
+
+
+def split_every(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+RESPONSE = json.dumps(
+    {"type": "draft", "content": '줄 1\n"인용" \\ 탭\t끝 😀 é\u00e9 \U0001F600'},
+    ensure_ascii=True,
+)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 11, len(RESPONSE)])
+def test_content_is_decoded_for_any_chunking(size):
+    assert stream(split_every(RESPONSE, size)) == json.loads(RESPONSE)["content"]
+
+
+def test_escapes_split_at_every_position():
+    response = json.dumps({"type": "chat", "content": "a\nb\u00e9c😀d"}, ensure_ascii=True)
+    expected = json.loads(response)["content"]
+
+    for cut in range(1, len(response)):
+        assert stream([response[:cut], response[cut:]]) == expected, cut
+
+
+def test_surrogate_pair_split_between_escapes_is_one_character():
+    assert stream(['{"content": "\\ud83d', '\\ude00"}']) == "😀"
+
+    # 하위 서로게이트 이스케이프가 잘려 들어와도 다 모일 때까지 기다렸다가 한 글자로 디코딩합니다.
+    content = JsonContentStream()
+    pieces = [content.feed('{"content": "\\ud83d'), content.feed("\\ud"), content.feed('e00!"}')]
+    assert pieces == ["", "", "😀!"]
+
+
+def test_content_key_after_other_keys_and_code_fence():
+    chunks = ["```json\n{", '"type": "draft", "title": "제목", ', '"content": "본문', '입니다"}\n```']
+
+    assert stream(chunks) == "본문입니다"
+
+
+def test_text_after_the_closing_quote_is_ignored():
+    content = JsonContentStream()
+
+    assert content.feed('{"content": "끝", "type": "chat"}') == "끝"
+    assert content.feed('{"content": "다음"}') == ""
+
+
+def test_non_json_output_yields_nothing():
+    assert stream(["그냥 ", "일반 텍스트 응답입니다."]) == ""
+
+
+def test_timeout_returns_the_fallback_message_and_leaves_sync_tools_running():
+    release, finished = threading.Event(), threading.Event()
+
+    def slow_search(query: str) -> str:
+        """느린 동기 검색 도구."""
+        release.wait(5)
+        finished.set()
+        return "늦은 결과"
+
+    tool = TimeoutTool.wrap(StructuredTool.from_function(slow_search), timeout=0.05)
+
+    async def main():
+        result = await tool.arun({"query": "질문"})
+        # 시간 제한이 지나도 동기 도구는 executor 스레드에서 계속 실행 중입니다.
+        still_running = not finished.is_set()
+        release.set()
+        return result, still_running
+
+    result, still_running = asyncio.run(main())
+
+    assert result == "도구 'slow_search' 이(가) 0.05초 안에 응답하지 않아 결과를 가져오지 못했습니다."
+    assert still_running and finished.is_set()
+
+
+def test_timeout_cancels_async_tools():
+    cancelled = []
+
+    async def slow_lookup(query: str) -> str:
+        """느린 비동기 도구."""
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return "늦은 결과"
+
+    tool = TimeoutTool.wrap(StructuredTool.from_function(coroutine=slow_lookup), timeout=0.05)
+
+    assert "응답하지 않아" in asyncio.run(tool.arun({"query": "질문"}))
+    assert cancelled == ["질문"]
+
+
+def test_tool_within_the_timeout_returns_its_result():
+    def echo(query: str) -> str:
+        """입력을 그대로 돌려주는 도구."""
+        return f"결과: {query}"
+
+    tool = TimeoutTool.wrap(StructuredTool.from_function(echo), timeout=5)
+
+    assert asyncio.run(tool.arun({"query": "질문"})) == "결과: 질문"
+    assert tool.run({"query": "동기"}) == "결과: 동기"
@@ -0,0 +1,191 @@
+# tests/test_batch_embedder.py
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.batch_embedder import BatchEmbedder, EmbeddingRateLimiter
+from src.rate_limiter import TokenBucket
+
+
+class RateLimitError(Exception):
+    """제공자의 429 예외 대역."""
+
+    status_code = 429
+
+
+class FakeEmbeddings(Embeddings):
+    """텍스트 길이로 벡터를 만들고, 요청한 배치를 기록하는 임베딩 대역."""
+
+    def __init__(self, fail_on: str | None = None, rate_limited: int = 0):
+        self.batches: list[list[str]] = []
+        self.fail_on = fail_on
+        self.rate_limited = rate_limited
+
+    def embed_documents(self, texts):
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RateLimitError("429 Too Many Requests")
+        if self.fail_on in texts:
+            raise ValueError("embedding failed")
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class CachedFakeEmbeddings(FakeEmbeddings):
+    """`lookup_documents` 로 일부 텍스트가 캐시에 있다고 알려주는 대역."""
+
+    def __init__(self, cached: dict[str, list[float]]):
+        super().__init__()
+        self.cached = cached
+
+    def lookup_documents(self, texts):
+        return {i: np.asarray(self.cached[text], dtype=np.float32) for i, text in enumerate(texts) if text in self.cached}
+
+
+def make_embedder(embeddings, tokenizer, **kwargs) -> BatchEmbedder:
+    kwargs.setdefault("rate_limiter", EmbeddingRateLimiter(1_000_000, 1_000_000_000))
+    return BatchEmbedder(embeddings, tokenizer=tokenizer, backoff_base=0.0, **kwargs)
+
+
+def collect(embedder: BatchEmbedder, texts: list[str], on_batch=None) -> dict[int, np.ndarray]:
+    stored: dict[int, np.ndarray] = {}
+
+    def store(indices, vectors):
+        if on_batch is not None:
+            on_batch(indices, vectors)
+        stored.update(zip(indices, vectors))
+
+    asyncio.run(embedder.aembed(texts, on_batch=store))
+    return stored
+
+
+def test_batches_respect_token_and_size_limits(char_tokenizer):
+    embedder = make_embedder(FakeEmbeddings(), char_tokenizer, max_batch_tokens=10, max_batch_size=3)
+    texts = ["aaaa", "bbbb", "cc", "d", "e", "f", "gggggggggggg"]
+
+    batches = embedder.make_batches(texts)
+
+    assert batches == [([0, 1, 2], 10), ([3, 4, 5], 3), ([6], 12)]
+    assert [i for indices, _ in batches for i in indices] == list(range(len(texts)))
+
+
+def test_aembed_stores_every_text_in_order_of_indices(char_tokenizer):
+    embeddings = FakeEmbeddings()
+    embedder = make_embedder(embeddings, char_tokenizer, max_batch_tokens=5, max_concurrency=3)
+    texts = [f"텍스트{i}" for i in range(12)]
+
+    stored = collect(embedder, texts)
+
+    assert sorted(stored) == list(range(12))
+    for i, text in enumerate(texts):
+        assert stored[i][0] == len(text)
+    assert len(embeddings.batches) > 1
+
+
+def test_cached_texts_skip_the_api(char_tokenizer):
+    embeddings = CachedFakeEmbeddings({"cached": [9.0, 9.0]})
+    embedder = make_embedder(embeddings, char_tokenizer)
+
+    stored = collect(embedder, ["cached", "new one", "cached"])
+
+    assert embeddings.batches == [["new one"]]
+    np.testing.assert_array_equal(stored[0], [9.0, 9.0])
+    np.testing.assert_array_equal(stored[2], [9.0, 9.0])
+    assert stored[1][0] == len("new one")
+
+
+def test_rate_limit_errors_are_retried(char_tokenizer):
+    embeddings = FakeEmbeddings(rate_limited=2)
+    embedder = make_embedder(embeddings, char_tokenizer, max_retries=3)
+
+    stored = collect(embedder, ["a", "b"])
+
+    assert sorted(stored) == [0, 1]
+    assert embeddings.rate_limited == 0
+
+
+def test_rate_limit_error_is_raised_after_max_retries(char_tokenizer):
+    embedder = make_embedder(FakeEmbeddings(rate_limited=5), char_tokenizer, max_retries=1)
+
+    with pytest.raises(RateLimitError):
+        collect(embedder, ["a"])
+
+
+def test_failed_batch_raises_after_other_batches_are_stored(char_tokenizer):
+    embedder = make_embedder(FakeEmbeddings(fail_on="bad"), char_tokenizer, max_batch_size=1)
+    stored: dict[int, np.ndarray] = {}
+
+    with pytest.raises(ValueError):
+        asyncio.run(embedder.aembed(["ok1", "bad", "ok2"], on_batch=lambda indices, vectors: stored.update(zip(indices, vectors))))
+
+    assert sorted(stored) == [0, 2]
+
+
+def test_on_batch_runs_off_the_event_loop(char_tokenizer):
+    embedder = make_embedder(FakeEmbeddings(), char_tokenizer, max_batch_size=1, max_concurrency=4)
+    threads: set[int] = set()
+
+    def slow_store(indices, vectors):
+        threads.add(threading.get_ident())
+        time.sleep(0.2)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        started = time.perf_counter()
+        await embedder.aembed(["a", "b", "c", "d"], on_batch=slow_store)
+        return loop_thread, time.perf_counter() - started
+
+    loop_thread, elapsed = asyncio.run(main())
+
+    assert loop_thread not in threads
+    # 이벤트 루프에서 저장했다면 4 × 0.2 초가 직렬로 걸립니다.
+    assert elapsed < 0.6
+
+
+def test_token_bucket_allows_burst_up_to_capacity():
+    bucket = TokenBucket(rate=1.0, capacity=5)
+
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+    assert bucket._try_take(1) > 0
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    started = time.perf_counter()
+
+    waited = sum(bucket.acquire() for _ in range(6))
+
+    # 첫 토큰은 바로, 나머지 5 개는 0.02 초마다 채워집니다.
+    assert waited >= 0.09
+    assert time.perf_counter() - started >= 0.09
+
+
+def test_token_bucket_clamps_requests_larger_than_capacity():
+    bucket = TokenBucket(rate=1000.0, capacity=10)
+
+    assert bucket.acquire(10_000) == 0.0
+    assert bucket.acquire(10_000) < 0.1
+
+
+def test_token_bucket_async_acquire_shares_the_limit():
+    bucket = TokenBucket(rate=50.0, capacity=2)
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(bucket.aacquire() for _ in range(7)))
+        return time.perf_counter() - started
+
+    # 2 개는 바로, 나머지 5 개는 0.02 초마다
+    assert asyncio.run(main()) >= 0.09
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
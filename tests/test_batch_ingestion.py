@@ -0,0 +1,87 @@
+# tests/test_batch_ingestion.py
+import pytest
+
+from src.batch_ingestion import SOURCE_FILE_KEY, BatchIngestor, UploadedPDF
+from src.ingestion_cache import IngestionCache
+
+
+@pytest.fixture
+def lecture(make_pdf):
+    # 두 번째 페이지는 비어 있어 청크가 만들어지지 않습니다.
+    return make_pdf([["Lecture 1: vectors", "dot products and norms"], [], ["Lecture 3: matrices", "rank and inverse"]])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IngestionCache(path=tmp_path / "ingestion.sqlite3")
+
+
+def run(ingestor: BatchIngestor, files: list[UploadedPDF]):
+    return list(ingestor.run(files))
+
+
+def test_progress_events_are_keyed_by_upload_index(make_vector_store, lecture, make_pdf):
+    files = [
+        UploadedPDF("notes.pdf", lecture),
+        UploadedPDF("notes.pdf", make_pdf([["another file with the same name"]])),
+        UploadedPDF("notes.pdf", lecture),
+    ]
+    ingestor = BatchIngestor(make_vector_store(), max_workers=3)
+
+    events = run(ingestor, files)
+
+    done = [event for event in events if event.done]
+    assert sorted(event.index for event in done) == [0, 1, 2]
+    assert all(event.fraction == 1.0 and event.error is None for event in done)
+    # 각 파일의 완료 이벤트는 그 파일의 마지막 이벤트입니다.
+    for index in range(3):
+        assert [event for event in events if event.index == index][-1].done
+
+
+def test_chunk_ids_are_unique_per_upload_and_deterministic(make_vector_store, lecture):
+    files = [UploadedPDF("a.pdf", lecture), UploadedPDF("a.pdf", lecture)]
+
+    first = BatchIngestor(make_vector_store())
+    run(first, files)
+    second = BatchIngestor(make_vector_store())
+    run(second, files)
+
+    ids = [result.chunk_ids for result in first.results]
+    assert all(chunk_id.startswith("0000-") for chunk_id in ids[0])
+    assert all(chunk_id.startswith("0001-") for chunk_id in ids[1])
+    assert not set(ids[0]) & set(ids[1])
+    assert ids == [result.chunk_ids for result in second.results]
+    assert first.vector_store.count() == len(ids[0]) + len(ids[1])
+
+
+def test_cache_hit_reports_original_page_count_without_embedding(make_vector_store, fake_embeddings, lecture, cache):
+    files = [UploadedPDF("lecture.pdf", lecture)]
+    first = BatchIngestor(make_vector_store(), cache=cache)
+    run(first, files)
+    calls = fake_embeddings.calls
+
+    second = BatchIngestor(make_vector_store(), cache=cache)
+    run(second, files)
+
+    [cold], [warm] = first.results, second.results
+    assert cold.pages == warm.pages == 3
+    assert warm.from_cache and not cold.from_cache
+    assert fake_embeddings.calls == calls
+    assert [doc.page_content for doc in warm.documents] == [doc.page_content for doc in cold.documents]
+    assert warm.chunk_ids == cold.chunk_ids
+    assert second.stats.pages == 3
+
+
+def test_failed_file_does_not_stop_the_batch(make_vector_store, lecture):
+    files = [UploadedPDF("broken.pdf", b"not a pdf"), UploadedPDF("lecture.pdf", lecture)]
+    ingestor = BatchIngestor(make_vector_store(), max_workers=2)
+
+    events = run(ingestor, files)
+
+    broken, ok = ingestor.results
+    assert broken.error and not broken.chunk_ids
+    assert ok.ok and ok.documents
+    assert {doc.metadata[SOURCE_FILE_KEY] for doc in ingestor.documents} == {"lecture.pdf"}
+    assert [event.error is not None for event in events if event.done and event.index == 0] == [True]
+    assert not ingestor.complete
+    assert ingestor.stats.failed == 1
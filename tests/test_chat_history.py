@@ -0,0 +1,125 @@
+# tests/test_chat_history.py
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, get_buffer_string
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.chat_history import _STALE_DRAFT_PLACEHOLDER, AgentChatMessageHistory, HistoryBudget
+
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([("human", "기존 요약: {summary}\n새 대화:\n{messages}")])
+
+
+class RecordingChatModel(FakeListChatModel):
+    """받은 프롬프트를 기록하는 요약 모델 대역."""
+
+    prompts: list[str] = []
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(get_buffer_string(messages))
+        return super()._call(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def draft(content: str) -> AIMessage:
+    return AIMessage(content=json.dumps({"type": "draft", "content": content}, ensure_ascii=False))
+
+
+def turns(count: int, size: int = 16) -> list:
+    """(질문, 답변) 쌍을 count 번 만듭니다. 메시지마다 size 글자입니다."""
+    messages = []
+    for i in range(count):
+        messages += [HumanMessage(content=f"q{i}".ljust(size, ".")), AIMessage(content=f"a{i}".ljust(size, "."))]
+    return messages
+
+
+def history_of(messages: list) -> AgentChatMessageHistory:
+    history = AgentChatMessageHistory()
+    history.messages = list(messages)
+    return history
+
+
+def test_truncate_keeps_the_most_recent_messages_within_the_budget(char_tokenizer):
+    history = history_of(turns(5))
+    # 메시지 하나 = 16 글자 + 4 (메시지 오버헤드) = 20 토큰. 예산 90 이면 최근 4개까지 들어갑니다.
+    budget = HistoryBudget(token_limit=90, max_messages=100, tokenizer=char_tokenizer)
+
+    selected = budget.select(history)
+
+    assert selected == history.messages[-4:]
+    assert budget.count(selected) == 80
+    assert len(history.messages) == 10
+
+
+def test_selection_starts_with_a_human_message(char_tokenizer):
+    history = history_of(turns(5))
+    budget = HistoryBudget(token_limit=70, max_messages=100, tokenizer=char_tokenizer)
+
+    selected = budget.select(history)
+
+    # 최근 3개가 예산 안이지만 AI 응답으로 시작하지 않도록 2개만 남깁니다.
+    assert selected == history.messages[-2:]
+    assert selected[0].type == "human"
+
+
+def test_max_messages_limits_the_selection(char_tokenizer):
+    history = history_of(turns(5))
+
+    assert HistoryBudget(token_limit=10_000, max_messages=4, tokenizer=char_tokenizer).select(history) == history.messages[-4:]
+
+
+def test_latest_draft_is_always_kept_outside_the_budget(char_tokenizer):
+    big_draft = draft("# 제목\n" + "본문 " * 500)
+    history = history_of([HumanMessage(content="초안을 써 줘"), big_draft, *turns(3)])
+    budget = HistoryBudget(token_limit=45, max_messages=100, tokenizer=char_tokenizer)
+
+    selected = budget.select(history)
+
+    # 초안은 예산보다 크지만 그대로 들어가고, 최근 메시지는 초안을 빼고 예산을 계산합니다.
+    assert selected == [big_draft, *history.messages[-2:]]
+
+
+def test_older_drafts_are_replaced_with_a_placeholder(char_tokenizer):
+    old, new = draft("# 옛 초안\n" + "x" * 200), draft("# 새 초안\n본문")
+    history = history_of([HumanMessage(content="초안"), old, HumanMessage(content="고쳐 줘"), new])
+    budget = HistoryBudget(token_limit=10_000, max_messages=100, tokenizer=char_tokenizer)
+
+    selected = budget.select(history)
+
+    assert [message.content for message in selected] == ["초안", _STALE_DRAFT_PLACEHOLDER, "고쳐 줘", new.content]
+    assert history.messages[1] is old
+
+
+def test_compress_summarizes_dropped_messages_once(char_tokenizer):
+    summarizer = RecordingChatModel(responses=["요약 1", "요약 2"])
+    budget = HistoryBudget(
+        token_limit=50, max_messages=100, strategy="compress", summarizer=summarizer,
+        summary_prompt=SUMMARY_PROMPT, tokenizer=char_tokenizer,
+    )
+    history = history_of([HumanMessage(content="초안"), draft("# 초안\n본문"), *turns(3)])
+
+    selected = budget.select(history)
+
+    assert selected[0] == SystemMessage(content="이전 대화 요약:\n요약 1")
+    assert selected[1:] == history.messages[1:2] + history.messages[-2:]
+    assert history.summary == "요약 1" and history.summarized_until == len(history.messages) - 2
+    # 요약에는 최신 초안 본문 대신 짧은 표시만 들어갑니다.
+    assert "본문" not in summarizer.prompts[0] and _STALE_DRAFT_PLACEHOLDER in summarizer.prompts[0]
+
+    # 새로 넘치는 메시지가 없으면 다시 요약하지 않습니다.
+    assert budget.select(history) == selected
+    assert len(summarizer.prompts) == 1
+
+    history.messages += turns(1)
+    asyncio.run(budget.aselect(history))
+    assert history.summary == "요약 2"
+    assert "기존 요약: 요약 1" in summarizer.prompts[1]
+
+
+def test_invalid_strategies_raise():
+    with pytest.raises(ValueError):
+        HistoryBudget(token_limit=100, max_messages=10, strategy="drop")
+    with pytest.raises(ValueError):
+        HistoryBudget(token_limit=100, max_messages=10, strategy="compress")
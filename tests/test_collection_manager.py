@@ -0,0 +1,109 @@
+# tests/test_collection_manager.py
+import time
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.collection_manager import CollectionManager, collection_name_for
+
+
+DOC_KEY = "0123456789abcdef" * 4
+CHUNKS = [
+    Document(page_content="고유값 분해는 대칭 행렬을 직교 행렬로 대각화한다.", metadata={"page": 1}),
+    Document(page_content="특이값 분해는 모든 행렬에 대해 존재한다.", metadata={"page": 2}),
+]
+
+
+@pytest.fixture(params=["chroma", "numpy"])
+def manager(request, tmp_path, make_vector_store):
+    # make_vector_store 를 요청해야 VectorStore 가 외부 API 대신 테스트용 임베딩을 씁니다.
+    return CollectionManager(persist_directory=tmp_path, ttl_seconds=3600, max_disk_bytes=1 << 30, backend=request.param)
+
+
+def ingest(manager: CollectionManager, session_id: str, complete: bool = True):
+    vector_store, reused = manager.open(DOC_KEY, session_id)
+    assert not reused
+    vector_store.add_documents(CHUNKS)
+    vector_store.persist()
+    name = collection_name_for(DOC_KEY, session_id)
+    if complete:
+        manager.mark_complete(name)
+    return vector_store, name
+
+
+def test_each_session_gets_its_own_collection(manager):
+    ingest(manager, "alice", complete=False)
+
+    other, reused = manager.open(DOC_KEY, "bob")
+
+    assert collection_name_for(DOC_KEY, "alice") != collection_name_for(DOC_KEY, "bob")
+    # 수집이 끝나지 않은 컬렉션은 다른 세션에 복사하지 않습니다.
+    assert not reused and other.count() == 0
+
+
+def test_same_session_reopens_its_complete_collection(manager, fake_embeddings):
+    ingest(manager, "alice")
+    calls = fake_embeddings.calls
+
+    vector_store, reused = manager.open(DOC_KEY, "alice")
+
+    assert reused and vector_store.count() == len(CHUNKS)
+    assert fake_embeddings.calls == calls
+
+
+def test_incomplete_collection_is_emptied_when_reopened(manager):
+    ingest(manager, "alice", complete=False)
+
+    vector_store, reused = manager.open(DOC_KEY, "alice")
+
+    assert not reused and vector_store.count() == 0
+
+
+def test_new_session_copies_a_complete_collection_without_embedding(manager, fake_embeddings):
+    source, _ = ingest(manager, "alice")
+    calls = fake_embeddings.calls
+
+    copy, reused = manager.open(DOC_KEY, "bob")
+
+    assert reused and fake_embeddings.calls == calls
+    source_docs, source_vectors = source.get_embeddings()
+    copy_docs, copy_vectors = copy.get_embeddings()
+    assert [(doc.id, doc.page_content, doc.metadata) for doc in copy_docs] == [
+        (doc.id, doc.page_content, doc.metadata) for doc in source_docs
+    ]
+    np.testing.assert_allclose(copy_vectors, source_vectors, rtol=1e-6)
+    # 복사한 청크도 BM25 역색인과 version 에 반영됩니다.
+    assert copy.version > 0
+    assert copy.lexical_index.search("특이값", k=1)[0][0].metadata == {"page": 2}
+
+
+def open_session(manager: CollectionManager, session_id: str) -> str:
+    """세션으로 문서를 열고 컬렉션 이름을 반환합니다. (첫 세션 이후에는 완료된 컬렉션을 복사합니다)"""
+    manager.open(DOC_KEY, session_id)
+    return collection_name_for(DOC_KEY, session_id)
+
+
+def test_reaper_keeps_open_collections_and_drops_idle_ones(manager):
+    _, idle = ingest(manager, "alice")
+    in_use = open_session(manager, "bob")
+    manager.release(idle)
+    manager.ttl_seconds = 0
+    time.sleep(0.01)
+
+    assert manager.reap() == [idle]
+    assert manager._existing_names() == {in_use}
+
+
+def test_reaper_evicts_released_collections_over_the_disk_budget(manager):
+    _, oldest = ingest(manager, "alice")
+    newer = open_session(manager, "bob")
+    in_use = open_session(manager, "carol")
+    manager.record_size(oldest)
+    manager.release(oldest)
+    manager.release(newer)
+    # 열린 컬렉션 하나만 남길 수 있는 예산. 열린 컬렉션은 예산을 넘더라도 지우지 않습니다.
+    manager.max_disk_bytes = 1
+
+    assert manager.reap() == [oldest, newer]
+    assert manager._existing_names() == {in_use}
@@ -0,0 +1,83 @@
+# tests/test_dedup.py
+import pytest
+from langchain_core.documents import Document
+
+from src.dedup import ChunkDeduplicator
+from src.minhash import MinHasher
+
+
+BODY = (
+    "벡터 공간은 덧셈과 스칼라 곱에 대해 닫혀 있는 집합이다. 기저는 공간을 생성하는 선형 독립인 벡터들의 모임이며, "
+    "기저의 원소 개수를 차원이라고 부른다. 선형 변환은 벡터 공간 사이에서 덧셈과 스칼라 곱을 보존하는 함수이다."
+)
+
+
+@pytest.fixture
+def deduplicator(char_tokenizer):
+    return ChunkDeduplicator(boilerplate_min_pages=3, similarity_threshold=0.85, tokenizer=char_tokenizer)
+
+
+def page(number: int, body: str) -> Document:
+    return Document(page_content=f"선형대수 강의 노트\n{body}\n- {number} -", metadata={"page": number})
+
+
+def test_repeated_header_and_page_numbers_are_stripped_after_min_pages(deduplicator):
+    pages = [deduplicator.strip_boilerplate(page(i, f"본문 {i}쪽에는 이 페이지에만 나오는 고유한 설명이 들어 있습니다.")) for i in range(1, 6)]
+
+    # 처음 3 페이지는 아직 반복 여부를 모르므로 그대로 둡니다.
+    for stripped in pages[:3]:
+        assert stripped.page_content.startswith("선형대수 강의 노트")
+    for i, stripped in enumerate(pages[3:], start=4):
+        assert stripped.page_content == f"본문 {i}쪽에는 이 페이지에만 나오는 고유한 설명이 들어 있습니다."
+        assert stripped.metadata == {"page": i}
+    assert deduplicator.stats.lines_stripped == 4
+    assert deduplicator.stats.tokens_saved == 2 * (len("선형대수 강의 노트") + 1 + len("- 4 -"))
+
+
+def test_long_lines_that_differ_only_in_numbers_are_kept(deduplicator):
+    lines = [f"이번 장에서는 {i}차원 공간에서 정의되는 선형 변환의 성질을 자세히 다룹니다." for i in range(1, 6)]
+
+    stripped = [deduplicator.strip_boilerplate(Document(page_content=line)) for line in lines]
+
+    assert [doc.page_content for doc in stripped] == lines
+    assert deduplicator.stats.lines_stripped == 0
+
+
+def test_near_duplicate_chunks_are_dropped(deduplicator):
+    chunks = [
+        Document(page_content=BODY, metadata={"page": 1}),
+        Document(page_content=BODY.replace("부른다", "부릅니다"), metadata={"page": 7}),
+        Document(page_content="고유값은 선형 변환이 방향을 바꾸지 않는 벡터의 배율이다.", metadata={"page": 8}),
+        Document(page_content="   ", metadata={"page": 9}),
+    ]
+
+    kept = deduplicator.filter_chunks(chunks)
+
+    assert [chunk.metadata["page"] for chunk in kept] == [1, 8]
+    assert deduplicator.stats.chunks_in == 4
+    assert deduplicator.stats.chunks_dropped == 2
+    assert deduplicator.stats.chunks_kept == 2
+    assert deduplicator.stats.tokens_saved == len(chunks[1].page_content)
+
+
+def test_similarity_threshold_decides_near_duplicates(char_tokenizer):
+    # 뒷부분만 바꿔 써서 중간 정도로 비슷한 청크를 만들고, 추정 유사도 바로 위/아래로 임계값을 둡니다.
+    variant = BODY[: len(BODY) * 4 // 5] + " 이 뒷부분은 원문과 전혀 다른 설명으로 바꾸어 썼다."
+    hasher = MinHasher()
+    similarity = hasher.similarity(hasher.signature(BODY), hasher.signature(variant))
+    assert 0.5 < similarity < 0.85
+
+    strict = ChunkDeduplicator(similarity_threshold=similarity + 0.01, tokenizer=char_tokenizer)
+    loose = ChunkDeduplicator(similarity_threshold=similarity - 0.01, tokenizer=char_tokenizer)
+    chunks = [Document(page_content=BODY), Document(page_content=variant)]
+
+    assert len(strict.filter_chunks(chunks)) == 2
+    assert len(loose.filter_chunks(chunks)) == 1
+
+
+def test_state_is_per_instance(char_tokenizer):
+    first = ChunkDeduplicator(tokenizer=char_tokenizer)
+    second = ChunkDeduplicator(tokenizer=char_tokenizer)
+    first.filter_chunks([Document(page_content=BODY)])
+
+    assert second.filter_chunks([Document(page_content=BODY)]) != []
@@ -0,0 +1,74 @@
+# tests/test_draft_map_reduce.py
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.draft_map_reduce import MapReduceDraftGenerator
+
+
+SUMMARY = "요약" * 30
+
+
+@pytest.fixture
+def generator(char_tokenizer):
+    return MapReduceDraftGenerator(
+        FakeListChatModel(responses=[SUMMARY]),
+        ChatPromptTemplate.from_messages([("human", "{section_index}/{section_count}\n{content}")]),
+        ChatPromptTemplate.from_messages([("human", "{content}")]),
+        tokenizer=char_tokenizer,
+        section_tokens=100,
+    )
+
+
+def test_sections_keep_order_and_stay_within_the_budget(generator):
+    documents = [Document(page_content=text) for text in ("a" * 40, "b" * 40, "c" * 30, "d" * 150, "e" * 10)]
+
+    sections = generator.split_sections(documents)
+
+    assert sections == ["a" * 40 + "\n\n" + "b" * 40, "c" * 30, "d" * 150, "e" * 10]
+
+
+def test_no_collapse_for_one_summary_or_summaries_within_the_budget(generator):
+    assert generator._collapse_groups(["x" * 500]) is None
+    assert generator._collapse_groups(["짧은 요약", "또 다른 요약"]) is None
+
+
+def test_small_summaries_are_grouped_within_the_budget(generator):
+    summaries = [str(i) * 30 for i in range(6)]
+
+    groups = generator._collapse_groups(summaries)
+
+    assert groups == ["\n\n".join(summaries[i : i + 3]) for i in (0, 3)]
+
+
+@pytest.mark.parametrize("lengths", [[60, 60], [60, 60, 60], [99, 51, 80, 70, 60], [300] * 7])
+def test_pairwise_fallback_always_reduces_the_count(generator, lengths):
+    summaries = [chr(ord("a") + i) * n for i, n in enumerate(lengths)]
+
+    groups = generator._collapse_groups(summaries)
+
+    # 요약 하나하나가 예산의 절반을 넘으면 이웃한 두 개씩 묶습니다.
+    assert groups == ["\n\n".join(summaries[i : i + 2]) for i in range(0, len(summaries), 2)]
+    assert len(groups) < len(summaries)
+
+
+def test_generate_collapses_until_one_summary_remains(generator):
+    documents = [Document(page_content=str(i) * 80) for i in range(4)]
+    stats = []
+
+    draft = generator.generate(documents, stats)
+
+    assert draft == SUMMARY
+    assert [(stage.stage, stage.calls) for stage in stats] == [("map", 4), ("collapse 1", 2), ("collapse 2", 1), ("reduce", 1)]
+    assert all(stage.output_tokens == stage.calls * len(SUMMARY) for stage in stats)
+
+
+def test_async_generate_records_the_same_stages(generator):
+    documents = [Document(page_content=str(i) * 80) for i in range(4)]
+    stats = []
+
+    assert asyncio.run(generator.agenerate(documents, stats)) == SUMMARY
+    assert [stage.stage for stage in stats] == ["map", "collapse 1", "collapse 2", "reduce"]
@@ -0,0 +1,127 @@
+# tests/test_draft_patch.py
+import pytest
+
+from src.draft_patch import PatchError, apply_patch
+
+
+DRAFT = """# 선형대수 입문
+
+소개 문단입니다.
+
+## 벡터
+
+벡터는 크기와 방향을 가집니다.
+
+### 내적
+
+내적은 두 벡터의 곱입니다.
+
+## 행렬
+
+행렬은 숫자의 배열입니다.
+"""
+
+
+def test_heading_replace_covers_section_and_subsections():
+    result = apply_patch(DRAFT, [{"op": "replace", "heading": "벡터", "content": "## 벡터\n\n새 설명입니다.\n\n"}])
+
+    assert "크기와 방향" not in result
+    assert "### 내적" not in result
+    assert "## 벡터\n\n새 설명입니다.\n\n## 행렬" in result
+    assert result.startswith("# 선형대수 입문\n\n소개 문단입니다.\n\n")
+
+
+def test_heading_match_ignores_case_markup_and_hashes():
+    result = apply_patch(DRAFT, [{"op": "delete", "heading": "## **내적**"}])
+
+    assert "### 내적" not in result and "두 벡터의 곱" not in result
+    assert "## 행렬" in result and "크기와 방향" in result
+
+
+def test_insert_before_and_after_heading():
+    result = apply_patch(
+        DRAFT,
+        [
+            {"op": "insert_before", "heading": "행렬", "content": "## 스칼라\n\n숫자 하나입니다.\n"},
+            {"op": "insert_after", "heading": "행렬", "content": "## 마무리\n\n끝."},
+        ],
+    )
+
+    assert "## 스칼라\n\n숫자 하나입니다.\n## 행렬" in result
+    assert result.endswith("행렬은 숫자의 배열입니다.\n## 마무리\n\n끝.\n")
+
+
+def test_insert_after_last_section_without_trailing_newline():
+    result = apply_patch("# 제목\n본문", [{"op": "insert_after", "heading": "제목", "content": "추가"}])
+
+    assert result == "# 제목\n본문\n추가\n"
+
+
+def test_find_replaces_only_the_matched_text():
+    result = apply_patch(DRAFT, [{"op": "replace", "find": "크기와 방향을", "content": "크기, 방향을"}])
+
+    assert result == DRAFT.replace("벡터는 크기와 방향을", "벡터는 크기, 방향을")
+
+
+def test_operations_are_anchored_on_the_original_draft():
+    result = apply_patch(
+        DRAFT,
+        [
+            {"op": "replace", "find": "소개 문단입니다.", "content": "## 행렬\n"},
+            {"op": "delete", "heading": "행렬"},
+        ],
+    )
+
+    # 첫 연산이 만든 "## 행렬" 이 아니라 원래 초안의 행렬 섹션이 지워집니다.
+    assert result.count("## 행렬") == 1
+    assert "숫자의 배열" not in result
+
+
+def test_overlapping_operations_raise():
+    with pytest.raises(PatchError):
+        apply_patch(
+            DRAFT,
+            [
+                {"op": "replace", "heading": "벡터", "content": "## 벡터\n"},
+                {"op": "replace", "find": "내적은 두 벡터의 곱입니다.", "content": "..."},
+            ],
+        )
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "replace", "heading": "없는 제목", "content": "x"},
+        {"op": "delete", "find": "초안에 없는 문장"},
+        {"op": "delete", "find": "벡터"},  # 여러 번 나오는 문장
+        {"op": "delete", "find": ""},
+    ],
+)
+def test_missing_or_ambiguous_anchor_raises(operation):
+    with pytest.raises(PatchError):
+        apply_patch(DRAFT, [operation])
+
+
+@pytest.mark.parametrize(
+    "operations",
+    [
+        {"op": "delete", "heading": "벡터"},
+        ["delete 벡터"],
+        [{"op": "rewrite", "heading": "벡터"}],
+        [{"op": "delete"}],
+        [{"op": "delete", "heading": "벡터", "find": "벡터는"}],
+        [{"op": "replace", "heading": 3, "content": "x"}],
+        [{"op": "replace", "heading": "벡터", "content": ["x"]}],
+    ],
+)
+def test_malformed_operations_raise(operations):
+    with pytest.raises(PatchError):
+        apply_patch(DRAFT, operations)
+
+
+def test_heading_lines_inside_code_blocks_are_ignored():
+    draft = "# 예제\n\n```python\n# 벡터\nx = 1\n```\n\n## 벡터\n\n본문\n"
+
+    result = apply_patch(draft, [{"op": "delete", "heading": "벡터"}])
+
+    assert result == "# 예제\n\n```python\n# 벡터\nx = 1\n```\n\n"
@@ -0,0 +1,109 @@
+# tests/test_embedding_cache.py
+import unicodedata
+
+import numpy as np
+import pytest
+
+import src.vector_store as vector_store
+from src.vector_store import CachedEmbeddings
+
+
+@pytest.fixture
+def cached(tmp_path, fake_embeddings):
+    return CachedEmbeddings(fake_embeddings, model_name="fake/model", path=tmp_path / "embeddings.sqlite3")
+
+
+def test_second_call_is_served_from_cache(cached, fake_embeddings):
+    texts = ["첫 번째 청크", "두 번째 청크"]
+
+    first = cached.embed_documents(texts)
+    second = cached.embed_documents(texts)
+
+    assert fake_embeddings.calls == 1
+    np.testing.assert_allclose(second, first)
+    np.testing.assert_allclose(first, fake_embeddings.embed_documents(texts), rtol=1e-6)
+    assert cached.stats == {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 2}
+
+
+def test_only_missing_texts_are_embedded_once(cached, fake_embeddings):
+    cached.embed_documents(["a b"])
+
+    cached.embed_documents(["a b", "c d", "c d", "e f"])
+
+    assert fake_embeddings.texts_embedded == 1 + 2
+    assert cached.stats["entries"] == 3
+
+
+def test_whitespace_and_unicode_normalization_share_an_entry(cached, fake_embeddings):
+    cached.embed_documents(["한글 텍스트"])
+    # 조합형(NFD) 한글과 다른 공백도 같은 텍스트로 봅니다.
+    cached.embed_documents([unicodedata.normalize("NFD", "  한글\n텍스트 ")])
+
+    assert fake_embeddings.texts_embedded == 1
+
+
+def test_query_and_document_vectors_are_cached_separately(cached, fake_embeddings):
+    cached.embed_documents(["질문"])
+    cached.embed_query("질문")
+    cached.embed_query("질문")
+
+    # 같은 텍스트라도 문서/쿼리 벡터는 따로 저장하고, 두 번째 쿼리는 캐시에서 꺼냅니다.
+    assert cached.stats["entries"] == 2
+    assert cached.stats["misses"] == 2 and cached.stats["hits"] == 1
+
+
+def test_model_name_separates_entries_in_the_same_file(tmp_path, fake_embeddings):
+    path = tmp_path / "embeddings.sqlite3"
+    CachedEmbeddings(fake_embeddings, model_name="openai/m", path=path).embed_documents(["같은 텍스트"])
+
+    other = CachedEmbeddings(fake_embeddings, model_name="openai/m/d256", path=path)
+    other.embed_documents(["같은 텍스트"])
+
+    assert fake_embeddings.texts_embedded == 2
+    assert other.stats["misses"] == 1 and other.stats["entries"] == 2
+
+
+def test_lookup_documents_returns_only_cached_texts_without_embedding(cached, fake_embeddings):
+    vectors = cached.embed_documents(["a", "b"])
+    calls = fake_embeddings.calls
+
+    found = cached.lookup_documents(["b", "new", "a"])
+
+    assert sorted(found) == [0, 2]
+    np.testing.assert_allclose(found[0], vectors[1])
+    np.testing.assert_allclose(found[2], vectors[0])
+    assert fake_embeddings.calls == calls
+
+
+def test_lookup_documents_handles_more_keys_than_one_sqlite_batch(cached):
+    texts = [f"청크 {i}" for i in range(1200)]
+    cached.embed_documents(texts)
+
+    assert len(cached.lookup_documents(texts)) == 1200
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, fake_embeddings):
+    cached = CachedEmbeddings(fake_embeddings, model_name="fake/model", path=tmp_path / "e.sqlite3", max_entries=2)
+    cached.embed_documents(["old"])
+    cached.embed_documents(["kept"])
+    cached.embed_documents(["kept"])  # 최근 사용으로 갱신
+
+    cached.embed_documents(["new"])
+
+    assert cached.stats["entries"] == 2
+    assert sorted(cached.lookup_documents(["old", "kept", "new"])) == [1, 2]
+
+
+def test_get_cached_embeddings_uses_the_shared_model_tag(monkeypatch, tmp_path, fake_embeddings):
+    monkeypatch.setattr(vector_store, "create_embeddings", lambda: fake_embeddings)
+    monkeypatch.setattr(vector_store, "EMBEDDING_CACHE_PATH", tmp_path / "embeddings.sqlite3")
+    monkeypatch.setattr(vector_store, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(vector_store, "EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setattr(vector_store, "EMBEDDING_DIMENSIONS", 256)
+    vector_store.get_cached_embeddings.cache_clear()
+    try:
+        embeddings = vector_store.get_cached_embeddings()
+        assert embeddings.model_name == vector_store.embedding_model_tag() == "openai/text-embedding-3-small/d256"
+        assert embeddings is vector_store.get_cached_embeddings()
+    finally:
+        vector_store.get_cached_embeddings.cache_clear()
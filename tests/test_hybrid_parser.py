@@ -0,0 +1,86 @@
+# tests/test_hybrid_parser.py
+import pymupdf
+import pytest
+
+from src.hybrid_parser import ROUTE_OCR, ROUTE_TEXT, HybridPDFLoader
+
+
+TEXT_LINES = [f"Line {i}: eigenvalues and eigenvectors of a symmetric matrix" for i in range(6)]
+
+
+class FakeOCRLoader(HybridPDFLoader):
+    """OCR 엔진 대신 정해진 텍스트를 돌려주고, OCR 을 요청받은 페이지를 기록하는 로더."""
+
+    def __init__(self, *args, ocr_text: str = "OCR 결과", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ocr_text = ocr_text
+        self.ocr_requests: list[list[int]] = []
+
+    def _ocr_pages(self, pages):
+        self.ocr_requests.append(pages)
+        return {page: self.ocr_text for page in pages}
+
+
+def pdf_with_image_page(caption: str, coverage: float) -> bytes:
+    """텍스트 페이지 하나와, 이미지가 페이지의 coverage 만큼 덮고 caption 만 있는 페이지 하나로 된 PDF."""
+    with pymupdf.open() as pdf:
+        text_page = pdf.new_page()
+        for i, line in enumerate(TEXT_LINES):
+            text_page.insert_text((72, 72 + 14 * i), line)
+        image_page = pdf.new_page()
+        pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8), 0)
+        pixmap.clear_with(200)
+        rect = image_page.rect
+        image_page.insert_image(pymupdf.Rect(0, 0, rect.width, rect.height * coverage), pixmap=pixmap)
+        image_page.insert_text((72, rect.height - 40), caption)
+        return pdf.tobytes()
+
+
+def test_text_pages_are_not_sent_to_ocr(make_pdf):
+    loader = FakeOCRLoader(make_pdf([TEXT_LINES, TEXT_LINES[:3]]), source_name="lecture.pdf")
+
+    documents = loader.load()
+
+    assert loader.ocr_requests == []
+    assert [doc.metadata["parse_route"] for doc in documents] == [ROUTE_TEXT, ROUTE_TEXT]
+    assert documents[0].page_content == "\n".join(TEXT_LINES)
+    assert documents[1].metadata["source"] == "lecture.pdf" and documents[1].metadata["page"] == 1
+
+
+def test_only_pages_without_enough_text_are_ocred(make_pdf):
+    loader = FakeOCRLoader(make_pdf([TEXT_LINES, ["p. 2"], TEXT_LINES, []]), min_text_chars=50)
+
+    documents = loader.load()
+
+    assert loader.ocr_requests == [[1, 3]]
+    assert [doc.page_content for doc in documents] == ["\n".join(TEXT_LINES), "OCR 결과", "\n".join(TEXT_LINES), "OCR 결과"]
+    assert [profile.route for profile in loader.page_profiles] == [ROUTE_TEXT, ROUTE_OCR, ROUTE_TEXT, ROUTE_OCR]
+    assert loader.page_profiles[1].text_chars == len("p. 2")
+
+
+@pytest.mark.parametrize("coverage, route", [(0.9, ROUTE_OCR), (0.3, ROUTE_TEXT)])
+def test_image_pages_with_a_short_caption_follow_the_coverage_limit(coverage, route):
+    caption = "Figure 3: a scanned diagram of the singular value decomposition"
+    loader = FakeOCRLoader(pdf_with_image_page(caption, coverage), min_text_chars=50, max_image_coverage=0.6)
+
+    documents = loader.load()
+
+    profile = loader.page_profiles[1]
+    assert profile.route == route
+    assert profile.image_coverage == pytest.approx(coverage, abs=0.01)
+    assert documents[1].metadata["parse_route"] == route
+    assert documents[1].page_content == ("OCR 결과" if route == ROUTE_OCR else caption)
+
+
+def test_image_pages_with_long_text_keep_the_text_layer():
+    caption = "Figure 3: a scanned diagram of the singular value decomposition"
+    loader = FakeOCRLoader(pdf_with_image_page(caption, 0.9), min_text_chars=50, image_page_max_chars=40)
+
+    assert loader.load()[1].page_content == caption
+    assert loader.ocr_requests == []
+
+
+def test_empty_ocr_result_falls_back_to_the_text_layer(make_pdf):
+    loader = FakeOCRLoader(make_pdf([["p. 1"]]), ocr_text="")
+
+    assert loader.load()[0].page_content == "p. 1"
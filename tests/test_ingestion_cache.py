@@ -0,0 +1,147 @@
+# tests/test_ingestion_cache.py
+import sqlite3
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+import src.vector_store as vector_store
+from src.ingestion_cache import IngestionCache
+
+
+def make_key(**overrides) -> str:
+    settings = {
+        "parser_type": "local",
+        "chunk_size": 1000,
+        "chunk_overlap": 100,
+        "embedding_model": "openai/text-embedding-3-small",
+    }
+    settings.update(overrides)
+    return IngestionCache.make_key(b"%PDF-1.7 same file", **settings)
+
+
+def chunks(n: int, label: str) -> tuple[list[Document], np.ndarray]:
+    documents = [Document(page_content=f"{label} 청크 {i}", metadata={"page": i + 1}) for i in range(n)]
+    return documents, np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IngestionCache(path=tmp_path / "ingestion.sqlite3", max_bytes=10_000_000)
+
+
+def test_put_then_get_returns_same_chunks_and_embeddings(cache):
+    documents, embeddings = chunks(3, "a")
+    key = make_key()
+    cache.put(key, documents, embeddings, pages=5)
+
+    cached = cache.get(key)
+
+    assert [doc.page_content for doc in cached.documents] == [doc.page_content for doc in documents]
+    assert [doc.metadata for doc in cached.documents] == [doc.metadata for doc in documents]
+    np.testing.assert_array_equal(cached.embeddings, embeddings)
+    # 청크가 없는 페이지가 있어도 원본 페이지 수를 그대로 돌려줍니다.
+    assert cached.pages == 5
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 0
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"chunk_size": 500},
+        {"text_splitter": "token"},
+        {"dedup": True},
+        {"options": {"encoding": "cl100k_base"}},
+        {"options": {"hybrid": {"min_text_chars": 10}}},
+        {"embedding_model": "openai/text-embedding-3-small/d256"},
+    ],
+)
+def test_changed_settings_miss_the_cache(cache, overrides):
+    documents, embeddings = chunks(2, "a")
+    cache.put(make_key(), documents, embeddings, pages=2)
+
+    assert make_key(**overrides) != make_key()
+    assert cache.get(make_key(**overrides)) is None
+    assert cache.stats["misses"] == 1
+
+
+def test_options_are_order_independent():
+    assert make_key(options={"a": 1, "b": 2}) == make_key(options={"b": 2, "a": 1})
+    assert make_key(options={}) == make_key()
+
+
+def test_model_tag_tracks_dimensions_and_is_shared_with_embedding_cache(monkeypatch):
+    monkeypatch.setattr(vector_store, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(vector_store, "EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setattr(vector_store, "EMBEDDING_DIMENSIONS", None)
+    full = vector_store.embedding_model_tag()
+    monkeypatch.setattr(vector_store, "EMBEDDING_DIMENSIONS", 256)
+    reduced = vector_store.embedding_model_tag()
+
+    assert full == "openai/text-embedding-3-small"
+    assert reduced == "openai/text-embedding-3-small/d256"
+
+
+def test_model_tag_marks_quantized_local_embeddings(monkeypatch):
+    monkeypatch.setattr(vector_store, "EMBEDDING_PROVIDER", "huggingface")
+    monkeypatch.setattr(vector_store, "EMBEDDING_MODEL", "BAAI/bge-m3")
+    monkeypatch.setattr(vector_store, "EMBEDDING_DIMENSIONS", None)
+    monkeypatch.setattr(vector_store, "LOCAL_EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(vector_store, "detect_device", lambda preferred: "cpu")
+
+    monkeypatch.setattr(vector_store, "LOCAL_EMBEDDING_QUANTIZE", False)
+    assert vector_store.embedding_model_tag() == "huggingface/BAAI/bge-m3"
+    monkeypatch.setattr(vector_store, "LOCAL_EMBEDDING_QUANTIZE", True)
+    assert vector_store.embedding_model_tag() == "huggingface/BAAI/bge-m3/onnx-int8"
+    # GPU 에서는 양자화하지 않으므로 원본과 같은 태그를 씁니다.
+    monkeypatch.setattr(vector_store, "detect_device", lambda preferred: "cuda")
+    assert vector_store.embedding_model_tag() == "huggingface/BAAI/bge-m3"
+
+
+def test_eviction_removes_least_recently_used_entry(tmp_path):
+    documents, embeddings = chunks(4, "x")
+    probe = IngestionCache(path=tmp_path / "probe.sqlite3")
+    probe.put("probe", documents, embeddings, pages=4)
+    entry_size = probe.stats["size_bytes"]
+
+    # 두 항목까지만 들어가는 크기
+    cache = IngestionCache(path=tmp_path / "ingestion.sqlite3", max_bytes=entry_size * 2 + entry_size // 2)
+    cache.put("first", *chunks(4, "x"), pages=4)
+    cache.put("second", *chunks(4, "x"), pages=4)
+    assert cache.get("first") is not None  # first 를 최근 사용으로 갱신
+    cache.put("third", *chunks(4, "x"), pages=4)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert cache.stats["entries"] == 2
+    assert cache.stats["size_bytes"] <= cache.max_bytes
+
+
+def test_entry_larger_than_the_cache_is_not_stored(tmp_path):
+    cache = IngestionCache(path=tmp_path / "ingestion.sqlite3", max_bytes=10)
+    cache.put("big", *chunks(2, "a"), pages=2)
+
+    assert cache.get("big") is None
+    assert cache.stats["entries"] == 0
+
+
+def test_entries_from_before_page_counts_are_misses(tmp_path):
+    path = tmp_path / "ingestion.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE entries (
+                key TEXT PRIMARY KEY, documents TEXT NOT NULL, embeddings BLOB NOT NULL, dim INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("INSERT INTO entries VALUES ('old', '[]', x'', 4, 2, 0, 0, 0)")
+
+    cache = IngestionCache(path=path)
+    assert cache.get("old") is None
+
+    cache.put("old", *chunks(1, "a"), pages=3)
+    assert cache.get("old").pages == 3
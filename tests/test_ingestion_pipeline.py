@@ -0,0 +1,92 @@
+# tests/test_ingestion_pipeline.py
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.document_preprocessor import DocumentPreprocessor
+from src.ingestion_pipeline import IngestionPipeline
+
+
+TOPICS = ["vectors and norms", "matrix products", "determinants", "eigenvalues", "orthogonality", "singular values"]
+
+
+@pytest.fixture
+def lecture(make_pdf):
+    # 페이지마다 내용이 달라 중복 제거로 빠지는 청크가 없습니다.
+    return make_pdf([[f"Lecture {i}: {topic}", f"Notes on {topic} with worked example {i}"] for i, topic in enumerate(TOPICS)])
+
+
+def pipeline_for(pdf: bytes, vector_store, **kwargs) -> IngestionPipeline:
+    return IngestionPipeline(DocumentPreprocessor(pdf, filename="lecture.pdf"), vector_store, **kwargs)
+
+
+def test_every_chunk_is_stored_in_document_order(make_vector_store, lecture):
+    vector_store = make_vector_store()
+    pipeline = pipeline_for(lecture, vector_store, batch_size=2, metadata={"source_file": "lecture.pdf"}, id_prefix="0000-")
+
+    events = list(pipeline.run())
+
+    assert [doc.metadata["page"] for doc in pipeline.documents] == list(range(len(TOPICS)))
+    assert all(doc.metadata["source_file"] == "lecture.pdf" for doc in pipeline.documents)
+    assert vector_store.count() == len(pipeline.stored_ids) == len(pipeline.documents)
+    assert all(doc_id.startswith("0000-") for doc_id in pipeline.stored_ids)
+    assert [doc.page_content for doc in vector_store.get_documents()] == [doc.page_content for doc in pipeline.documents]
+    assert events[-1].done and events[-1].chunks_stored == len(pipeline.documents)
+
+
+def test_embeddings_are_read_back_in_document_order(make_vector_store, fake_embeddings, lecture):
+    pipeline = pipeline_for(lecture, make_vector_store(), batch_size=4)
+    list(pipeline.run())
+
+    expected = fake_embeddings.embed_documents([doc.page_content for doc in pipeline.documents])
+    np.testing.assert_allclose(pipeline.embeddings, expected, rtol=1e-5)
+
+
+def test_progress_is_monotonic_and_reports_pages(make_vector_store, lecture):
+    events = list(pipeline_for(lecture, make_vector_store(), batch_size=1).run())
+
+    fractions = [event.fraction for event in events]
+    assert fractions == sorted(fractions)
+    assert all(event.fraction < 1.0 for event in events[:-1]) and events[-1].fraction == 1.0
+    assert [event.pages_done for event in events[: len(TOPICS)]] == list(range(1, len(TOPICS) + 1))
+    assert all(event.total_pages == len(TOPICS) for event in events)
+    assert events[-1].message == f"페이지 {len(TOPICS)}/{len(TOPICS)} 파싱 · 청크 {len(TOPICS)}/{len(TOPICS)} 임베딩 완료"
+
+
+def test_inflight_batches_are_bounded(make_vector_store, lecture):
+    vector_store = make_vector_store()
+    store = vector_store.add_documents
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def tracked_add_documents(documents, ids=None):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.02)
+            return store(documents, ids=ids)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    vector_store.add_documents = tracked_add_documents
+    pipeline = pipeline_for(lecture, vector_store, batch_size=1, max_inflight_batches=2)
+
+    list(pipeline.run())
+
+    assert peak[0] <= 2
+    assert vector_store.count() == len(TOPICS)
+
+
+def test_rerun_with_the_same_prefix_skips_stored_chunks(make_vector_store, fake_embeddings, lecture):
+    vector_store = make_vector_store()
+    list(pipeline_for(lecture, vector_store, batch_size=2, id_prefix="0000-").run())
+    calls = fake_embeddings.calls
+
+    rerun = pipeline_for(lecture, vector_store, batch_size=2, id_prefix="0000-")
+    list(rerun.run())
+
+    assert fake_embeddings.calls == calls
+    assert vector_store.count() == len(rerun.stored_ids) == len(TOPICS)
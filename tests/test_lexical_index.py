@@ -0,0 +1,69 @@
+# tests/test_lexical_index.py
+import math
+
+import pytest
+from langchain_core.documents import Document
+
+from src.lexical_index import BM25Index, tokenize
+
+
+CORPUS = ["apple banana", "apple apple cherry", "cherry date date date", "banana"]
+
+
+def expected_bm25(query: str, corpus: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """BM25 정의를 그대로 옮긴 점수. (비교 기준)"""
+    documents = [text.split() for text in corpus]
+    avg_length = sum(map(len, documents)) / len(documents)
+    scores = []
+    for words in documents:
+        score = 0.0
+        for term in set(query.split()):
+            df = sum(term in doc for doc in documents)
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            tf = words.count(term)
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(words) / avg_length))
+        scores.append(score)
+    return scores
+
+
+def index_of(texts: list[str]) -> BM25Index:
+    index = BM25Index()
+    index.add([Document(id=str(i), page_content=text) for i, text in enumerate(texts)])
+    return index
+
+
+def test_tokenize_splits_hangul_into_ngrams_and_keeps_words():
+    assert tokenize("Perplexity는 행렬의 값") == ["perplexity", "는", "행렬", "렬의", "값"]
+    assert tokenize("ＡＢＣ 123", ngram=3) == ["abc", "123"]
+
+
+@pytest.mark.parametrize("query", ["apple", "cherry date", "banana apple", "date"])
+def test_scores_match_the_bm25_formula(query):
+    index = index_of(CORPUS)
+    expected = expected_bm25(query, CORPUS)
+
+    results = index.search(query, k=len(CORPUS))
+
+    assert [doc.id for doc, _ in results] == [str(i) for i in sorted(range(len(CORPUS)), key=lambda i: -expected[i]) if expected[i] > 0]
+    for doc, score in results:
+        assert score == pytest.approx(expected[int(doc.id)], rel=1e-5)
+
+
+def test_unknown_terms_and_empty_index_return_nothing():
+    assert index_of(CORPUS).search("zebra") == []
+    assert BM25Index().search("apple") == []
+
+
+def test_removed_and_replaced_documents_leave_the_statistics():
+    index = index_of(CORPUS)
+
+    index.remove(["1"])
+    index.add([Document(id="3", page_content="kiwi")])
+
+    remaining = ["apple banana", "cherry date date date", "kiwi"]
+    expected = dict(zip(["0", "2", "3"], expected_bm25("apple kiwi banana", remaining)))
+    results = index.search("apple kiwi banana", k=10)
+    assert {doc.id for doc, _ in results} == {"0", "3"}
+    for doc, score in results:
+        assert score == pytest.approx(expected[doc.id], rel=1e-5)
+    assert len(index) == 3
@@ -0,0 +1,95 @@
+# tests/test_local_embeddings.py
+import numpy as np
+import pytest
+
+import src.vector_store as vector_store
+from src.local_embeddings import LocalEmbeddings, default_pooling, detect_device
+
+
+class FakeSentenceTransformer:
+    """텍스트 길이로 벡터를 만들고 받은 배치를 기록하는 모델 대역."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts, batch_size, normalize_embeddings, convert_to_numpy, show_progress_bar):
+        self.batches.append(list(texts))
+        vectors = np.array([[len(text) + i for i in range(self.dim)] for text in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class FakeModelEmbeddings(LocalEmbeddings):
+    """모델을 내려받지 않고 FakeSentenceTransformer 를 쓰는 LocalEmbeddings."""
+
+    def _load_torch(self):
+        return FakeSentenceTransformer()
+
+
+def test_detect_device_falls_back_to_cpu():
+    assert detect_device("auto") in ("cuda", "mps", "cpu")
+    assert detect_device("no-such-device") == "cpu"
+
+
+def test_detect_device_keeps_an_available_explicit_device():
+    torch = pytest.importorskip("torch")
+
+    assert detect_device("cpu") == "cpu"
+    if not torch.cuda.is_available():
+        assert detect_device("cuda:0") == "cpu"
+
+
+def test_default_pooling_uses_cls_for_bge_models():
+    assert default_pooling("BAAI/bge-m3") == "cls"
+    assert default_pooling("sentence-transformers/all-MiniLM-L6-v2") == "mean"
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        LocalEmbeddings("any/model", backend="tensorrt")
+
+
+def test_batches_are_sorted_by_length_and_results_keep_input_order():
+    embeddings = FakeModelEmbeddings("fake/model", device="cpu", batch_size=2)
+    texts = ["medium text", "a", "the longest text of all", "bb", "short"]
+
+    vectors = np.asarray(embeddings.embed_documents(texts))
+
+    batches = embeddings._model.batches
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    lengths = [len(text) for batch in batches for text in batch]
+    assert lengths == sorted(lengths)
+    np.testing.assert_allclose(vectors, [embeddings.embed_query(text) for text in texts], rtol=1e-6)
+
+
+def test_dimensions_truncate_and_renormalize():
+    embeddings = FakeModelEmbeddings("fake/model", device="cpu", dimensions=3)
+
+    vector = np.asarray(embeddings.embed_query("텍스트"))
+
+    assert vector.shape == (3,)
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    np.testing.assert_allclose(vector, np.array([3, 4, 5]) / np.linalg.norm([3, 4, 5]), rtol=1e-6)
+
+
+def test_quantization_is_only_applied_on_cpu(monkeypatch):
+    import src.local_embeddings as local_embeddings
+
+    monkeypatch.setattr(local_embeddings, "detect_device", lambda preferred: preferred)
+
+    assert FakeModelEmbeddings("fake/model", device="cpu", quantize=True).quantize
+    assert not FakeModelEmbeddings("fake/model", device="cuda", quantize=True).quantize
+
+
+@pytest.mark.parametrize("device, tag", [("cpu", "huggingface/BAAI/bge-m3/torch-int8"), ("cuda", "huggingface/BAAI/bge-m3")])
+def test_model_tag_marks_int8_vectors(monkeypatch, device, tag):
+    monkeypatch.setattr(vector_store, "EMBEDDING_PROVIDER", "huggingface")
+    monkeypatch.setattr(vector_store, "EMBEDDING_MODEL", "BAAI/bge-m3")
+    monkeypatch.setattr(vector_store, "EMBEDDING_DIMENSIONS", None)
+    monkeypatch.setattr(vector_store, "LOCAL_EMBEDDING_QUANTIZE", True)
+    monkeypatch.setattr(vector_store, "LOCAL_EMBEDDING_BACKEND", "torch")
+    monkeypatch.setattr(vector_store, "detect_device", lambda preferred: device)
+
+    assert vector_store.embedding_model_tag() == tag
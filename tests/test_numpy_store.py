@@ -0,0 +1,135 @@
+# tests/test_numpy_store.py
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.numpy_store import NumpyVectorStore, maximal_marginal_relevance
+
+
+class NoEmbeddings(Embeddings):
+    """벡터를 직접 넣는 테스트에서 쓰는 임베딩 대역. 호출되면 실패합니다."""
+
+    def embed_documents(self, texts):
+        raise AssertionError("embedding should not be called")
+
+    def embed_query(self, text):
+        raise AssertionError("embedding should not be called")
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((200, 16)).astype(np.float32)
+
+
+def make_store(vectors, **kwargs) -> NumpyVectorStore:
+    store = NumpyVectorStore(NoEmbeddings(), **kwargs)
+    store.upsert([f"{i:04d}" for i in range(len(vectors))], vectors, [f"청크 {i}" for i in range(len(vectors))])
+    return store
+
+
+def exact_top_k(vectors, query, k) -> list[str]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"{i:04d}" for i in np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k]]
+
+
+def test_similarity_search_is_exact_top_k(vectors):
+    store = make_store(vectors)
+    query = vectors[7] + 0.1
+
+    results = store.similarity_search_by_vector_with_score(query.tolist(), k=5)
+
+    assert [doc.id for doc, _ in results] == exact_top_k(vectors, query, 5)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_reranks_to_exact_top_k(vectors, quantization):
+    store = make_store(vectors, quantization=quantization, rerank_factor=50)
+    query = vectors[42]
+
+    results = store.similarity_search_by_vector(query.tolist(), k=3)
+
+    assert results[0].id == "0042"
+    assert [doc.id for doc in results] == exact_top_k(vectors, query, 3)
+
+
+def test_upsert_replaces_existing_id(vectors):
+    store = make_store(vectors[:3])
+
+    store.upsert(["0001"], vectors[10:11], ["바뀐 청크"], [{"page": 9}])
+
+    assert len(store) == 3
+    [doc] = store.get_by_ids(["0001"])
+    assert doc.page_content == "바뀐 청크" and doc.metadata == {"page": 9}
+    np.testing.assert_allclose(store.get_vectors(["0001"])[0], vectors[10] / np.linalg.norm(vectors[10]), rtol=1e-6)
+
+
+def test_snapshot_is_not_changed_by_later_replace(vectors):
+    store = make_store(vectors[:3])
+    snapshot = store._snapshot()
+    before = snapshot.vectors.copy()
+
+    store.upsert(["0001"], vectors[10:11], ["바뀐 청크"])
+    store.upsert(["new"], vectors[11:12], ["새 청크"])
+
+    assert snapshot.document(1).page_content == "청크 1"
+    np.testing.assert_array_equal(snapshot.vectors, before)
+    assert store.get_by_ids(["0001"])[0].page_content == "바뀐 청크"
+
+
+def test_delete_removes_rows(vectors):
+    store = make_store(vectors[:5])
+
+    store.delete(["0001", "0003"])
+
+    assert [doc.id for doc in store.documents()] == ["0000", "0002", "0004"]
+    assert store.similarity_search_by_vector(vectors[3].tolist(), k=5)[0].id != "0003"
+
+
+def test_dimension_mismatch_raises(vectors):
+    store = make_store(vectors[:2])
+
+    with pytest.raises(ValueError):
+        store.upsert(["x"], np.ones((1, 4), dtype=np.float32), ["x"])
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_save_and_load_round_trip(tmp_path, vectors, quantization):
+    store = make_store(vectors, quantization=quantization, dtype="float16")
+    store.similarity_search_by_vector(vectors[0].tolist(), k=1)  # 양자화 코드 생성
+    store.save(tmp_path)
+
+    loaded = NumpyVectorStore.load(tmp_path, NoEmbeddings())
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.dtype == np.float16 and loaded.quantization == quantization
+    assert [doc.id for doc in loaded.documents()] == [doc.id for doc in store.documents()]
+    query = vectors[5].tolist()
+    assert [d.id for d in loaded.similarity_search_by_vector(query, k=5)] == [d.id for d in store.similarity_search_by_vector(query, k=5)]
+
+
+def test_save_over_own_memory_mapped_files(tmp_path, vectors):
+    make_store(vectors[:50]).save(tmp_path)
+    store = NumpyVectorStore.load(tmp_path, NoEmbeddings())
+    mapped = store.vectors
+    expected = np.array(mapped)
+
+    store.upsert(["extra"], vectors[50:51], ["추가 청크"])
+    store.save(tmp_path)
+
+    # 저장 전에 열어 둔 memory-map 은 이전 파일을 그대로 읽습니다.
+    np.testing.assert_array_equal(mapped, expected)
+    reloaded = NumpyVectorStore.load(tmp_path, NoEmbeddings())
+    assert len(reloaded) == 51
+    assert reloaded.similarity_search_by_vector(vectors[50].tolist(), k=1)[0].id == "extra"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_mmr_prefers_diverse_candidates():
+    query = np.array([1.0, 0.0], dtype=np.float32)
+    candidates = np.array([[1.0, 0.0], [0.999, 0.045], [0.7, 0.714]], dtype=np.float32)
+    candidates /= np.linalg.norm(candidates, axis=1, keepdims=True)
+
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=1.0) == [0, 1]
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=0.3) == [0, 2]
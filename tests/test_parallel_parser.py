@@ -0,0 +1,46 @@
+# tests/test_parallel_parser.py
+import pymupdf
+import pytest
+
+from src.parallel_parser import load_pdf_parallel, split_page_ranges
+from src.pdf_loader import PyMuPDFPageLoader
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "upload-1234.pdf"
+    with pymupdf.open() as pdf:
+        for i in range(5):
+            pdf.new_page().insert_text((72, 72), f"page {i + 1}")
+        pdf.save(path)
+    return path
+
+
+def test_split_page_ranges_covers_every_page():
+    assert split_page_ranges(7, 3) == [(0, 3), (3, 6), (6, 7)]
+    assert split_page_ranges(0, 3) == []
+
+
+def test_single_worker_rewrites_source_name(pdf_path):
+    docs = list(load_pdf_parallel(pdf_path, PyMuPDFPageLoader, max_workers=1, source_name="lecture.pdf"))
+
+    assert [doc.metadata["page"] for doc in docs] == [0, 1, 2, 3, 4]
+    assert {doc.metadata["source"] for doc in docs} == {"lecture.pdf"}
+    assert {doc.metadata["file_path"] for doc in docs} == {"lecture.pdf"}
+    assert {doc.metadata["total_pages"] for doc in docs} == {5}
+
+
+def test_single_worker_without_source_name_keeps_file_path(pdf_path):
+    docs = list(load_pdf_parallel(pdf_path, PyMuPDFPageLoader, max_workers=1))
+
+    assert {doc.metadata["source"] for doc in docs} == {str(pdf_path)}
+
+
+def test_parallel_and_single_worker_produce_same_pages(pdf_path):
+    single = list(load_pdf_parallel(pdf_path, PyMuPDFPageLoader, max_workers=1, source_name="lecture.pdf"))
+    parallel = list(
+        load_pdf_parallel(pdf_path, PyMuPDFPageLoader, max_workers=2, pages_per_task=2, source_name="lecture.pdf")
+    )
+
+    assert [doc.page_content for doc in parallel] == [f"page {i + 1}" for i in range(5)]
+    assert [doc.metadata for doc in parallel] == [doc.metadata for doc in single]
@@ -0,0 +1,74 @@
+# tests/test_pdf_loader.py
+import mmap
+
+import pytest
+
+from src.document_preprocessor import DocumentPreprocessor
+from src.pdf_loader import PyMuPDFPageLoader, as_buffer, is_in_memory
+
+
+PAGES = [["Lecture 1: vectors", "dot products"], ["Lecture 2: matrices"]]
+
+
+@pytest.fixture
+def pdf_bytes(make_pdf):
+    return make_pdf(PAGES)
+
+
+@pytest.fixture
+def pdf_path(tmp_path, pdf_bytes):
+    path = tmp_path / "lecture.pdf"
+    path.write_bytes(pdf_bytes)
+    return path
+
+
+def contents(loader: PyMuPDFPageLoader) -> list[tuple[str, int]]:
+    return [(doc.page_content, doc.metadata["page"]) for doc in loader.lazy_load()]
+
+
+def test_buffers_and_paths_load_the_same_pages(pdf_bytes, pdf_path):
+    expected = [("\n".join(lines), page) for page, lines in enumerate(PAGES)]
+
+    assert contents(PyMuPDFPageLoader(pdf_path)) == expected
+    assert contents(PyMuPDFPageLoader(pdf_bytes)) == expected
+    assert contents(PyMuPDFPageLoader(bytearray(pdf_bytes))) == expected
+    assert contents(PyMuPDFPageLoader(memoryview(pdf_bytes))) == expected
+    with open(pdf_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert contents(PyMuPDFPageLoader(mapped)) == expected
+
+
+def test_metadata_matches_pymupdf_loader_keys(pdf_bytes, pdf_path):
+    [first, _] = PyMuPDFPageLoader(pdf_bytes, source_name="lecture.pdf").load()
+
+    assert first.metadata["source"] == first.metadata["file_path"] == "lecture.pdf"
+    assert first.metadata["total_pages"] == 2 and first.metadata["page"] == 0
+    assert PyMuPDFPageLoader(pdf_bytes).source_name == "document.pdf"
+    assert PyMuPDFPageLoader(pdf_path).load()[0].metadata["source"] == str(pdf_path)
+
+
+def test_buffer_helpers_avoid_copies(pdf_bytes):
+    view = memoryview(pdf_bytes)
+
+    assert as_buffer(pdf_bytes) is pdf_bytes
+    assert as_buffer(view) is view
+    assert isinstance(as_buffer(bytearray(pdf_bytes)), memoryview)
+    assert is_in_memory(pdf_bytes) and not is_in_memory("lecture.pdf")
+
+
+def test_preprocessor_parses_uploads_without_a_temp_file(pdf_bytes):
+    with DocumentPreprocessor(pdf_bytes, filename="lecture.pdf") as preprocessor:
+        chunks = preprocessor.process()
+
+        assert preprocessor._temp_path is None
+    assert [chunk.metadata["source"] for chunk in chunks] == ["lecture.pdf", "lecture.pdf"]
+    assert preprocessor.page_count == 2
+
+
+def test_temp_file_is_created_on_demand_and_removed_on_close(pdf_bytes):
+    preprocessor = DocumentPreprocessor(pdf_bytes, filename="lecture.pdf")
+
+    path = preprocessor.filepath
+
+    assert path.read_bytes() == pdf_bytes
+    preprocessor.close()
+    assert not path.exists()
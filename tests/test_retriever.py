@@ -0,0 +1,243 @@
+# tests/test_retriever.py
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from src.retriever import CachedRetriever, HybridRetriever, InMemoryMMRRetriever, LexicalRetriever
+
+
+class FixedQueryEmbeddings(Embeddings):
+    """어떤 쿼리든 미리 정한 벡터를 돌려주는 임베딩 대역."""
+
+    def __init__(self, query: np.ndarray):
+        self.query = query
+
+    def embed_documents(self, texts):
+        raise AssertionError("MMR 검색은 문서를 다시 임베딩하지 않아야 합니다.")
+
+    def embed_query(self, text):
+        return self.query.tolist()
+
+
+class CountingRetriever(BaseRetriever):
+    """쿼리를 그대로 담은 문서를 돌려주고 호출 수를 세는 Retriever 대역."""
+
+    calls: int = 0
+    on_call: object = None
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        self.calls += 1
+        if self.on_call is not None:
+            self.on_call()
+        return [Document(page_content=f"{query} 결과 {self.calls}")]
+
+
+class FixedRetriever(BaseRetriever):
+    """정해진 순위의 문서를 돌려주는 Retriever 대역."""
+
+    documents: list[Document]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return list(self.documents)
+
+
+class FixedLexicalStore:
+    """`lexical_index.search` 가 정해진 순위를 돌려주는 VectorStore 대역."""
+
+    def __init__(self, documents: list[Document]):
+        self.lexical_index = self
+        self.documents = documents
+        self.requested_k = None
+
+    def search(self, query, k):
+        self.requested_k = k
+        return [(doc, 1.0) for doc in self.documents[:k]]
+
+
+def reference_mmr(query: np.ndarray, matrix: np.ndarray, k: int, lambda_mult: float) -> list[int]:
+    """후보마다 선택된 문서와의 유사도를 다시 계산하는 단순한 MMR 구현. (비교 기준)"""
+    unit = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    q = query / np.linalg.norm(query)
+    selected: list[int] = []
+    while len(selected) < k:
+        best, best_score = -1, -np.inf
+        for i in range(len(unit)):
+            if i in selected:
+                continue
+            redundancy = max((float(unit[i] @ unit[j]) for j in selected), default=0.0)
+            score = float(unit[i] @ q) if not selected else lambda_mult * float(unit[i] @ q) - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(40, 16)).astype(np.float32)
+    documents = [Document(id=f"{i:08d}", page_content=f"청크 {i}") for i in range(len(matrix))]
+    return documents, matrix, rng.normal(size=16).astype(np.float32)
+
+
+@pytest.mark.parametrize("lambda_mult", [0.0, 0.3, 0.5, 1.0])
+def test_in_memory_mmr_matches_the_reference_selection(corpus, lambda_mult):
+    documents, matrix, query = corpus
+    retriever = InMemoryMMRRetriever(
+        embeddings=FixedQueryEmbeddings(query),
+        documents=documents,
+        matrix=matrix / np.linalg.norm(matrix, axis=1, keepdims=True),
+        k=5,
+        fetch_k=len(documents),
+        lambda_mult=lambda_mult,
+    )
+
+    result = retriever.invoke("질문")
+
+    assert [doc.id for doc in result] == [documents[i].id for i in reference_mmr(query, matrix, 5, lambda_mult)]
+
+
+def test_in_memory_mmr_only_considers_the_fetch_k_most_relevant(corpus):
+    documents, matrix, query = corpus
+    unit = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    retriever = InMemoryMMRRetriever(
+        embeddings=FixedQueryEmbeddings(query), documents=documents, matrix=unit, k=4, fetch_k=6, lambda_mult=0.0
+    )
+
+    result = retriever.invoke("질문")
+
+    top = set(np.argsort(-(unit @ query))[:6])
+    assert len(result) == 4 and {int(doc.id) for doc in result} <= top
+
+
+def test_in_memory_mmr_skips_duplicate_chunks(make_vector_store):
+    vector_store = make_vector_store()
+    text = "행렬의 고유값과 고유벡터를 구하는 방법"
+    vector_store.add_documents(
+        [Document(page_content=text), Document(page_content=text + "."), Document(page_content="확률 변수의 기댓값과 분산")]
+    )
+    retriever = InMemoryMMRRetriever.from_vector_store(vector_store, k=2, fetch_k=3, lambda_mult=0.3)
+
+    contents = [doc.page_content for doc in retriever.invoke(text)]
+
+    assert contents[0] in (text, text + ".")
+    assert contents[1] == "확률 변수의 기댓값과 분산"
+
+
+def test_in_memory_mmr_reloads_after_documents_are_added(make_vector_store):
+    vector_store = make_vector_store()
+    vector_store.add_documents([Document(page_content="벡터의 내적")])
+    retriever = InMemoryMMRRetriever.from_vector_store(vector_store, k=2, fetch_k=10)
+    assert len(retriever.invoke("내적")) == 1
+
+    vector_store.add_documents([Document(page_content="행렬의 곱셈")])
+
+    assert {doc.page_content for doc in retriever.invoke("내적")} == {"벡터의 내적", "행렬의 곱셈"}
+
+
+def test_cached_retriever_reuses_results_for_equivalent_queries():
+    inner = CountingRetriever()
+    retriever = CachedRetriever(retriever=inner, search_kwargs={"k": 4})
+
+    first = retriever.invoke("선형대수란?")
+    second = retriever.invoke("  선형대수란 ")
+    first[0].metadata["changed"] = True
+    third = retriever.invoke("선형대수란")
+
+    assert inner.calls == 1
+    assert [doc.page_content for doc in second] == [doc.page_content for doc in first]
+    # 호출한 쪽이 결과를 고쳐도 캐시된 문서는 바뀌지 않습니다.
+    assert "changed" not in third[0].metadata
+    assert (retriever.hits, retriever.misses) == (2, 1)
+
+
+def test_cached_retriever_keys_include_search_settings():
+    inner = CountingRetriever()
+    CachedRetriever(retriever=inner, search_kwargs={"k": 4}).invoke("질문")
+    shared = CachedRetriever(retriever=inner, search_kwargs={"k": 4})
+    shared.invoke("질문")
+    shared.search_kwargs = {"k": 8}
+    shared.invoke("질문")
+
+    assert inner.calls == 3
+
+
+def test_cached_retriever_evicts_least_recently_used_queries():
+    inner = CountingRetriever()
+    retriever = CachedRetriever(retriever=inner, max_entries=2)
+    for query in ("a", "b", "a", "c"):
+        retriever.invoke(query)
+
+    retriever.invoke("a")
+    assert inner.calls == 3
+    retriever.invoke("b")
+    assert inner.calls == 4
+
+
+def test_cached_retriever_is_invalidated_when_documents_are_added(make_vector_store):
+    vector_store = make_vector_store()
+    vector_store.add_documents([Document(page_content="벡터의 내적")])
+    inner = CountingRetriever()
+    retriever = CachedRetriever(retriever=inner, vector_store=vector_store)
+    retriever.invoke("내적")
+
+    vector_store.add_documents([Document(page_content="행렬의 곱셈")])
+    result = retriever.invoke("내적")
+
+    assert inner.calls == 2
+    assert result[0].page_content == "내적 결과 2"
+    retriever.invoke("내적")
+    assert inner.calls == 2
+
+
+def test_results_computed_while_documents_change_are_not_cached(make_vector_store):
+    vector_store = make_vector_store()
+    inner = CountingRetriever()
+    inner.on_call = lambda: vector_store.add_documents([Document(page_content=f"새 청크 {inner.calls}")])
+    retriever = CachedRetriever(retriever=inner, vector_store=vector_store)
+
+    retriever.invoke("내적")
+    inner.on_call = None
+    retriever.invoke("내적")
+
+    assert inner.calls == 2
+
+
+def chunk(name: str) -> Document:
+    return Document(id=name, page_content=f"청크 {name}")
+
+
+def test_hybrid_ranks_by_reciprocal_rank_fusion():
+    a, b, c, d = map(chunk, "abcd")
+    lexical = FixedLexicalStore([c, a, d])
+    retriever = HybridRetriever(
+        dense_retriever=FixedRetriever(documents=[a, b, c]), vector_store=lexical, k=3, fetch_k=20, rrf_k=60
+    )
+
+    result = retriever.invoke("질문")
+
+    # a: 1/61 + 1/62, c: 1/63 + 1/61, b: 1/62, d: 1/63
+    assert [doc.id for doc in result] == ["a", "c", "b"]
+    assert lexical.requested_k == 20
+
+
+def test_hybrid_prefers_documents_ranked_by_both_retrievers():
+    a, b, c = map(chunk, "abc")
+    retriever = HybridRetriever(
+        dense_retriever=FixedRetriever(documents=[a, c]), vector_store=FixedLexicalStore([b, c]), k=1, rrf_k=60
+    )
+
+    assert [doc.id for doc in retriever.invoke("질문")] == ["c"]
+
+
+def test_lexical_retriever_searches_chunks_as_they_are_added(make_vector_store, fake_embeddings):
+    vector_store = make_vector_store()
+    vector_store.add_documents([Document(page_content="행렬의 랭크와 역행렬"), Document(page_content="확률 분포와 기댓값")])
+    calls = fake_embeddings.calls
+
+    result = LexicalRetriever(vector_store=vector_store, k=1).invoke("역행렬은 언제 존재하나요")
+
+    assert [doc.page_content for doc in result] == ["행렬의 랭크와 역행렬"]
+    assert fake_embeddings.calls == calls
@@ -0,0 +1,82 @@
+# tests/test_search_cache.py
+from difflib import SequenceMatcher
+
+import pytest
+
+from src.search_cache import SearchCache
+
+
+QUERY = "transformer attention 메커니즘 설명"
+
+
+@pytest.fixture
+def cache():
+    return SearchCache(None, similarity_threshold=0.9)
+
+
+def test_exact_and_normalized_queries_hit(cache):
+    cache.put(QUERY, "결과")
+
+    assert cache.get(QUERY) == (QUERY, "결과")
+    assert cache.get("  Transformer   ATTENTION 메커니즘 설명 ") == (QUERY, "결과")
+    assert cache.stats == {"hits": 2, "misses": 0, "hit_rate": 1.0, "entries": 1}
+
+
+def test_every_near_duplicate_above_the_threshold_hits(cache):
+    cache.put(QUERY, "결과")
+    # 한 글자를 바꾼 쿼리는 3-gram 이 최대 3개까지 달라져 LSH 후보에서 빠질 수 있지만, 비율이 기준 이상이면 찾아야 합니다.
+    variants = {QUERY[:i] + "x" + QUERY[i + 1 :] for i in range(len(QUERY))}
+    variants |= {QUERY[:i] + QUERY[i + 1 :] for i in range(len(QUERY))}
+
+    for variant in variants:
+        expected = SequenceMatcher(None, QUERY, variant).ratio() >= cache.similarity_threshold
+        assert (cache.get(variant) is not None) == expected, variant
+
+
+def test_short_queries_with_one_changed_character(cache):
+    cache.put("파이썬 정규식 예제 모음", "결과")
+
+    assert cache.get("파이썬 정규식 예제 모임") is not None
+    assert cache.get("자바 정규식 예제 모음") is None
+
+
+def test_dissimilar_queries_miss(cache):
+    cache.put(QUERY, "결과")
+
+    assert cache.get("오늘 서울 날씨") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_memory_caches_are_separate_per_instance():
+    first, second = SearchCache(None), SearchCache(None)
+    first.put(QUERY, "결과")
+
+    assert second.get(QUERY) is None
+
+
+def test_results_are_kept_per_max_results(tmp_path):
+    path = tmp_path / "search.sqlite3"
+    SearchCache(path, max_results=3).put(QUERY, "결과 3개")
+
+    assert SearchCache(path, max_results=5).get(QUERY) is None
+    assert SearchCache(path, max_results=3).get(QUERY) == (QUERY, "결과 3개")
+
+
+def test_expired_entries_are_not_used(cache):
+    cache.ttl_seconds = -1
+    cache.put(QUERY, "결과")
+
+    assert cache.get(QUERY) is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SearchCache(None, max_entries=2)
+    cache.put("선형대수 고유값", "1")
+    cache.put("확률 분포 종류", "2")
+    cache.get("선형대수 고유값")
+
+    cache.put("미분 방정식 풀이", "3")
+
+    assert cache.stats["entries"] == 2
+    assert cache.get("확률 분포 종류") is None
+    assert cache.get("선형대수 고유값") == ("선형대수 고유값", "1")
@@ -0,0 +1,94 @@
+# tests/test_text_splitter.py
+import pytest
+from langchain_core.documents import Document
+
+from src.text_splitter import PageAwareTokenSplitter
+
+
+@pytest.fixture
+def splitter(char_tokenizer):
+    return PageAwareTokenSplitter(chunk_size=40, chunk_overlap=12, tokenizer=char_tokenizer)
+
+
+def token_count(chunk: str) -> int:
+    # 글자 토크나이저 + 줄바꿈 1 토큰 (splitter 와 같은 셈법)
+    return len(chunk)
+
+
+def test_chunks_stay_within_chunk_size(splitter):
+    text = "\n".join(f"line {i:02d} text" for i in range(30))
+
+    chunks = splitter.split_text(text)
+
+    assert len(chunks) > 1
+    assert all(token_count(chunk) <= 40 for chunk in chunks)
+
+
+def test_consecutive_chunks_overlap_by_trailing_lines(splitter):
+    lines = [f"line {i:02d}" for i in range(20)]
+
+    chunks = splitter.split_text("\n".join(lines))
+
+    for previous, current in zip(chunks, chunks[1:]):
+        overlap = [line for line in previous.splitlines() if line in current.splitlines()]
+        assert overlap, (previous, current)
+        # 겹치는 부분은 이전 청크의 마지막 줄들이고, chunk_overlap 토큰을 넘지 않습니다.
+        assert previous.splitlines()[-len(overlap) :] == overlap
+        assert current.splitlines()[: len(overlap)] == overlap
+        assert sum(len(line) + 1 for line in overlap) <= 12
+    # 겹침을 빼면 모든 줄이 순서대로 한 번씩 들어 있습니다.
+    seen: list[str] = []
+    for chunk in chunks:
+        seen.extend(line for line in chunk.splitlines() if line not in seen)
+    assert seen == lines
+
+
+def test_heading_starts_a_new_chunk_without_overlap(splitter):
+    text = "\n".join(["intro line one", "intro two", "## 2. Methods", "body a", "body b"])
+
+    chunks = splitter.split_text(text)
+
+    assert chunks[0] == "intro line one\nintro two"
+    assert chunks[1].startswith("## 2. Methods")
+    assert "intro two" not in chunks[1]
+
+
+def test_heading_does_not_split_a_nearly_empty_chunk(splitter):
+    # 현재 청크가 chunk_size 의 1/4(10 토큰) 미만이면 제목이 나와도 이어 붙입니다.
+    chunks = splitter.split_text("short\n1. Heading\nbody")
+
+    assert chunks == ["short\n1. Heading\nbody"]
+
+
+def test_numbered_and_korean_headings_are_detected(splitter):
+    text = "\n".join(["첫 번째 단락의 충분히 긴 문장", "가. 두 번째 절", "내용", "Ⅱ. 세 번째 장", "내용"])
+
+    chunks = splitter.split_text(text)
+
+    assert [chunk.splitlines()[0] for chunk in chunks] == ["첫 번째 단락의 충분히 긴 문장", "가. 두 번째 절", "Ⅱ. 세 번째 장"]
+
+
+def test_long_line_is_split_by_sentence_then_tokens(splitter):
+    sentences = ["First sentence is here.", "Second one follows it.", "x" * 100]
+    text = " ".join(sentences)
+
+    chunks = splitter.split_text(text)
+
+    assert all(token_count(chunk) <= 40 for chunk in chunks)
+    assert chunks[0].startswith("First sentence is here.")
+    assert "".join(chunk.replace("\n", "") for chunk in chunks).count("x") >= 100
+
+
+def test_split_documents_keeps_page_boundaries_and_metadata(splitter):
+    pages = [
+        Document(page_content="\n".join(f"p{page} line {i}" for i in range(8)), metadata={"page": page, "source": "a.pdf"})
+        for page in range(3)
+    ]
+
+    chunks = splitter.split_documents(pages)
+
+    assert {chunk.metadata["page"] for chunk in chunks} == {0, 1, 2}
+    for chunk in chunks:
+        page = chunk.metadata["page"]
+        assert all(line.startswith(f"p{page} ") for line in chunk.page_content.splitlines())
+        assert chunk.metadata["source"] == "a.pdf"
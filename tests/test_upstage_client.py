@@ -0,0 +1,106 @@
+# tests/test_upstage_client.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pymupdf
+import pytest
+
+from src.upstage_client import UpstageConcurrentLoader, UpstageParseClient, UpstageParseError
+
+
+class FakeDocumentParse(BaseHTTPRequestHandler):
+    """Document Parse API 대역: 받은 PDF 의 각 페이지를 element 하나로 돌려줍니다."""
+
+    # 처음 몇 번의 요청에 돌려줄 상태 코드 (재시도 테스트용)
+    failures: list[int] = []
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with self.lock:
+            type(self).requests += 1
+            status = self.failures.pop(0) if self.failures else 200
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if status != 200:
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        pdf_bytes = body[body.index(b"%PDF") : body.rindex(b"%%EOF") + 5]
+        with pymupdf.open(stream=pdf_bytes, filetype="pdf") as pdf:
+            elements = [
+                {"page": i + 1, "category": "paragraph", "content": {"markdown": page.get_text().strip()}}
+                for i, page in enumerate(pdf)
+            ]
+        payload = json.dumps({"elements": elements}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FakeDocumentParse.failures = []
+    FakeDocumentParse.requests = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeDocumentParse)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def pdf_bytes():
+    with pymupdf.open() as pdf:
+        for i in range(7):
+            pdf.new_page().insert_text((72, 72), f"page {i + 1}")
+        return pdf.tobytes()
+
+
+def make_client(base_url, cache_dir=None, **kwargs):
+    options = dict(pages_per_request=3, max_workers=3, requests_per_second=100, backoff_base=0.01)
+    return UpstageParseClient("test-key", base_url=base_url, cache_dir=cache_dir, **{**options, **kwargs})
+
+
+def test_pages_are_returned_in_order_with_absolute_page_numbers(server, pdf_bytes):
+    docs = UpstageConcurrentLoader(pdf_bytes, make_client(server), "lecture.pdf").load()
+
+    assert [doc.metadata["page"] for doc in docs] == [1, 2, 3, 4, 5, 6, 7]
+    assert [doc.page_content for doc in docs] == [f"page {i}" for i in range(1, 8)]
+    assert FakeDocumentParse.requests == 3
+
+
+def test_retryable_errors_are_retried(server, pdf_bytes):
+    FakeDocumentParse.failures = [429, 503]
+    client = make_client(server, max_workers=1)
+
+    docs = UpstageConcurrentLoader(pdf_bytes, client).load()
+
+    assert len(docs) == 7
+    assert client.requests_sent == 5
+
+
+def test_gives_up_after_max_retries(server, pdf_bytes):
+    FakeDocumentParse.failures = [500] * 10
+    client = make_client(server, max_workers=1, max_retries=2)
+
+    with pytest.raises(UpstageParseError):
+        UpstageConcurrentLoader(pdf_bytes, client).load()
+
+
+def test_responses_are_cached_on_disk(server, pdf_bytes, tmp_path):
+    first = UpstageConcurrentLoader(pdf_bytes, make_client(server, tmp_path)).load()
+    client = make_client(server, tmp_path)
+    second = UpstageConcurrentLoader(pdf_bytes, client).load()
+
+    assert second == first
+    assert FakeDocumentParse.requests == 3
+    assert client.requests_sent == 0
+    assert client.cache_hits == 3